@@ -2,12 +2,87 @@
 import sqlite3
 from sqlite3 import Error
 import logging
+import os
+import re
+import threading
+import configparser
+import functools
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
+from utils.dinheiro import dividir_centavos
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 DATABASE_NAME = "pedidos.db"
 
+# --- PERFIS DE DESEMPENHO DO SQLITE ---
+# Seleção: variável de ambiente APP_PEDIDOS_PERFIL_DB ou seção [banco] (chave 'perfil') do config.ini.
+CONFIG_FILE = "config.ini"
+VAR_AMBIENTE_PERFIL = "APP_PEDIDOS_PERFIL_DB"
+PERFIL_PADRAO = "desempenho"
+
+# A ordem importa: journal_mode deve vir antes de synchronous.
+PERFIS_DB = {
+    # Padrões do SQLite (journal em rollback, synchronous FULL, cache pequeno)
+    "compatibilidade": {},
+    # WAL permite leituras (relatórios) simultâneas à gravação de pedidos
+    "desempenho": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -65536,  # Valor negativo = KiB (64 MiB)
+        "mmap_size": 268435456,  # 256 MiB
+        "temp_store": "MEMORY",
+    },
+    # WAL com synchronous FULL: durabilidade máxima mesmo em queda de energia
+    "seguro": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16384,
+        "temp_store": "MEMORY",
+    },
+}
+
+_perfil_aplicado = {"nome": None, "pragmas": {}}
+
+
+def obter_perfil_db():
+    """Retorna o nome do perfil configurado (variável de ambiente > config.ini > padrão)."""
+    perfil = os.environ.get(VAR_AMBIENTE_PERFIL, "").strip().lower()
+
+    if not perfil and os.path.exists(CONFIG_FILE):
+        config = configparser.ConfigParser()
+        try:
+            config.read(CONFIG_FILE, encoding="utf-8")
+            perfil = config.get("banco", "perfil", fallback="").strip().lower()
+        except configparser.Error as e:
+            logging.warning(f"Não foi possível ler {CONFIG_FILE}: {e}")
+
+    if not perfil:
+        return PERFIL_PADRAO
+
+    if perfil not in PERFIS_DB:
+        logging.warning(f"Perfil de banco '{perfil}' desconhecido. Usando '{PERFIL_PADRAO}'.")
+        return PERFIL_PADRAO
+    return perfil
+
+
+def aplicar_perfil_db(conn, perfil=None):
+    """Aplica os PRAGMAs do perfil na conexão e retorna os valores efetivos lidos de volta."""
+    # O perfil é resolvido uma única vez; as conexões seguintes reutilizam a escolha
+    perfil = perfil or _perfil_aplicado["nome"] or obter_perfil_db()
+    aplicados = {}
+
+    for pragma, valor in PERFIS_DB[perfil].items():
+        conn.execute(f"PRAGMA {pragma} = {valor};")
+        # Lê de volta: o SQLite pode recusar um valor (ex.: WAL em banco ':memory:')
+        aplicados[pragma] = conn.execute(f"PRAGMA {pragma};").fetchone()[0]
+
+    _perfil_aplicado["nome"] = perfil
+    _perfil_aplicado["pragmas"] = aplicados
+    return aplicados
+
 
 def criar_conexao(db_file=DATABASE_NAME):
     """Cria uma conexão com o banco de dados SQLite especificado."""
@@ -15,6 +90,7 @@ def criar_conexao(db_file=DATABASE_NAME):
     try:
         conn = sqlite3.connect(db_file)
         conn.execute("PRAGMA foreign_keys = ON;")
+        aplicar_perfil_db(conn)
         return conn
     except Error as e:
         logging.error(f"Erro ao conectar ao banco de dados: {e}")
@@ -23,13 +99,832 @@ def criar_conexao(db_file=DATABASE_NAME):
         return None
 
 
-def inicializar_db():
-    """Cria as tabelas do esquema."""
-    conn = criar_conexao()
+# --- GERENCIADOR DE CONEXÕES (uma conexão persistente por thread) ---
+
+_pool_local = threading.local()
+_pool_lock = threading.Lock()
+_pool_conexoes = []  # Todas as conexões abertas (cada uma só pode ser usada e fechada pela thread que a criou)
+_pool_stats = {"criadas": 0, "reutilizadas": 0}
+_pool_geracao = 0  # Incrementada em fechar_conexoes() para invalidar as referências das threads
+
+
+def _estado_da_thread():
+    """Dicionários (conexões, sentinelas) da thread atual, descartados se o pool foi encerrado desde então."""
+    if getattr(_pool_local, "geracao", None) != _pool_geracao:
+        _pool_local.conexoes = {}
+        _pool_local.sentinelas = {}
+        _pool_local.geracao = _pool_geracao
+    return _pool_local.conexoes, _pool_local.sentinelas
+
+
+def _conexao_da_thread(db_file=DATABASE_NAME):
+    """Retorna a conexão persistente da thread atual, criando-a na primeira vez."""
+    conexoes, _ = _estado_da_thread()
+    conn = conexoes.get(db_file)
     if conn is not None:
+        with _pool_lock:
+            _pool_stats["reutilizadas"] += 1
+        return conn
+
+    conn = criar_conexao(db_file)
+    if conn is None:
+        return None
+
+    conexoes[db_file] = conn
+    with _pool_lock:
+        _pool_stats["criadas"] += 1
+        _pool_conexoes.append(conn)
+    return conn
+
+
+@contextmanager
+def obter_conexao(db_file=DATABASE_NAME):
+    """
+    Context manager que entrega a conexão persistente da thread atual.
+    A conexão NÃO é fechada na saída; em caso de exceção, uma transação pendente é desfeita.
+    Produz None se não for possível conectar.
+    """
+    conn = _conexao_da_thread(db_file)
+    try:
+        yield conn
+    except Exception:
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+        raise
+
+
+def _iniciar_escrita(conn):
+    """
+    BEGIN IMMEDIATE na conexão persistente da thread. Uma transação implícita deixada aberta por um
+    comando anterior nessa conexão é confirmada antes (senão: "cannot start a transaction within a transaction").
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+
+
+def liberar_conexao_da_thread():
+    """
+    Fecha as conexões da thread atual (inclusive a sentinela do cache de leituras).
+    Toda thread que acessa o banco deve chamá-la ao terminar: uma conexão só pode ser fechada por quem a criou.
+    """
+    conexoes = getattr(_pool_local, "conexoes", None) or {}
+    sentinelas = getattr(_pool_local, "sentinelas", None) or {}
+    _pool_local.conexoes = {}
+    _pool_local.sentinelas = {}
+
+    for _, conn in sentinelas.values():
+        try:
+            conn.close()
+        except Error as e:
+            logging.warning(f"Erro ao fechar sentinela do cache de leituras: {e}")
+
+    for conn in conexoes.values():
+        with _pool_lock:
+            if conn in _pool_conexoes:
+                _pool_conexoes.remove(conn)
+        try:
+            conn.close()
+        except Error as e:
+            logging.warning(f"Erro ao fechar conexão da thread: {e}")
+
+
+def estatisticas_conexoes():
+    """Retorna quantas conexões foram criadas e quantas vezes uma conexão existente foi reutilizada."""
+    with _pool_lock:
+        criadas = _pool_stats["criadas"]
+        reutilizadas = _pool_stats["reutilizadas"]
+        abertas = len(_pool_conexoes)
+
+    total = criadas + reutilizadas
+    return {
+        "criadas": criadas,
+        "reutilizadas": reutilizadas,
+        "abertas": abertas,
+        "taxa_reuso": (reutilizadas / total) if total else 0.0
+    }
+
+
+def fechar_conexoes():
+    """
+    Encerramento do pool: fecha as conexões da thread atual e invalida as das demais threads, que devem
+    ter fechado as suas com liberar_conexao_da_thread (ex.: ExecutorDB.encerrar aguarda as threads de trabalho).
+    """
+    global _pool_geracao
+    liberar_conexao_da_thread()
+    with _pool_lock:
+        restantes = len(_pool_conexoes)
+        _pool_conexoes.clear()
+        _pool_geracao += 1
+    _busca_fts.clear()
+
+    if restantes:
+        logging.warning(f"{restantes} conexão(ões) de outras threads ainda abertas no encerramento do pool.")
+    stats = estatisticas_conexoes()
+    logging.info(f"Conexões do pool fechadas. Criadas: {stats['criadas']}, reutilizadas: {stats['reutilizadas']}.")
+
+    stats_cache = estatisticas_cache_leituras()
+    logging.info(f"Cache de leituras: {stats_cache['acertos']} acertos, {stats_cache['falhas']} falhas "
+                 f"(taxa de acerto: {stats_cache['taxa_acerto']:.0%}).")
+    limpar_cache_leituras()
+
+
+# --- CACHE DE LEITURAS (invalidado por PRAGMA data_version) ---
+
+CACHE_LEITURAS_MAX_ENTRADAS = 256
+CACHE_LEITURAS_MAX_BYTES = 32 * 1024 * 1024
+# Resultados maiores que esta fração do limite não são guardados (expulsariam o restante do cache)
+CACHE_LEITURAS_FRACAO_MAX_ENTRADA = 0.25
+
+_cache_lock = threading.Lock()
+_cache_entradas = OrderedDict()  # chave -> (versão dos dados, resultado, bytes); ordem = uso (LRU)
+_cache_bytes = 0
+_cache_stats = {"acertos": 0, "falhas": 0, "descartes": 0}
+_contador_escritas = 0  # Escritas feitas por esta aplicação (executar_comando / registrar_escrita)
+_sentinelas_criadas = 0  # Identifica cada conexão sentinela (ver _versao_dados)
+
+
+def registrar_escrita():
+    """Invalida o cache de leituras após uma escrita feita por esta aplicação."""
+    global _contador_escritas
+    with _cache_lock:
+        _contador_escritas += 1
+
+
+def _versao_dados(db_file=DATABASE_NAME):
+    """
+    Retorna (sentinela, versão atual dos dados). PRAGMA data_version muda quando OUTRA conexão confirma
+    uma escrita; por isso é lido em uma conexão sentinela que nunca escreve: ela percebe as escritas de
+    todas as conexões do pool e também as de outros processos. Cada thread tem a sua sentinela (fechada
+    por liberar_conexao_da_thread) e o valor só é comparável dentro da mesma sentinela.
+    """
+    global _sentinelas_criadas
+    _, sentinelas = _estado_da_thread()
+    sentinela = sentinelas.get(db_file)
+    if sentinela is None:
+        with _cache_lock:
+            _sentinelas_criadas += 1
+            identificador = _sentinelas_criadas
+        sentinela = sentinelas[db_file] = (identificador, sqlite3.connect(db_file))
+
+    identificador, conn = sentinela
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    with _cache_lock:
+        return identificador, (data_version, _contador_escritas)
+
+
+def _tamanho_aproximado(valor):
+    """Bytes ocupados por um resultado (listas/tuplas/dicionários de valores simples)."""
+    tamanho = sys.getsizeof(valor)
+    if isinstance(valor, dict):
+        tamanho += sum(_tamanho_aproximado(k) + _tamanho_aproximado(v) for k, v in valor.items())
+    elif isinstance(valor, (list, tuple, set)):
+        tamanho += sum(_tamanho_aproximado(item) for item in valor)
+    return tamanho
+
+
+def _guardar_no_cache(chave, versao, resultado):
+    global _cache_bytes
+    tamanho = _tamanho_aproximado(resultado)
+    if tamanho > CACHE_LEITURAS_MAX_BYTES * CACHE_LEITURAS_FRACAO_MAX_ENTRADA:
+        return
+
+    with _cache_lock:
+        anterior = _cache_entradas.pop(chave, None)
+        if anterior is not None:
+            _cache_bytes -= anterior[2]
+
+        _cache_entradas[chave] = (versao, resultado, tamanho)
+        _cache_bytes += tamanho
+
+        # Descarta as entradas usadas há mais tempo até respeitar os dois limites
+        while len(_cache_entradas) > CACHE_LEITURAS_MAX_ENTRADAS or _cache_bytes > CACHE_LEITURAS_MAX_BYTES:
+            _, (_, _, tamanho_descartado) = _cache_entradas.popitem(last=False)
+            _cache_bytes -= tamanho_descartado
+            _cache_stats["descartes"] += 1
+
+
+def cache_leitura(funcao):
+    """
+    Decorador de cache (read-through) para funções de consulta deste módulo, por função e argumentos.
+    Uma entrada só é reutilizada enquanto a versão dos dados (data_version + escritas locais) não mudar;
+    como data_version é lido na sentinela da thread, as entradas são separadas por sentinela.
+    Resultados None (erro) não são guardados. O resultado é compartilhado: quem chama não deve alterá-lo.
+    A função original fica disponível em .sem_cache.
+    """
+    @functools.wraps(funcao)
+    def envoltorio(*args, **kwargs):
+        chave = (funcao.__name__, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(chave)
+        except TypeError:
+            return funcao(*args, **kwargs)  # Argumentos não hasheáveis: sem cache
+
+        # A versão é lida ANTES da consulta: uma escrita concorrente deixa a entrada já obsoleta
+        sentinela, versao = _versao_dados()
+        chave = (sentinela,) + chave
+        with _cache_lock:
+            entrada = _cache_entradas.get(chave)
+            if entrada is not None and entrada[0] == versao:
+                _cache_entradas.move_to_end(chave)
+                _cache_stats["acertos"] += 1
+                return entrada[1]
+            _cache_stats["falhas"] += 1
+
+        resultado = funcao(*args, **kwargs)
+        if resultado is not None:
+            _guardar_no_cache(chave, versao, resultado)
+        return resultado
+
+    envoltorio.sem_cache = funcao
+    return envoltorio
+
+
+def estatisticas_cache_leituras():
+    """Retorna acertos, falhas, taxa de acerto, entradas, bytes ocupados e descartes do cache de leituras."""
+    with _cache_lock:
+        acertos, falhas = _cache_stats["acertos"], _cache_stats["falhas"]
+        return {
+            "acertos": acertos,
+            "falhas": falhas,
+            "taxa_acerto": (acertos / (acertos + falhas)) if acertos + falhas else 0.0,
+            "entradas": len(_cache_entradas),
+            "bytes": _cache_bytes,
+            "descartes": _cache_stats["descartes"],
+        }
+
+
+def limpar_cache_leituras():
+    """Esvazia o cache de leituras."""
+    global _cache_bytes
+    with _cache_lock:
+        _cache_entradas.clear()
+        _cache_bytes = 0
+
+
+# --- MIGRAÇÕES DE ESQUEMA (versionadas por PRAGMA user_version) ---
+
+def _migracao_indices_pedidos(cursor):
+    """Índices usados pelos JOINs e filtros de pedidos (relatórios, lista de pedidos e detalhes)."""
+    # Índices do SQLite já incluem o rowid no final: idx_pedidos_data também ordena por (data, id)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pedidos_data ON pedidos (data)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_pedidos_cliente_id ON pedidos (cliente_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_itens_pedido_pedido_id ON itens_pedido (pedido_id)")
+
+
+def _migracao_indice_produtos_nome(cursor):
+    """Índice case-insensitive para buscas e ordenação por nome de produto."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_produtos_nome_nocase ON produtos (nome COLLATE NOCASE)")
+
+
+def fts5_disponivel(conn):
+    """Verifica se a biblioteca SQLite em uso foi compilada com o módulo FTS5."""
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._teste_fts5 USING fts5(x)")
+        conn.execute("DROP TABLE temp._teste_fts5")
+        return True
+    except Error:
+        return False
+
+
+# Tokenizador sem acentos: "João" e "joao" geram o mesmo termo
+_TOKENIZADOR_FTS = "unicode61 remove_diacritics 2"
+
+
+def _migracao_busca_textual(cursor):
+    """Tabelas FTS5 (conteúdo externo) para clientes e produtos, sincronizadas por triggers."""
+    if not fts5_disponivel(cursor.connection):
+        logging.warning("SQLite sem FTS5: a busca de clientes e produtos continuará usando LIKE.")
+        return
+
+    indices = {
+        "clientes": ("nome", "email", "telefone"),
+        "produtos": ("nome",),
+    }
+
+    for tabela, colunas in indices.items():
+        fts = f"{tabela}_fts"
+        lista = ", ".join(colunas)
+        novos = ", ".join(f"new.{c}" for c in colunas)
+        antigos = ", ".join(f"old.{c}" for c in colunas)
+
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {lista}, content='{tabela}', content_rowid='id',
+                tokenize='{_TOKENIZADOR_FTS}', prefix='2 3'
+            )
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_fts_ai AFTER INSERT ON {tabela} BEGIN
+                INSERT INTO {fts} (rowid, {lista}) VALUES (new.id, {novos});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_fts_ad AFTER DELETE ON {tabela} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos});
+            END
+        """)
+        # UPDATE OF: baixas de estoque em produtos não reindexam o nome
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {tabela}_fts_au AFTER UPDATE OF {lista} ON {tabela} BEGIN
+                INSERT INTO {fts} ({fts}, rowid, {lista}) VALUES ('delete', old.id, {antigos});
+                INSERT INTO {fts} (rowid, {lista}) VALUES (new.id, {novos});
+            END
+        """)
+        # Indexa os registros já existentes
+        cursor.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def _migracao_cache_ia(cursor):
+    """Cache persistente das respostas da análise de IA (usado por utils/analise_ia.py)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cache_ia (
+            chave TEXT PRIMARY KEY,
+            resposta TEXT NOT NULL,
+            criado_em REAL NOT NULL,
+            acessado_em REAL NOT NULL
+        )
+    """)
+    # Ordem de uso para o descarte LRU
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_cache_ia_acessado_em ON cache_ia (acessado_em)")
+
+
+def _migracao_vendas_diarias(cursor):
+    """
+    Resumo de quantidades vendidas por (data, produto), mantido por triggers.
+    As análises locais (utils/analise_local.py) agregam esta tabela em vez de varrer itens_pedido:
+    cada dia tem no máximo uma linha por produto, independentemente do número de pedidos.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS vendas_diarias_produto (
+            data TEXT NOT NULL,
+            produto_nome TEXT NOT NULL,
+            quantidade INTEGER NOT NULL,
+            PRIMARY KEY (data, produto_nome)
+        ) WITHOUT ROWID
+    """)
+    # Cobre o agrupamento por produto (sem ordenação temporária) também quando há filtro de datas
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_vendas_diarias_produto_nome
+        ON vendas_diarias_produto (produto_nome, data, quantidade)
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS itens_pedido_vendas_ai AFTER INSERT ON itens_pedido BEGIN
+            INSERT INTO vendas_diarias_produto (data, produto_nome, quantidade)
+                SELECT data, new.produto_nome, new.quantidade FROM pedidos WHERE id = new.pedido_id
+                ON CONFLICT (data, produto_nome) DO UPDATE SET quantidade = quantidade + excluded.quantidade;
+        END
+    """)
+    # Na exclusão em cascata o pedido já não existe: a baixa é feita pelo trigger de pedidos abaixo
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS itens_pedido_vendas_ad AFTER DELETE ON itens_pedido BEGIN
+            UPDATE vendas_diarias_produto SET quantidade = quantidade - old.quantidade
+            WHERE produto_nome = old.produto_nome
+              AND data = (SELECT data FROM pedidos WHERE id = old.pedido_id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS itens_pedido_vendas_au
+        AFTER UPDATE OF pedido_id, produto_nome, quantidade ON itens_pedido BEGIN
+            UPDATE vendas_diarias_produto SET quantidade = quantidade - old.quantidade
+            WHERE produto_nome = old.produto_nome
+              AND data = (SELECT data FROM pedidos WHERE id = old.pedido_id);
+            INSERT INTO vendas_diarias_produto (data, produto_nome, quantidade)
+                SELECT data, new.produto_nome, new.quantidade FROM pedidos WHERE id = new.pedido_id
+                ON CONFLICT (data, produto_nome) DO UPDATE SET quantidade = quantidade + excluded.quantidade;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS pedidos_vendas_bd BEFORE DELETE ON pedidos BEGIN
+            UPDATE vendas_diarias_produto SET quantidade = quantidade - (
+                SELECT SUM(quantidade) FROM itens_pedido
+                WHERE pedido_id = old.id AND produto_nome = vendas_diarias_produto.produto_nome
+            )
+            WHERE data = old.data
+              AND produto_nome IN (SELECT produto_nome FROM itens_pedido WHERE pedido_id = old.id);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS pedidos_vendas_au AFTER UPDATE OF data ON pedidos BEGIN
+            UPDATE vendas_diarias_produto SET quantidade = quantidade - (
+                SELECT SUM(quantidade) FROM itens_pedido
+                WHERE pedido_id = old.id AND produto_nome = vendas_diarias_produto.produto_nome
+            )
+            WHERE data = old.data
+              AND produto_nome IN (SELECT produto_nome FROM itens_pedido WHERE pedido_id = old.id);
+            INSERT INTO vendas_diarias_produto (data, produto_nome, quantidade)
+                SELECT new.data, produto_nome, SUM(quantidade) FROM itens_pedido
+                WHERE pedido_id = new.id GROUP BY produto_nome
+                ON CONFLICT (data, produto_nome) DO UPDATE SET quantidade = quantidade + excluded.quantidade;
+        END
+    """)
+
+    # Carga inicial a partir dos pedidos já existentes
+    _recalcular_vendas_diarias(cursor)
+
+
+def _recalcular_vendas_diarias(cursor):
+    cursor.execute("DELETE FROM vendas_diarias_produto")
+    cursor.execute("""
+        INSERT INTO vendas_diarias_produto (data, produto_nome, quantidade)
+        SELECT p.data, i.produto_nome, SUM(i.quantidade)
+        FROM pedidos p
+        INNER JOIN itens_pedido i ON i.pedido_id = p.id
+        GROUP BY p.data, i.produto_nome
+    """)
+
+
+def _migracao_metricas_mensais(cursor):
+    """
+    Métricas do Dashboard mantidas por triggers: metricas_mensais (pedidos e receita por mês AAAA-MM)
+    e metricas_totais (linha única com o total de clientes, que não têm data de cadastro).
+    get_dashboard_metrics passa a ler uma linha em vez de varrer clientes e pedidos.
+    A carga inicial fica com a migração 7, que recria metricas_mensais em centavos.
+    """
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS metricas_mensais (
+            mes TEXT PRIMARY KEY,
+            num_pedidos INTEGER NOT NULL DEFAULT 0,
+            receita REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS pedidos_metricas_ai AFTER INSERT ON pedidos BEGIN
+            INSERT INTO metricas_mensais (mes, num_pedidos, receita) VALUES (substr(new.data, 1, 7), 1, new.total)
+                ON CONFLICT (mes) DO UPDATE SET num_pedidos = num_pedidos + 1, receita = receita + excluded.receita;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS pedidos_metricas_ad AFTER DELETE ON pedidos BEGIN
+            UPDATE metricas_mensais SET num_pedidos = num_pedidos - 1, receita = receita - old.total
+            WHERE mes = substr(old.data, 1, 7);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS pedidos_metricas_au AFTER UPDATE OF data, total ON pedidos BEGIN
+            UPDATE metricas_mensais SET num_pedidos = num_pedidos - 1, receita = receita - old.total
+            WHERE mes = substr(old.data, 1, 7);
+            INSERT INTO metricas_mensais (mes, num_pedidos, receita) VALUES (substr(new.data, 1, 7), 1, new.total)
+                ON CONFLICT (mes) DO UPDATE SET num_pedidos = num_pedidos + 1, receita = receita + excluded.receita;
+        END
+    """)
+    _criar_metricas_totais(cursor)
+
+
+def _criar_metricas_totais(cursor):
+    """metricas_totais e os triggers de clientes que a mantêm (migração 6 e esquema de bancos novos)."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS metricas_totais (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_clientes INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS clientes_metricas_ai AFTER INSERT ON clientes BEGIN
+            UPDATE metricas_totais SET total_clientes = total_clientes + 1 WHERE id = 1;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS clientes_metricas_ad AFTER DELETE ON clientes BEGIN
+            UPDATE metricas_totais SET total_clientes = total_clientes - 1 WHERE id = 1;
+        END
+    """)
+
+
+def reconstruir_resumos():
+    """
+    Recalcula as tabelas mantidas por triggers (metricas_mensais, metricas_totais e vendas_diarias_produto)
+    a partir de pedidos, itens e clientes. Útil após importações ou correções feitas fora da aplicação
+    com os triggers desativados. Retorna True em caso de sucesso.
+    """
+    with obter_conexao() as conn:
+        if conn is None:
+            return False
+
+        try:
+            _iniciar_escrita(conn)
+            cursor = conn.cursor()
+            _recalcular_metricas_centavos(cursor)
+            _recalcular_vendas_diarias(cursor)
+            conn.commit()
+            logging.info("Tabelas de resumo reconstruídas.")
+            return True
+        except Error as e:
+            conn.rollback()
+            logging.error(f"Erro ao reconstruir as tabelas de resumo: {e}")
+            return False
+
+
+# --- MIGRAÇÃO 7: valores monetários em centavos (INTEGER) ---
+# O SQLite não altera o tipo de uma coluna: as tabelas são reconstruídas. A cópia das linhas (a parte cara)
+# roda antes da migração, em lotes com commit próprio, e é retomada de onde parou se o processo for
+# interrompido; a troca das tabelas roda na transação da migração (tudo ou nada).
+TAMANHO_LOTE_MIGRACAO = 50_000
+
+# tabela -> (CREATE TABLE da versão em centavos, com {nome} = tabela criada, colunas copiadas: destino -> expressão
+# sobre a tabela antiga). A migração cria as tabelas *_nova; bancos novos, as definitivas (_criar_esquema_atual).
+_TABELAS_CENTAVOS = {
+    "produtos": ("""
+        CREATE TABLE IF NOT EXISTS {nome} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT UNIQUE NOT NULL,
+            preco_centavos INTEGER NOT NULL,
+            estoque INTEGER NOT NULL DEFAULT 0
+        )
+    """, {"id": "id", "nome": "nome", "preco_centavos": "CAST(ROUND(preco * 100) AS INTEGER)",
+          "estoque": "estoque"}),
+    "pedidos": ("""
+        CREATE TABLE IF NOT EXISTS {nome} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cliente_id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            total_centavos INTEGER NOT NULL,
+            FOREIGN KEY (cliente_id) REFERENCES clientes (id) ON DELETE CASCADE
+        )
+    """, {"id": "id", "cliente_id": "cliente_id", "data": "data",
+          "total_centavos": "CAST(ROUND(total * 100) AS INTEGER)"}),
+    "itens_pedido": ("""
+        CREATE TABLE IF NOT EXISTS {nome} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            pedido_id INTEGER NOT NULL,
+            produto_id INTEGER,
+            produto_nome TEXT NOT NULL,
+            quantidade INTEGER NOT NULL,
+            preco_unit_centavos INTEGER NOT NULL,
+            FOREIGN KEY (pedido_id) REFERENCES pedidos (id) ON DELETE CASCADE,
+            FOREIGN KEY (produto_id) REFERENCES produtos (id) ON DELETE SET NULL
+        )
+    """, {"id": "id", "pedido_id": "pedido_id", "produto_id": "produto_id", "produto_nome": "produto_nome",
+          "quantidade": "quantidade", "preco_unit_centavos": "CAST(ROUND(preco_unit * 100) AS INTEGER)"}),
+}
+
+# Triggers da migração 6 que usam pedidos.total: recriados abaixo com total_centavos
+_TRIGGERS_REDEFINIDOS_CENTAVOS = ("pedidos_metricas_ai", "pedidos_metricas_ad", "pedidos_metricas_au")
+
+
+def _sql_copia_centavos(tabela):
+    colunas = _TABELAS_CENTAVOS[tabela][1]
+    return (f"INSERT INTO {tabela}_nova ({', '.join(colunas)}) "
+            f"SELECT {', '.join(colunas.values())} FROM {tabela} WHERE id > ? ORDER BY id LIMIT ?")
+
+
+def _verificacao_centavos(conn, tabela):
+    """(linhas, maior id, soma em centavos) da tabela antiga e da nova, para conferir a cópia."""
+    colunas = _TABELAS_CENTAVOS[tabela][1]
+    destino, expressao = next((d, e) for d, e in colunas.items() if d.endswith("_centavos"))
+    antiga = conn.execute(f"SELECT COUNT(*), MAX(id), SUM({expressao}) FROM {tabela}").fetchone()
+    nova = conn.execute(f"SELECT COUNT(*), MAX(id), SUM({destino}) FROM {tabela}_nova").fetchone()
+    return antiga, nova
+
+
+def _copiar_para_centavos(conn, tamanho_lote=TAMANHO_LOTE_MIGRACAO):
+    """
+    Preparação da migração 7: copia produtos, pedidos e itens_pedido para as tabelas *_nova, já em
+    centavos, em lotes por id. Cada lote tem seu commit; uma nova execução continua do maior id já copiado.
+    """
+    for tabela, (sql_criacao, _) in _TABELAS_CENTAVOS.items():
+        conn.execute(sql_criacao.format(nome=f"{tabela}_nova"))
+        conn.commit()
+
+        sql_copia = _sql_copia_centavos(tabela)
+        for tentativa in range(2):
+            copiadas = conn.execute(f"SELECT COUNT(*) FROM {tabela}_nova").fetchone()[0]
+            if copiadas:
+                logging.info(f"Migração 7: retomando a cópia de '{tabela}' ({copiadas} linhas já convertidas).")
+
+            while True:
+                ultimo_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}_nova").fetchone()[0]
+                cursor = conn.execute(sql_copia, (ultimo_id, tamanho_lote))
+                conn.commit()
+                copiadas += cursor.rowcount
+                if cursor.rowcount < tamanho_lote:
+                    break
+                logging.info(f"Migração 7: {copiadas} linhas de '{tabela}' convertidas para centavos...")
+
+            antiga, nova = _verificacao_centavos(conn, tabela)
+            if antiga == nova:
+                break
+            # Linhas já copiadas foram alteradas ou excluídas fora da aplicação: recomeça a cópia da tabela
+            logging.warning(f"Migração 7: cópia de '{tabela}' divergente ({antiga} x {nova}); copiando novamente.")
+            conn.execute(f"DELETE FROM {tabela}_nova")
+            conn.commit()
+        else:
+            raise Error(f"a cópia de '{tabela}' para centavos não confere com a tabela original")
+
+
+def _migracao_centavos(cursor):
+    """
+    Colunas monetárias em centavos inteiros: produtos.preco_centavos, pedidos.total_centavos,
+    itens_pedido.preco_unit_centavos e metricas_mensais.receita_centavos (somas exatas, sem float).
+    Troca as tabelas preparadas por _copiar_para_centavos e recria índices e triggers.
+    """
+    tabelas = tuple(_TABELAS_CENTAVOS)
+    marcadores = ", ".join("?" * len(tabelas))
+
+    # Linhas inseridas depois da última execução de _copiar_para_centavos (ou todas, se ela não rodou)
+    for tabela, (sql_criacao, _) in _TABELAS_CENTAVOS.items():
+        cursor.execute(sql_criacao.format(nome=f"{tabela}_nova"))
+        ultimo_id = cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {tabela}_nova").fetchone()[0]
+        cursor.execute(_sql_copia_centavos(tabela), (ultimo_id, -1))
+
+    # Índices e triggers das tabelas antigas, recriados sobre as novas
+    esquema = cursor.execute(f"""
+        SELECT type, name, sql FROM sqlite_master
+        WHERE type IN ('index', 'trigger') AND tbl_name IN ({marcadores}) AND sql IS NOT NULL
+    """, tabelas).fetchall()
+    sequencias = cursor.execute(f"SELECT name, seq FROM sqlite_sequence WHERE name IN ({marcadores})",
+                                tabelas).fetchall()
+
+    # Triggers primeiro: o RENAME valida o esquema, e um trigger de pedidos cita itens_pedido (e vice-versa)
+    for tipo, nome, _ in esquema:
+        if tipo == "trigger":
+            cursor.execute(f"DROP TRIGGER {nome}")
+    # As chaves estrangeiras estão desligadas durante a troca (ver aplicar_migracoes)
+    for tabela in tabelas:
+        cursor.execute(f"DROP TABLE {tabela}")
+    for tabela in tabelas:
+        cursor.execute(f"ALTER TABLE {tabela}_nova RENAME TO {tabela}")
+
+    # AUTOINCREMENT: ids de registros já excluídos continuam sem reuso
+    for tabela, seq in sequencias:
+        cursor.execute("UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (seq, tabela))
+        if not cursor.rowcount:
+            cursor.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)", (tabela, seq))
+
+    for tipo, nome, sql in esquema:
+        if tipo == "index" or nome not in _TRIGGERS_REDEFINIDOS_CENTAVOS:
+            cursor.execute(sql)
+
+    cursor.execute("DROP TABLE IF EXISTS metricas_mensais")
+    _criar_metricas_mensais_centavos(cursor)
+    _recalcular_metricas_centavos(cursor)
+
+    violacoes = cursor.execute("PRAGMA foreign_key_check").fetchall()
+    if violacoes:
+        # Já existiam antes da migração (gravadas com as chaves estrangeiras desligadas): apenas registra
+        logging.warning(f"Migração 7: {len(violacoes)} referência(s) órfã(s) encontradas em PRAGMA foreign_key_check.")
+
+
+def _criar_metricas_mensais_centavos(cursor):
+    """metricas_mensais em centavos e os triggers de pedidos que a mantêm (migração 7 e bancos novos)."""
+    cursor.execute("""
+        CREATE TABLE metricas_mensais (
+            mes TEXT PRIMARY KEY,
+            num_pedidos INTEGER NOT NULL DEFAULT 0,
+            receita_centavos INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TRIGGER pedidos_metricas_ai AFTER INSERT ON pedidos BEGIN
+            INSERT INTO metricas_mensais (mes, num_pedidos, receita_centavos)
+                VALUES (substr(new.data, 1, 7), 1, new.total_centavos)
+                ON CONFLICT (mes) DO UPDATE SET num_pedidos = num_pedidos + 1,
+                    receita_centavos = receita_centavos + excluded.receita_centavos;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER pedidos_metricas_ad AFTER DELETE ON pedidos BEGIN
+            UPDATE metricas_mensais SET num_pedidos = num_pedidos - 1,
+                receita_centavos = receita_centavos - old.total_centavos
+            WHERE mes = substr(old.data, 1, 7);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER pedidos_metricas_au AFTER UPDATE OF data, total_centavos ON pedidos BEGIN
+            UPDATE metricas_mensais SET num_pedidos = num_pedidos - 1,
+                receita_centavos = receita_centavos - old.total_centavos
+            WHERE mes = substr(old.data, 1, 7);
+            INSERT INTO metricas_mensais (mes, num_pedidos, receita_centavos)
+                VALUES (substr(new.data, 1, 7), 1, new.total_centavos)
+                ON CONFLICT (mes) DO UPDATE SET num_pedidos = num_pedidos + 1,
+                    receita_centavos = receita_centavos + excluded.receita_centavos;
+        END
+    """)
+
+
+def _recalcular_metricas_centavos(cursor):
+    """Carga de metricas_mensais e metricas_totais no esquema em centavos (migração 7 em diante)."""
+    cursor.execute("DELETE FROM metricas_mensais")
+    cursor.execute("""
+        INSERT INTO metricas_mensais (mes, num_pedidos, receita_centavos)
+        SELECT substr(data, 1, 7), COUNT(*), SUM(total_centavos) FROM pedidos GROUP BY substr(data, 1, 7)
+    """)
+    cursor.execute("""
+        INSERT INTO metricas_totais (id, total_clientes) VALUES (1, (SELECT COUNT(*) FROM clientes))
+            ON CONFLICT (id) DO UPDATE SET total_clientes = excluded.total_clientes
+    """)
+
+
+def _migracao_cache_ia_em_arquivo(cursor):
+    """
+    O cache de IA passa a um arquivo próprio (ver utils/analise_ia.py): gravado no banco principal, cada
+    resposta mudava PRAGMA data_version e esvaziava o cache de leituras sem que os dados tivessem mudado.
+    """
+    cursor.execute("DROP TABLE IF EXISTS cache_ia")
+
+
+# (versão, descrição, função). Nunca altere uma migração já publicada: adicione uma nova ao final.
+MIGRACOES = [
+    (1, "Índices de pedidos.data, pedidos.cliente_id e itens_pedido.pedido_id", _migracao_indices_pedidos),
+    (2, "Índice NOCASE em produtos.nome", _migracao_indice_produtos_nome),
+    (3, "Busca textual FTS5 em clientes e produtos", _migracao_busca_textual),
+    (4, "Tabela cache_ia para respostas da análise de IA", _migracao_cache_ia),
+    (5, "Resumo vendas_diarias_produto para as análises locais", _migracao_vendas_diarias),
+    (6, "Tabelas metricas_mensais e metricas_totais para o Dashboard", _migracao_metricas_mensais),
+    (7, "Valores monetários em centavos (INTEGER)", _migracao_centavos),
+    (8, "Cache de IA em arquivo próprio (remove a tabela cache_ia)", _migracao_cache_ia_em_arquivo),
+]
+
+# Migrações que reconstroem tabelas: a preparação (cópia das linhas em lotes retomáveis) roda antes
+# da transação da migração, e ambas com as chaves estrangeiras desligadas, como recomenda o SQLite
+# (DROP TABLE com chaves ligadas excluiria em cascata os registros filhos).
+PREPARACOES_MIGRACOES = {
+    7: _copiar_para_centavos,
+}
+
+
+# Versão do esquema criado por _criar_esquema_atual: bancos novos já nascem nela e recebem só as migrações seguintes
+VERSAO_ESQUEMA_ATUAL = 8
+
+
+def _criar_esquema_atual(cursor):
+    """
+    Esquema da versão VERSAO_ESQUEMA_ATUAL para um banco novo (clientes já criada): as tabelas nascem em
+    centavos, em vez de criar o esquema original e reconstruí-lo em seguida na migração 7.
+    """
+    for tabela, (sql_criacao, _) in _TABELAS_CENTAVOS.items():
+        cursor.execute(sql_criacao.format(nome=tabela))
+
+    # Migrações 1 a 5 não dependem das colunas monetárias; 6 e 7 são substituídas pelas tabelas em centavos
+    # (a 4, cache_ia, é desfeita pela 8 e fica de fora)
+    for migracao in (_migracao_indices_pedidos, _migracao_indice_produtos_nome, _migracao_busca_textual,
+                     _migracao_vendas_diarias):
+        migracao(cursor)
+    _criar_metricas_totais(cursor)
+    _criar_metricas_mensais_centavos(cursor)
+    _recalcular_metricas_centavos(cursor)
+
+
+def obter_versao_esquema(conn):
+    """Retorna a versão atual do esquema gravada em PRAGMA user_version."""
+    return conn.execute("PRAGMA user_version;").fetchone()[0]
+
+
+def aplicar_migracoes(conn):
+    """
+    Aplica, em ordem, as migrações com versão maior que a do banco.
+    Cada migração roda em sua própria transação junto com a atualização de user_version,
+    então uma falha interrompe o processo sem deixar o esquema pela metade
+    (a preparação em lotes, quando existe, é retomada na próxima execução).
+    Retorna a versão final do esquema.
+    """
+    versao_atual = obter_versao_esquema(conn)
+    aplicadas = 0
+
+    for versao, descricao, migracao in MIGRACOES:
+        if versao <= versao_atual:
+            continue
+
+        preparacao = PREPARACOES_MIGRACOES.get(versao)
+        try:
+            if preparacao:
+                conn.execute("PRAGMA foreign_keys = OFF;")
+                preparacao(conn)
+            conn.execute("BEGIN")
+            migracao(conn.cursor())
+            conn.execute(f"PRAGMA user_version = {versao};")
+            conn.commit()
+        except Error as e:
+            conn.rollback()
+            logging.error(f"Erro na migração {versao} ({descricao}): {e}")
+            break
+        finally:
+            if preparacao:
+                conn.execute("PRAGMA foreign_keys = ON;")
+
+        versao_atual = versao
+        aplicadas += 1
+        logging.info(f"Migração {versao} aplicada: {descricao}")
+
+    if aplicadas:
+        # Atualiza as estatísticas do planejador para que os novos índices sejam escolhidos
+        conn.execute("ANALYZE;")
+        conn.commit()
+
+    return versao_atual
+
+
+def inicializar_db():
+    """Cria o esquema (já na versão atual, em um banco novo) e aplica as migrações pendentes."""
+    with obter_conexao() as conn:
+        if conn is None:
+            logging.error("Não foi possível estabelecer a conexão para inicialização do DB.")
+            return
+
         try:
             cursor = conn.cursor()
-            cursor.execute("PRAGMA foreign_keys = ON;")
 
             # Tabela CLIENTES
             cursor.execute("""
@@ -41,277 +936,555 @@ def inicializar_db():
                 );
             """)
 
-            # Tabela PRODUTOS
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS produtos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    nome TEXT UNIQUE NOT NULL,
-                    preco REAL NOT NULL,
-                    estoque INTEGER NOT NULL DEFAULT 0
-                );
-            """)
+            tabelas = {nome for (nome,) in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if obter_versao_esquema(conn) == 0 and not tabelas & set(_TABELAS_CENTAVOS):
+                conn.execute("BEGIN")
+                _criar_esquema_atual(cursor)
+                conn.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA_ATUAL};")
+                conn.commit()
+                logging.info(f"Banco novo criado no esquema v{VERSAO_ESQUEMA_ATUAL}.")
+            else:
+                # Bancos anteriores ao versionamento: esquema original, convertido pelas migrações
+                # Tabela PRODUTOS (esquema original; preco passa a preco_centavos na migração 7)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS produtos (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        nome TEXT UNIQUE NOT NULL,
+                        preco REAL NOT NULL,
+                        estoque INTEGER NOT NULL DEFAULT 0
+                    );
+                """)
 
-            # Tabela PEDIDOS
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS pedidos (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    cliente_id INTEGER NOT NULL,
-                    data TEXT NOT NULL,
-                    total REAL NOT NULL,
-                    FOREIGN KEY (cliente_id) REFERENCES clientes (id) ON DELETE CASCADE
-                );
-            """)
+                # Tabela PEDIDOS (total passa a total_centavos na migração 7)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS pedidos (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        cliente_id INTEGER NOT NULL,
+                        data TEXT NOT NULL,
+                        total REAL NOT NULL,
+                        FOREIGN KEY (cliente_id) REFERENCES clientes (id) ON DELETE CASCADE
+                    );
+                """)
 
-            # Tabela ITENS_PEDIDO
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS itens_pedido (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    pedido_id INTEGER NOT NULL,
-                    produto_id INTEGER,
-                    produto_nome TEXT NOT NULL,
-                    quantidade INTEGER NOT NULL,
-                    preco_unit REAL NOT NULL,
-                    FOREIGN KEY (pedido_id) REFERENCES pedidos (id) ON DELETE CASCADE,
-                    FOREIGN KEY (produto_id) REFERENCES produtos (id) ON DELETE SET NULL
-                );
-            """)
-            conn.commit()
-            logging.info("Banco de dados inicializado com sucesso.")
+                # Tabela ITENS_PEDIDO (preco_unit passa a preco_unit_centavos na migração 7)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS itens_pedido (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        pedido_id INTEGER NOT NULL,
+                        produto_id INTEGER,
+                        produto_nome TEXT NOT NULL,
+                        quantidade INTEGER NOT NULL,
+                        preco_unit REAL NOT NULL,
+                        FOREIGN KEY (pedido_id) REFERENCES pedidos (id) ON DELETE CASCADE,
+                        FOREIGN KEY (produto_id) REFERENCES produtos (id) ON DELETE SET NULL
+                    );
+                """)
+                conn.commit()
+
+            versao = aplicar_migracoes(conn)
+            _busca_fts.clear()  # As migrações podem ter criado as tabelas FTS5
+            logging.info(f"Banco de dados inicializado com sucesso (esquema v{versao}).")
+
+            pragmas = ", ".join(f"{k}={v}" for k, v in _perfil_aplicado["pragmas"].items()) or "padrões do SQLite"
+            logging.info(f"Perfil de desempenho do banco: '{_perfil_aplicado['nome']}' ({pragmas}).")
         except Error as e:
+            conn.rollback()
             logging.error(f"Erro ao criar tabelas: {e}")
             print(f"ERRO CRÍTICO NA CRIAÇÃO DE TABELAS: {e}")
-        finally:
-            conn.close()
-    else:
-        logging.error("Não foi possível estabelecer a conexão para inicialização do DB.")
 
 
+@cache_leitura
 def get_dashboard_metrics():
     """
-    Retorna métricas agregadas: Total de Clientes, Pedidos no Mês e Ticket Médio.
+    Retorna métricas agregadas: Total de Clientes, Pedidos no Mês e Ticket Médio (em centavos).
+    Lê uma única linha das tabelas de resumo mantidas por triggers (migrações 6 e 7).
     """
-    conn = criar_conexao()
-    if conn is None:
-        return None
+    with obter_conexao() as conn:
+        if conn is None:
+            return None
 
-    try:
-        cursor = conn.cursor()
-
-        # 1. Total de Clientes
-        cursor.execute("SELECT COUNT(id) FROM clientes")
-        total_clientes = cursor.fetchone()[0]
-
-        # Data de início do mês atual (formato YYYY-MM-01)
-        hoje = datetime.now()
-        primeiro_dia_mes = hoje.strftime("%Y-%m-01")
-
-        # 2. Total de Pedidos e Ticket Médio no Mês
-        sql_pedidos_mes = f"""
-            SELECT 
-                COUNT(id), 
-                AVG(total) 
-            FROM pedidos 
-            WHERE data >= '{primeiro_dia_mes}'
-        """
-        cursor.execute(sql_pedidos_mes)
-        pedidos_mes_data = cursor.fetchone()
-
-        total_pedidos_mes = pedidos_mes_data[0]
-        ticket_medio = pedidos_mes_data[1] if pedidos_mes_data[1] is not None else 0.0
+        try:
+            mes_atual = datetime.now().strftime("%Y-%m")
+            total_clientes, total_pedidos_mes, receita_mes_centavos = conn.execute("""
+                SELECT t.total_clientes, COALESCE(m.num_pedidos, 0), COALESCE(m.receita_centavos, 0)
+                FROM metricas_totais t
+                LEFT JOIN metricas_mensais m ON m.mes = ?
+                WHERE t.id = 1
+            """, (mes_atual,)).fetchone()
 
-        return {
-            "total_clientes": total_clientes,
-            "total_pedidos_mes": total_pedidos_mes,
-            "ticket_medio": ticket_medio
-        }
+            return {
+                "total_clientes": total_clientes,
+                "total_pedidos_mes": total_pedidos_mes,
+                "ticket_medio_centavos": dividir_centavos(receita_mes_centavos, total_pedidos_mes)
+            }
 
-    except Exception as e:
-        logging.error(f"Erro ao buscar métricas do Dashboard: {e}")
-        return None
+        except Exception as e:
+            logging.error(f"Erro ao buscar métricas do Dashboard: {e}")
+            return None
 
-    finally:
-        if conn:
-            conn.close()
 
+def montar_filtro_pedidos(data_inicio=None, data_fim=None, cliente_id=None, prefixo="p."):
+    """
+    Cláusula WHERE (ou "") e parâmetros dos filtros de pedidos: datas AAAA-MM-DD inclusivas e cliente
+    ("Todos" ou None = qualquer um). 'prefixo' qualifica as colunas data e cliente_id (ex.: "p.", ou ""
+    para a tabela sem alias).
+    """
+    condicoes = []
+    parametros = []
 
-def get_ultimos_pedidos_detalhados(limite=5):
+    if cliente_id is not None and cliente_id != "Todos":
+        condicoes.append(f"{prefixo}cliente_id = ?")
+        parametros.append(cliente_id)
+
+    if data_inicio:
+        condicoes.append(f"{prefixo}data >= ?")
+        parametros.append(data_inicio)
+
+    if data_fim:
+        condicoes.append(f"{prefixo}data <= ?")
+        parametros.append(data_fim)
+
+    where = (" WHERE " + " AND ".join(condicoes)) if condicoes else ""
+    return where, tuple(parametros)
+
+
+def buscar_pedidos_janela(limite=None, data_inicio=None, data_fim=None, cliente_id=None):
     """
-    Busca os últimos 'limite' pedidos com seus itens detalhados para análise de IA.
-    Retorna uma lista de dicionários detalhados.
+    Busca os últimos 'limite' PEDIDOS (não linhas de itens) com seus itens detalhados,
+    opcionalmente restritos a um intervalo de datas e a um cliente.
+    A janela de pedidos é selecionada em uma subconsulta; os itens são agrupados em uma única passada.
+    Retorna uma lista de dicionários, do pedido mais recente para o mais antigo.
     """
-    conn = criar_conexao()
-    if conn is None:
-        return []
+    # 1. Subconsulta que escolhe apenas os IDs dos pedidos da janela
+    where, parametros = montar_filtro_pedidos(data_inicio, data_fim, cliente_id, prefixo="")
+    parametros = list(parametros)
+    sql_janela = "SELECT id FROM pedidos" + where + " ORDER BY id DESC"
 
-    sql_base = f"""
+    if limite is not None:
+        sql_janela += " LIMIT ?"
+        parametros.append(int(limite))
+
+    sql = f"""
         SELECT 
             p.id, 
             c.nome AS cliente, 
             p.data, 
-            p.total,
+            p.total_centavos,
             i.id AS item_id,
             i.produto_nome,
             i.quantidade,
-            i.preco_unit
-        FROM pedidos p
+            i.preco_unit_centavos
+        FROM ({sql_janela}) janela
+        INNER JOIN pedidos p ON p.id = janela.id
         INNER JOIN clientes c ON p.cliente_id = c.id
         INNER JOIN itens_pedido i ON p.id = i.pedido_id
-        ORDER BY p.id DESC
-        LIMIT {limite}
+        ORDER BY p.id DESC, i.id
     """
 
     pedidos_agrupados = []
+    pedidos_por_id = {}  # Índice do agrupamento: busca O(1) por pedido
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql_base)
-
-        for row in cursor.fetchall():
-            (pedido_id, cliente, data, total, item_id, produto_nome, quantidade, preco_unit) = row
-
-            # Encontrar o índice do pedido (agrupamento)
-            try:
-                pedido_idx = [i for i, p in enumerate(pedidos_agrupados) if p['id'] == pedido_id][0]
-            except IndexError:
-                # Pedido novo
-                pedido_idx = len(pedidos_agrupados)
-                pedidos_agrupados.append({
-                    'id': pedido_id,
-                    'cliente': cliente,
-                    'data': data,
-                    'total': total,
-                    'itens': []
-                })
+    with obter_conexao() as conn:
+        if conn is None:
+            return []
 
-            # Adicionar o item
-            pedidos_agrupados[pedido_idx]['itens'].append({
-                'id': item_id,
-                'produto_nome': produto_nome,
-                'quantidade': quantidade,
-                'preco_unit': preco_unit
-            })
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(parametros))
 
-        return pedidos_agrupados
+            for row in cursor:
+                (pedido_id, cliente, data, total_centavos, item_id, produto_nome, quantidade,
+                 preco_unit_centavos) = row
 
-    except Error as e:
-        logging.error(f"Erro ao buscar últimos pedidos para análise de IA: {e}")
-        return []
-    finally:
-        if conn:
-            conn.close()
+                pedido = pedidos_por_id.get(pedido_id)
+                if pedido is None:
+                    # Pedido novo
+                    pedido = {
+                        'id': pedido_id,
+                        'cliente': cliente,
+                        'data': data,
+                        'total_centavos': total_centavos,
+                        'itens': []
+                    }
+                    pedidos_por_id[pedido_id] = pedido
+                    pedidos_agrupados.append(pedido)
+
+                # Adicionar o item
+                pedido['itens'].append({
+                    'id': item_id,
+                    'produto_nome': produto_nome,
+                    'quantidade': quantidade,
+                    'preco_unit_centavos': preco_unit_centavos
+                })
 
+            return pedidos_agrupados
 
-def buscar_pedidos_relatorio(data_inicio=None, data_fim=None, cliente_id=None):
+        except Error as e:
+            logging.error(f"Erro ao buscar janela de pedidos: {e}")
+            return []
+
+
+@cache_leitura
+def get_ultimos_pedidos_detalhados(limite=5):
     """
-    Busca pedidos e seus itens detalhados com filtros de data e cliente (MÉTODO PARA RELATÓRIOS).
-    Retorna um dicionário: {pedido_id: {cliente: '...', data: '...', total: 100.0, itens: [...]}}
+    Busca os últimos 'limite' pedidos com seus itens detalhados para análise de IA.
+    Retorna uma lista de dicionários detalhados.
     """
-    conn = criar_conexao()
-    if conn is None:
-        return None
+    return buscar_pedidos_janela(limite=limite)
+
 
+_FROM_RELATORIO = """
+        FROM pedidos p
+        INNER JOIN clientes c ON p.cliente_id = c.id
+        INNER JOIN itens_pedido i ON p.id = i.pedido_id
+"""
+
+
+def _montar_sql_relatorio(data_inicio=None, data_fim=None, cliente_id=None):
+    """Monta o SQL (um item por linha, agrupado por pedido) e os parâmetros dos filtros de relatório."""
     sql = """
         SELECT 
             p.id AS pedido_id, 
             c.nome AS cliente_nome, 
             p.data AS data_pedido, 
-            p.total AS total_pedido,
+            p.total_centavos AS total_pedido_centavos,
             i.id AS item_id,
             i.produto_nome AS item_nome,
             i.quantidade AS item_quantidade,
-            i.preco_unit AS item_preco_unit
-        FROM pedidos p
-        INNER JOIN clientes c ON p.cliente_id = c.id
-        INNER JOIN itens_pedido i ON p.id = i.pedido_id
-    """
+            i.preco_unit_centavos AS item_preco_unit_centavos
+    """ + _FROM_RELATORIO
 
-    # 1. Construir a cláusula WHERE
-    condicoes = []
-    parametros = []
+    where, parametros = montar_filtro_pedidos(data_inicio, data_fim, cliente_id)
+    sql += where
 
-    if cliente_id is not None and cliente_id != "Todos":
-        condicoes.append("c.id = ?")
-        parametros.append(cliente_id)
+    # p.id como desempate garante que os itens de um mesmo pedido cheguem em sequência
+    sql += " ORDER BY p.data DESC, p.id DESC"
+    return sql, parametros
 
-    if data_inicio:
-        condicoes.append("p.data >= ?")
-        parametros.append(data_inicio)
 
-    if data_fim:
-        condicoes.append("p.data <= ?")
-        parametros.append(data_fim)
+def contar_linhas_relatorio(data_inicio=None, data_fim=None, cliente_id=None):
+    """Número de linhas (itens) do relatório com esses filtros, para a barra de progresso das exportações."""
+    where, parametros = montar_filtro_pedidos(data_inicio, data_fim, cliente_id)
+    resultado = executar_comando("SELECT COUNT(*)" + _FROM_RELATORIO + where, parametros, fetchone=True)
+    return resultado[0] if resultado else 0
 
-    if condicoes:
-        sql += " WHERE " + " AND ".join(condicoes)
 
-    sql += " ORDER BY p.data DESC, p.id DESC"
+def iterar_linhas_relatorio(data_inicio=None, data_fim=None, cliente_id=None, tamanho_lote=2000):
+    """
+    Linhas do relatório direto do cursor, em lotes de fetchmany: tuplas (pedido_id, cliente, data,
+    total_centavos, item_id, produto_nome, quantidade, preco_unit_centavos), um item por linha.
+    Erros do banco são propagados (um arquivo truncado não pode parecer completo).
+    """
+    sql, parametros = _montar_sql_relatorio(data_inicio, data_fim, cliente_id)
 
-    pedidos_agrupados = {}
+    with obter_conexao() as conn:
+        if conn is None:
+            raise Error("não foi possível conectar ao banco de dados")
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, tuple(parametros))
+        cursor = conn.execute(sql, parametros)
+        try:
+            while True:
+                lote = cursor.fetchmany(tamanho_lote)
+                if not lote:
+                    break
+                yield lote
+        finally:
+            cursor.close()
+
+
+def iterar_pedidos_relatorio(data_inicio=None, data_fim=None, cliente_id=None, tamanho_lote=500):
+    """
+    Versão em streaming de buscar_pedidos_relatorio: lê o cursor com fetchmany e produz
+    um pedido completo por vez, como tuplas (pedido_id, {cliente, data, total_centavos, itens}).
+    O uso de memória não depende do intervalo de datas. Erros do banco são propagados: a listagem
+    e as exportações não podem exibir um relatório truncado como se estivesse completo.
+    """
+    pedido_id_atual = None
+    pedido_atual = None
 
-        # Mapeamento para agrupar itens por pedido
-        for row in cursor.fetchall():
+    for lote in iterar_linhas_relatorio(data_inicio, data_fim, cliente_id, tamanho_lote):
+        for row in lote:
             pedido_id = row[0]
 
-            if pedido_id not in pedidos_agrupados:
-                pedidos_agrupados[pedido_id] = {
+            if pedido_id != pedido_id_atual:
+                # Pedido anterior está completo: entrega e começa o próximo
+                if pedido_atual is not None:
+                    yield pedido_id_atual, pedido_atual
+
+                pedido_id_atual = pedido_id
+                pedido_atual = {
                     'cliente': row[1],
                     'data': row[2],
-                    'total': row[3],
+                    'total_centavos': row[3],
                     'itens': []
                 }
 
             # Adiciona o item ao pedido
-            pedidos_agrupados[pedido_id]['itens'].append({
+            pedido_atual['itens'].append({
                 'id': row[4],
                 'nome': row[5],
                 'quantidade': row[6],
-                'preco_unit': row[7]
+                'preco_unit_centavos': row[7]
             })
 
-        return pedidos_agrupados
+    if pedido_atual is not None:
+        yield pedido_id_atual, pedido_atual
 
+
+@cache_leitura
+def buscar_pedidos_relatorio(data_inicio=None, data_fim=None, cliente_id=None):
+    """
+    Busca pedidos e seus itens detalhados com filtros de data e cliente (MÉTODO PARA RELATÓRIOS).
+    Retorna um dicionário: {pedido_id: {cliente: '...', data: '...', total_centavos: 10000, itens: [...]}},
+    ou None em caso de erro (uma leitura interrompida não chega ao cache como se estivesse completa).
+    Para intervalos grandes, prefira iterar_pedidos_relatorio (memória constante).
+    """
+    try:
+        return dict(iterar_pedidos_relatorio(data_inicio, data_fim, cliente_id))
     except Error as e:
         logging.error(f"Erro ao buscar pedidos detalhados para relatório: {e}")
-        return {}
-    finally:
-        if conn:
-            conn.close()
+        return None
+
+
+def buscar_pagina_pedidos(apos=None, tamanho=200):
+    """
+    Busca uma página da lista de pedidos (mais recentes primeiro) por paginação keyset em (data, id).
+    'apos' é o cursor (data, id) devolvido pela página anterior (None para a primeira página).
+    O custo de cada página independe da quantidade total de pedidos (usa idx_pedidos_data).
+    Retorna (linhas, proximo_cursor); proximo_cursor é None quando não há mais páginas.
+    """
+    sql = """
+        SELECT 
+            p.id, 
+            c.nome, 
+            p.data, 
+            p.total_centavos 
+        FROM pedidos p
+        INNER JOIN clientes c ON p.cliente_id = c.id
+    """
+    parametros = []
+
+    if apos is not None:
+        sql += " WHERE (p.data, p.id) < (?, ?)"
+        parametros.extend(apos)
+
+    sql += " ORDER BY p.data DESC, p.id DESC LIMIT ?"
+    parametros.append(int(tamanho))
+
+    with obter_conexao() as conn:
+        if conn is None:
+            return [], None
+
+        try:
+            linhas = conn.execute(sql, tuple(parametros)).fetchall()
+        except Error as e:
+            logging.error(f"Erro ao buscar página de pedidos: {e}")
+            return [], None
+
+    proximo_cursor = None
+    if len(linhas) == tamanho:
+        ultima = linhas[-1]
+        proximo_cursor = (ultima[2], ultima[0])
+
+    return linhas, proximo_cursor
+
+
+_busca_fts = {}  # {(arquivo do banco, tabela): bool} - se a tabela FTS5 existe (limpo em inicializar_db/fechar_conexoes)
+
+
+def _usa_fts(conn, db_file, tabela):
+    chave = (os.path.abspath(db_file), tabela)
+    if chave not in _busca_fts:
+        existe = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                              (f"{tabela}_fts",)).fetchone()
+        _busca_fts[chave] = existe is not None
+    return _busca_fts[chave]
+
+
+def _termo_fts(termo):
+    """Converte o texto digitado em consulta FTS5 por prefixo: 'joão sil' -> '"joão"* "sil"*'."""
+    palavras = re.findall(r"\w+", termo)
+    return " ".join(f'"{p}"*' for p in palavras)
+
+
+def _buscar_textual(tabela, colunas_sql, colunas_like, pesos, termo, limite):
+    """
+    Busca em 'tabela' por prefixo via FTS5 (sem acentos, ordenada por relevância bm25).
+    Sem termo, lista por ID; sem FTS5 no SQLite, recorre a LIKE '%termo%'.
+    """
+    limite = int(limite)
+    consulta_fts = _termo_fts(termo) if termo else ""
+    db_file = DATABASE_NAME
+
+    with obter_conexao(db_file) as conn:
+        if conn is None:
+            return []
+
+        try:
+            if not termo:
+                sql = f"SELECT {colunas_sql} FROM {tabela} ORDER BY id LIMIT ?"
+                return conn.execute(sql, (limite,)).fetchall()
+
+            if consulta_fts and _usa_fts(conn, db_file, tabela):
+                colunas_t = ", ".join(f"t.{c.strip()}" for c in colunas_sql.split(","))
+                sql = f"""
+                    SELECT {colunas_t}
+                    FROM {tabela}_fts f
+                    INNER JOIN {tabela} t ON t.id = f.rowid
+                    WHERE {tabela}_fts MATCH ?
+                    ORDER BY bm25({tabela}_fts, {pesos})
+                    LIMIT ?
+                """
+                return conn.execute(sql, (consulta_fts, limite)).fetchall()
+
+            # Fallback: varredura com LIKE (SQLite sem FTS5 ou termo sem palavras)
+            where = " OR ".join(f"{c} LIKE ?" for c in colunas_like)
+            sql = f"SELECT {colunas_sql} FROM {tabela} WHERE {where} ORDER BY id LIMIT ?"
+            parametros = tuple(f'%{termo}%' for _ in colunas_like) + (limite,)
+            return conn.execute(sql, parametros).fetchall()
+
+        except Error as e:
+            logging.error(f"Erro na busca de {tabela}: {e}")
+            return []
+
+
+def buscar_clientes(termo="", limite=200):
+    """Busca clientes por nome, e-mail ou telefone para a aba Clientes, retornando no máximo 'limite' linhas."""
+    return _buscar_textual("clientes", "id, nome, email, telefone", ("nome", "email", "telefone"),
+                           "10.0, 5.0, 1.0", termo, limite)
+
+
+def buscar_produtos(termo="", limite=200):
+    """Busca produtos por nome para a aba Produtos, retornando no máximo 'limite' linhas."""
+    return _buscar_textual("produtos", "id, nome, preco_centavos, estoque", ("nome",), "1.0", termo, limite)
+
+
+@cache_leitura
+def listar_clientes_nomes():
+    """(id, nome) de todos os clientes, em ordem alfabética (comboboxes de pedidos e relatórios)."""
+    return executar_comando("SELECT id, nome FROM clientes ORDER BY nome", fetchall=True)
+
+
+@cache_leitura
+def listar_produtos_precos():
+    """(id, nome, preco_centavos) de todos os produtos, em ordem alfabética (combobox de itens do pedido)."""
+    return executar_comando("SELECT id, nome, preco_centavos FROM produtos ORDER BY nome", fetchall=True)
+
+
+class EstoqueInsuficiente(ValueError):
+    """Pedido recusado por falta de estoque. faltas: [(produto_nome, quantidade pedida, disponível ou None)]."""
+
+    def __init__(self, faltas):
+        self.faltas = faltas
+        linhas = []
+        for produto_nome, quantidade, disponivel in faltas:
+            if disponivel is None:
+                linhas.append(f"- {produto_nome}: produto não está mais cadastrado")
+            else:
+                linhas.append(f"- {produto_nome}: pedido {quantidade}, disponível {disponivel}")
+        super().__init__("Estoque insuficiente para:\n" + "\n".join(linhas))
+
+
+def registrar_pedido(cliente_id, data, itens):
+    """
+    Grava o pedido e seus itens e baixa o estoque em uma única transação.
+
+    itens: [(produto_id ou None, produto_nome, quantidade, preco_unit_centavos)]; itens sem produto_id
+    (avulsos) não movimentam estoque.
+
+    BEGIN IMMEDIATE reserva a escrita antes da primeira leitura, e cada baixa é um UPDATE condicional
+    (WHERE estoque >= ?): dois terminais vendendo o mesmo produto ao mesmo tempo não deixam o estoque
+    negativo. Se faltar estoque de algum produto, nada é gravado e EstoqueInsuficiente lista todos eles.
+    Retorna o id do pedido, ou None se não for possível conectar; outros erros do banco são propagados.
+    """
+    # Quantidade total por produto (o mesmo produto pode aparecer em mais de um item)
+    baixas = {}
+    for produto_id, produto_nome, quantidade, _ in itens:
+        if produto_id is not None:
+            nome, total = baixas.get(produto_id, (produto_nome, 0))
+            baixas[produto_id] = (nome, total + quantidade)
+    total_centavos = sum(quantidade * preco_unit_centavos for _, _, quantidade, preco_unit_centavos in itens)
+
+    with obter_conexao() as conn:
+        if conn is None:
+            return None
+
+        try:
+            _iniciar_escrita(conn)
+            cursor = conn.cursor()
+
+            faltas = []
+            for produto_id, (produto_nome, quantidade) in baixas.items():
+                cursor.execute("UPDATE produtos SET estoque = estoque - ? WHERE id = ? AND estoque >= ?",
+                               (quantidade, produto_id, quantidade))
+                if cursor.rowcount == 0:
+                    atual = cursor.execute("SELECT estoque FROM produtos WHERE id = ?", (produto_id,)).fetchone()
+                    faltas.append((produto_nome, quantidade, atual[0] if atual else None))
+            if faltas:
+                raise EstoqueInsuficiente(faltas)
+
+            cursor.execute("INSERT INTO pedidos (cliente_id, data, total_centavos) VALUES (?, ?, ?)",
+                           (cliente_id, data, total_centavos))
+            pedido_id = cursor.lastrowid
+            cursor.executemany(
+                "INSERT INTO itens_pedido (pedido_id, produto_id, produto_nome, quantidade, preco_unit_centavos) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(pedido_id, produto_id, produto_nome, quantidade, preco_unit_centavos)
+                 for produto_id, produto_nome, quantidade, preco_unit_centavos in itens])
+
+            conn.commit()
+        except (Error, EstoqueInsuficiente):
+            conn.rollback()
+            raise
+
+    registrar_escrita()
+    return pedido_id
 
 
 def executar_comando(sql, parametros=(), fetchone=False, fetchall=False, commit=True):
     """
     Executa comandos SQL (SELECT, INSERT, UPDATE, DELETE) parametrizados.
     """
-    conn = criar_conexao()
     resultado = None
-    if conn is None:
-        return None
 
-    try:
-        cursor = conn.cursor()
-        cursor.execute(sql, parametros)
-
-        if fetchone:
-            resultado = cursor.fetchone()
-        elif fetchall:
-            resultado = cursor.fetchall()
-        elif commit:
-            conn.commit()
-            if sql.strip().upper().startswith("INSERT"):
-                resultado = cursor.lastrowid
+    with obter_conexao() as conn:
+        if conn is None:
+            return None
 
-    except sqlite3.IntegrityError as e:
-        logging.warning(f"Erro de Integridade no DB: {e}. SQL: {sql}")
-        resultado = "IntegrityError"
-        if commit: conn.rollback()
-    except Error as e:
-        logging.error(f"Erro ao executar comando SQL: {e}. SQL: {sql} - Params: {parametros}")
-        if commit: conn.rollback()
-    finally:
-        if conn:
-            conn.close()
-    return resultado
\ No newline at end of file
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, parametros)
+
+            if fetchone:
+                resultado = cursor.fetchone()
+            elif fetchall:
+                resultado = cursor.fetchall()
+            elif commit:
+                conn.commit()
+                registrar_escrita()
+                if sql.strip().upper().startswith("INSERT"):
+                    resultado = cursor.lastrowid
+
+        except sqlite3.IntegrityError as e:
+            logging.warning(f"Erro de Integridade no DB: {e}. SQL: {sql}")
+            resultado = "IntegrityError"
+            if commit: conn.rollback()
+        except Error as e:
+            logging.error(f"Erro ao executar comando SQL: {e}. SQL: {sql} - Params: {parametros}")
+            if commit: conn.rollback()
+    return resultado
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manutenção do banco de dados de pedidos.")
+    parser.add_argument("comando", choices=["reconstruir-resumos"],
+                        help="reconstruir-resumos: recalcula as tabelas de métricas e de vendas diárias")
+    args = parser.parse_args()
+
+    inicializar_db()
+    if args.comando == "reconstruir-resumos":
+        sucesso = reconstruir_resumos()
+        fechar_conexoes()
+        raise SystemExit(0 if sucesso else 1)
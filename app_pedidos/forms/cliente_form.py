@@ -5,9 +5,11 @@ from db import executar_comando
 from utils.validations import validar_nome, validar_email, validar_telefone
 # NOVO:
 from utils.log_manager import registrar_acao
+from utils.medicao import medido
 
 
 class ClienteForm(tk.Toplevel):
+    @medido()
     def __init__(self, parent, cliente_id=None, recarregar_callback=None):
         super().__init__(parent)
         self.transient(parent)  # Faz a janela ser dependente da principal
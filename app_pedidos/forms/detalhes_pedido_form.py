@@ -2,12 +2,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from db import executar_comando
+from utils.dinheiro import formatar_centavos
+from utils.medicao import medido
 import logging
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
 class DetalhesPedidoForm(tk.Toplevel):
+    @medido()
     def __init__(self, parent, pedido_id):
         super().__init__(parent)
         self.transient(parent)
@@ -31,7 +34,7 @@ class DetalhesPedidoForm(tk.Toplevel):
     def _carregar_dados_principais(self):
         """Busca ID, Cliente e Total para exibir no cabeçalho."""
         sql = """
-            SELECT p.id, c.nome, p.data, p.total
+            SELECT p.id, c.nome, p.data, p.total_centavos
             FROM pedidos p
             INNER JOIN clientes c ON p.cliente_id = c.id
             WHERE p.id = ?
@@ -43,14 +46,13 @@ class DetalhesPedidoForm(tk.Toplevel):
         frame.pack(fill="both", expand=True)
 
         # Cabeçalho
-        pedido_id, nome_cliente, data, total = self.dados_pedido
+        pedido_id, nome_cliente, data, total_centavos = self.dados_pedido
 
         ttk.Label(frame, text=f"Pedido: #{pedido_id}", font=('Arial', 14, 'bold')).pack(anchor='w', pady=(0, 5))
         ttk.Label(frame, text=f"Cliente: {nome_cliente}").pack(anchor='w')
         ttk.Label(frame, text=f"Data: {data}").pack(anchor='w')
-        ttk.Label(frame, text=f"TOTAL: R$ {total:.2f}", font=('Arial', 12, 'bold'), foreground='green').pack(anchor='e',
-                                                                                                             pady=(
-                                                                                                             5, 15))
+        ttk.Label(frame, text=f"TOTAL: R$ {formatar_centavos(total_centavos, '.')}", font=('Arial', 12, 'bold'),
+                  foreground='green').pack(anchor='e', pady=(5, 15))
 
         ttk.Label(frame, text="ITENS DO PEDIDO:", font=('Arial', 10, 'bold')).pack(anchor='w', pady=(5, 0))
 
@@ -83,7 +85,7 @@ class DetalhesPedidoForm(tk.Toplevel):
             SELECT 
                 produto_nome, 
                 quantidade, 
-                preco_unit 
+                preco_unit_centavos 
             FROM itens_pedido 
             WHERE pedido_id = ?
         """
@@ -91,11 +93,12 @@ class DetalhesPedidoForm(tk.Toplevel):
         try:
             itens = executar_comando(sql, (self.pedido_id,), fetchall=True)
             if itens:
-                for nome, qtd, preco_unit in itens:
-                    subtotal = qtd * preco_unit
+                for nome, qtd, preco_unit_centavos in itens:
+                    subtotal_centavos = qtd * preco_unit_centavos
 
                     self.tree_itens.insert("", "end",
-                                           values=(nome, qtd, f"{preco_unit:.2f}", f"{subtotal:.2f}"))
+                                           values=(nome, qtd, formatar_centavos(preco_unit_centavos, "."),
+                                                   formatar_centavos(subtotal_centavos, ".")))
             else:
                 self.tree_itens.insert("", "end", values=("Nenhum item encontrado", "", "", ""), tags=('empty',))
 
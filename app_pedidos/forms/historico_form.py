@@ -2,9 +2,11 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 from utils.log_manager import ler_historico, limpar_arquivo_log
+from utils.medicao import medido
 
 
 class HistoricoForm(tk.Toplevel):
+    @medido()
     def __init__(self, parent):
         super().__init__(parent)
         self.title("Histórico de Ações do Sistema")
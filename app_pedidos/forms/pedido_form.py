@@ -3,15 +3,19 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
 import logging
-from db import criar_conexao, Error, executar_comando  # Importação de Error para tratamento de exceções
+from db import Error, EstoqueInsuficiente, registrar_pedido, listar_clientes_nomes, listar_produtos_precos
 # NOVO:
 from utils.log_manager import registrar_acao
+from utils.treeview_sincronizada import TreeviewSincronizada
+from utils.dinheiro import para_centavos, formatar_centavos
+from utils.medicao import medido
 
 # Configuração de logging, se não for centralizada no db.py
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
 class PedidoForm(tk.Toplevel):
+    @medido()
     def __init__(self, parent, recarregar_callback=None):
         super().__init__(parent)
         self.transient(parent)
@@ -21,18 +25,28 @@ class PedidoForm(tk.Toplevel):
         self.title("Novo Pedido")
         self.protocol("WM_DELETE_WINDOW", self._on_fechar)
 
-        # Dados: (produto_id, produto_nome, qtd, preco_unit)
+        # Dados: (produto_id, produto_nome, qtd, preco_unit_centavos)
         self.itens_pedido = []
         self.clientes_map = {}  # {nome: id}
-        self.produtos_map = {}  # {nome: (id, preco)}
+        self.produtos_map = {}  # {nome: (id, preco_centavos)}
         self.dados_salvos = True
 
         self.setup_ui()
         self._carregar_dados_iniciais()
 
     def _carregar_dados_iniciais(self):
-        self._carregar_clientes_combobox()
-        self._carregar_produtos_combobox()
+        """As listas dos comboboxes são lidas no ExecutorDB do App: a janela abre sem esperar o banco."""
+        executor = self.parent.executor_db
+        executor.submeter(listar_clientes_nomes, ao_concluir=self._carregar_clientes_combobox,
+                          ao_erro=self._erro_carregamento)
+        executor.submeter(listar_produtos_precos, ao_concluir=self._carregar_produtos_combobox,
+                          ao_erro=self._erro_carregamento)
+
+    def _erro_carregamento(self, erro):
+        if not self.winfo_exists():
+            return
+        logging.error(f"Erro ao carregar clientes/produtos do pedido: {erro}")
+        messagebox.showerror("Erro de DB", f"Não foi possível carregar clientes e produtos: {erro}", parent=self)
 
     def setup_ui(self):
         frame = ttk.Frame(self, padding="15")
@@ -79,6 +93,7 @@ class PedidoForm(tk.Toplevel):
         self.tree_itens = ttk.Treeview(list_frame,
                                        columns=("Produto ID", "Produto", "Quantidade", "Preço Unit.", "Subtotal"),
                                        show="headings")
+        self.sincronizador_itens = TreeviewSincronizada(self.tree_itens)
         self.tree_itens.heading("Produto ID", text="ID", anchor="center")
         self.tree_itens.heading("Produto", text="Produto")
         self.tree_itens.heading("Quantidade", text="Qtd", anchor="center")
@@ -119,10 +134,10 @@ class PedidoForm(tk.Toplevel):
             side="left", padx=10)
         ttk.Button(button_frame, text="Cancelar", command=self._on_fechar).pack(side="left", padx=10)
 
-    def _carregar_clientes_combobox(self):
-        """Carrega clientes no Combobox."""
-        sql = "SELECT id, nome FROM clientes ORDER BY nome"
-        clientes = executar_comando(sql, fetchall=True)
+    def _carregar_clientes_combobox(self, clientes):
+        """Carrega no Combobox os clientes lidos pelo executor (chamado na thread do Tk)."""
+        if not self.winfo_exists():
+            return
         nomes_clientes = []
         if clientes:
             for id_c, nome in clientes:
@@ -136,15 +151,15 @@ class PedidoForm(tk.Toplevel):
             # Não fecha, mas impede a criação do pedido se não houver cliente
             messagebox.showwarning("Aviso", "Nenhum cliente cadastrado. Cadastre um cliente primeiro.")
 
-    def _carregar_produtos_combobox(self):
-        """Carrega produtos no Combobox e mapeia ID/Preço."""
-        sql = "SELECT id, nome, preco FROM produtos ORDER BY nome"
-        produtos = executar_comando(sql, fetchall=True)
+    def _carregar_produtos_combobox(self, produtos):
+        """Carrega no Combobox os produtos lidos pelo executor e mapeia ID/Preço."""
+        if not self.winfo_exists():
+            return
         nomes_produtos = []
         self.produtos_map = {}
         if produtos:
-            for id_p, nome, preco in produtos:
-                self.produtos_map[nome] = (id_p, preco)
+            for id_p, nome, preco_centavos in produtos:
+                self.produtos_map[nome] = (id_p, preco_centavos)
                 nomes_produtos.append(nome)
 
         self.cb_produto['values'] = nomes_produtos
@@ -154,14 +169,14 @@ class PedidoForm(tk.Toplevel):
         """Preenche o campo de preço ao selecionar um produto."""
         produto_nome = self.var_produto_selecionado.get()
         if produto_nome in self.produtos_map:
-            _, preco = self.produtos_map[produto_nome]
-            self.var_preco_unit.set(f"{preco:.2f}")
+            _, preco_centavos = self.produtos_map[produto_nome]
+            self.var_preco_unit.set(formatar_centavos(preco_centavos, "."))
         else:
             self.var_preco_unit.set("0.00")
 
     def _validar_item(self, produto_nome, quantidade_str, preco_str):
         """Valida os campos de um item antes de adicionar."""
-        produto_data = self.produtos_map.get(produto_nome)  # (id, preco) ou None
+        produto_data = self.produtos_map.get(produto_nome)  # (id, preco_centavos) ou None
 
         if not produto_nome.strip():
             # Permite item customizado se o campo de preço for preenchido manualmente
@@ -180,12 +195,12 @@ class PedidoForm(tk.Toplevel):
 
         try:
             # O preço é lido do campo Entry, que pode ter sido preenchido automaticamente ou editado
-            preco_unit = float(preco_str.replace(',', '.'))
-            if preco_unit <= 0: return False, "Preço unitário deve ser um número positivo."
+            preco_unit_centavos = para_centavos(preco_str)
+            if preco_unit_centavos <= 0: return False, "Preço unitário deve ser um número positivo."
         except ValueError:
             return False, "Preço unitário deve ser um número decimal válido."
 
-        return True, (produto_id, produto_nome.strip(), quantidade, preco_unit)
+        return True, (produto_id, produto_nome.strip(), quantidade, preco_unit_centavos)
 
     def _adicionar_item(self):
         """Adiciona um item à lista e atualiza a Treeview."""
@@ -199,9 +214,9 @@ class PedidoForm(tk.Toplevel):
             messagebox.showwarning("Erro de Item", resultado)
             return
 
-        produto_id, produto_nome_final, quantidade, preco_unit = resultado
+        produto_id, produto_nome_final, quantidade, preco_unit_centavos = resultado
 
-        self.itens_pedido.append((produto_id, produto_nome_final, quantidade, preco_unit))
+        self.itens_pedido.append((produto_id, produto_nome_final, quantidade, preco_unit_centavos))
         self._atualizar_lista_e_total()
         self.dados_salvos = False
 
@@ -228,110 +243,59 @@ class PedidoForm(tk.Toplevel):
             messagebox.showerror("Erro", "Falha ao remover item.")
 
     def _calcular_total(self):
-        """Calcula o total do pedido."""
-        # item: (produto_id, produto_nome, qtd, preco_unit)
-        total = sum(qtd * preco for _, _, qtd, preco in self.itens_pedido)
-        return total
+        """Calcula o total do pedido, em centavos (soma exata)."""
+        # item: (produto_id, produto_nome, qtd, preco_unit_centavos)
+        return sum(qtd * preco_centavos for _, _, qtd, preco_centavos in self.itens_pedido)
 
     def _atualizar_lista_e_total(self):
-        """Recarrega a Treeview de itens e atualiza o total."""
-        for item in self.tree_itens.get_children():
-            self.tree_itens.delete(item)
-
-        total = 0.0
-        # item: (produto_id, produto_nome, qtd, preco_unit)
-        for i, (p_id, p_nome, quantidade, preco_unit) in enumerate(self.itens_pedido):
-            subtotal = quantidade * preco_unit
-            total += subtotal
+        """Atualiza a Treeview de itens (só as linhas que mudaram) e o total."""
+        total_centavos = 0
+        linhas = []
+        # item: (produto_id, produto_nome, qtd, preco_unit_centavos)
+        for i, (p_id, p_nome, quantidade, preco_unit_centavos) in enumerate(self.itens_pedido):
+            subtotal_centavos = quantidade * preco_unit_centavos
+            total_centavos += subtotal_centavos
 
             # Use o índice 'i' como iid para facilitar a remoção
-            self.tree_itens.insert("", "end", iid=i,
-                                   values=(
-                                   p_id if p_id is not None else "CUST", p_nome, quantidade, f"{preco_unit:.2f}",
-                                   f"{subtotal:.2f}"),
-                                   tags=('data',))
+            linhas.append((i, (p_id if p_id is not None else "CUST", p_nome, quantidade,
+                               formatar_centavos(preco_unit_centavos, "."), formatar_centavos(subtotal_centavos, ".")),
+                           ('data',)))
 
-        self.var_total.set(f"{total:.2f}")
+        self.sincronizador_itens.atualizar(linhas)
+        self.var_total.set(formatar_centavos(total_centavos, "."))
 
     def _salvar_pedido(self):
         """Salva o Pedido e seus Itens de forma transacional (Lógica Corrigida)."""
         nome_cliente = self.var_cliente.get()
         cliente_id = self.clientes_map.get(nome_cliente)
         data = self.var_data.get()
-        total = self._calcular_total()
+        total_centavos = self._calcular_total()
 
-        if not cliente_id or not self.itens_pedido or not total > 0:
+        if not cliente_id or not self.itens_pedido or not total_centavos > 0:
             messagebox.showwarning("Erro", "Cliente, itens e total do pedido são obrigatórios.")
             return
 
-        conn = criar_conexao()
-        if conn is None:
-            messagebox.showerror("Erro de DB", "Não foi possível conectar ao banco de dados.")
-            return
-
         try:
-            # Inicia a Transação
-            cursor = conn.cursor()
-
-            # 1. Salvar na tabela PEDIDOS (e capturar o ID)
-            sql_pedido = "INSERT INTO pedidos (cliente_id, data, total) VALUES (?, ?, ?)"
-            cursor.execute(sql_pedido, (cliente_id, data, total))
-            pedido_id = cursor.lastrowid  # CRÍTICO: Capturar o ID
-
-            # 2. Salvar na tabela ITENS_PEDIDO e preparar atualização de estoque
-            sql_item = "INSERT INTO itens_pedido (pedido_id, produto_id, produto_nome, quantidade, preco_unit) VALUES (?, ?, ?, ?, ?)"
-            sql_estoque = "UPDATE produtos SET estoque = estoque - ? WHERE id = ?"
-
-            updates_estoque = []
-            itens_dados_para_db = []
-
-            # item: (produto_id, produto_nome, qtd, preco_unit)
-            for item in self.itens_pedido:
-                produto_id, produto_nome, quantidade, preco_unit = item
-
-                # Dados para inserção na tabela itens_pedido
-                itens_dados_para_db.append((pedido_id, produto_id, produto_nome, quantidade, preco_unit))
-
-                # Dados para atualização de estoque (apenas se houver ID de produto)
-                if produto_id is not None:
-                    # Verifica se o estoque não ficará negativo (UX/Validação)
-                    produto_atual = executar_comando("SELECT estoque FROM produtos WHERE id = ?", (produto_id,),
-                                                     fetchone=True)
-                    if produto_atual and produto_atual[0] < quantidade:
-                        raise ValueError(f"Estoque insuficiente para {produto_nome}. Disponível: {produto_atual[0]}.")
-
-                    updates_estoque.append((quantidade, produto_id))
-
-            # Executa inserção de todos os itens
-            cursor.executemany(sql_item, itens_dados_para_db)
-
-            # Executa atualização de estoque
-            if updates_estoque:
-                cursor.executemany(sql_estoque, updates_estoque)
-
-            # 3. Finaliza a Transação
-            conn.commit()
-            self.dados_salvos = True
-            messagebox.showinfo("Sucesso", f"Pedido #{pedido_id} salvo com sucesso! Estoque atualizado.")
-            if self.recarregar_callback:
-                self.recarregar_callback()
-            self.destroy()
-
-        except ValueError as ve:
-            # Erro de validação de estoque, usa o rollback implícito no finally/except
-            conn.rollback()
-            logging.warning(f"Erro de Validação (Estoque): {ve}")
-            messagebox.showwarning("Aviso de Estoque", str(ve))
-
+            # Pedido, itens e baixa de estoque em uma única transação (ver db.registrar_pedido)
+            pedido_id = registrar_pedido(cliente_id, data, self.itens_pedido)
+        except EstoqueInsuficiente as ei:
+            logging.warning(f"Erro de Validação (Estoque): {ei}")
+            messagebox.showwarning("Aviso de Estoque", str(ei))
+            return
         except Error as e:
-            # Outros erros de DB, garante rollback
-            conn.rollback()
             logging.error(f"Erro transacional ao salvar pedido: {e}")
             messagebox.showerror("Erro de Transação", f"Falha ao salvar o pedido: {e}")
+            return
 
-        finally:
-            if conn:
-                conn.close()
+        if pedido_id is None:
+            messagebox.showerror("Erro de DB", "Não foi possível conectar ao banco de dados.")
+            return
+
+        self.dados_salvos = True
+        messagebox.showinfo("Sucesso", f"Pedido #{pedido_id} salvo com sucesso! Estoque atualizado.")
+        if self.recarregar_callback:
+            self.recarregar_callback()
+        self.destroy()
 
     def _on_fechar(self):
         """Prevenção de fechar janela com dados não salvos."""
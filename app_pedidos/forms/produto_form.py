@@ -3,9 +3,12 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
 from db import executar_comando
+from utils.dinheiro import para_centavos, formatar_centavos
+from utils.medicao import medido
 
 
 class ProdutoForm(tk.Toplevel):
+    @medido()
     def __init__(self, parent, produto_id=None, recarregar_callback=None):
         super().__init__(parent)
         self.transient(parent)
@@ -65,11 +68,11 @@ class ProdutoForm(tk.Toplevel):
 
     def _carregar_dados_produto(self):
         """Carrega os dados do produto para edição."""
-        sql = "SELECT nome, preco, estoque FROM produtos WHERE id = ?"
+        sql = "SELECT nome, preco_centavos, estoque FROM produtos WHERE id = ?"
         produto = executar_comando(sql, (self.produto_id,), fetchone=True)
         if produto:
             self.var_nome.set(produto[0])
-            self.var_preco.set(f"{produto[1]:.2f}")
+            self.var_preco.set(formatar_centavos(produto[1], "."))
             self.var_estoque.set(produto[2])
             self.dados_salvos = True
         else:
@@ -82,8 +85,8 @@ class ProdutoForm(tk.Toplevel):
             return False, "O Nome do produto é obrigatório."
 
         try:
-            preco = float(preco_str.replace(',', '.'))
-            if preco <= 0:
+            preco_centavos = para_centavos(preco_str)
+            if preco_centavos <= 0:
                 return False, "O Preço deve ser um valor positivo."
         except ValueError:
             return False, "O Preço deve ser um número decimal válido."
@@ -95,7 +98,7 @@ class ProdutoForm(tk.Toplevel):
         except ValueError:
             return False, "O Estoque deve ser um número inteiro válido."
 
-        return True, (nome.strip(), preco, estoque)
+        return True, (nome.strip(), preco_centavos, estoque)
 
     def _salvar_produto(self):
         """Salva o produto no DB."""
@@ -109,13 +112,13 @@ class ProdutoForm(tk.Toplevel):
             messagebox.showwarning("Validação", resultado)
             return
 
-        nome, preco, estoque = resultado
+        nome, preco_centavos, estoque = resultado
 
         try:
             if self.produto_id is None:
                 # INSERT
-                sql = "INSERT INTO produtos (nome, preco, estoque) VALUES (?, ?, ?)"
-                resultado_db = executar_comando(sql, (nome, preco, estoque))
+                sql = "INSERT INTO produtos (nome, preco_centavos, estoque) VALUES (?, ?, ?)"
+                resultado_db = executar_comando(sql, (nome, preco_centavos, estoque))
                 if resultado_db == "IntegrityError":
                     messagebox.showerror("Erro de Salvar", "Produto com este nome já cadastrado.")
                     return
@@ -123,8 +126,8 @@ class ProdutoForm(tk.Toplevel):
                     messagebox.showinfo("Sucesso", "Produto cadastrado!")
             else:
                 # UPDATE
-                sql = "UPDATE produtos SET nome = ?, preco = ?, estoque = ? WHERE id = ?"
-                resultado_db = executar_comando(sql, (nome, preco, estoque, self.produto_id))
+                sql = "UPDATE produtos SET nome = ?, preco_centavos = ?, estoque = ? WHERE id = ?"
+                resultado_db = executar_comando(sql, (nome, preco_centavos, estoque, self.produto_id))
                 if resultado_db == "IntegrityError":
                     messagebox.showerror("Erro de Salvar", "Produto com este nome já cadastrado para outro ID.")
                     return
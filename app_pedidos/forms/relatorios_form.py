@@ -1,20 +1,63 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
+import importlib.util
 import logging
 from datetime import datetime
 import os
-import csv
-# A biblioteca 'reportlab' deve ser instalada: pip install reportlab
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from db import executar_comando, buscar_pedidos_relatorio
+import queue
+import threading
+from db import iterar_pedidos_relatorio, listar_clientes_nomes, liberar_conexao_da_thread
+from utils.analise_local import analisar_pedidos_local
+from utils.exportacao_relatorio import exportar_relatorio_csv, exportar_relatorio_pdf
+from utils.treeview_sincronizada import TreeviewSincronizada
+from utils.dinheiro import formatar_centavos
+from utils.medicao import medido, medir
 
 # Configuração de Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
+TAMANHO_BLOCO_RELATORIO = 500  # Pedidos por bloco enviado à Treeview
+BLOCOS_EM_ESPERA = 4  # Blocos prontos aguardando a thread do Tk; além disso, a leitura do banco espera
+INTERVALO_BLOCOS_MS = 30  # Um bloco é inserido a cada intervalo: a janela continua respondendo
+
+
+def _montar_linhas_relatorio(data_inicio, data_fim, cliente_id, cancelado=None, tamanho_bloco=TAMANHO_BLOCO_RELATORIO):
+    """
+    Executada em thread de trabalho: lê os pedidos em streaming (um pedido completo por vez) e produz
+    as linhas já formatadas para a Treeview em blocos de até 'tamanho_bloco' pedidos, sem acumular o
+    relatório. cancelado() é consultado a cada pedido: uma busca cancelada para de ler o banco.
+    """
+    bloco = []
+    for pedido_id, dados in iterar_pedidos_relatorio(data_inicio, data_fim, cliente_id):
+        if cancelado and cancelado():
+            return
+        total = formatar_centavos(dados['total_centavos'])
+
+        # Formata a string de itens para exibição
+        itens_str = ", ".join([f"{item['quantidade']}x {item['nome']}" for item in dados['itens']])
+
+        bloco.append((pedido_id, (pedido_id, dados['cliente'], dados['data'], itens_str, total)))
+        if len(bloco) >= tamanho_bloco:
+            yield bloco
+            bloco = []
+    if bloco:
+        yield bloco
+
+
+def _entregar(busca, mensagem):
+    """Põe a mensagem na fila (limitada) da busca; devolve False se a busca foi cancelada enquanto esperava."""
+    while not busca["cancelado"].is_set():
+        try:
+            busca["fila"].put(mensagem, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
 class RelatoriosForm(tk.Toplevel):
+    @medido()
     def __init__(self, parent):
         super().__init__(parent)
         self.title("Gerador de Relatórios de Pedidos")
@@ -22,8 +65,11 @@ class RelatoriosForm(tk.Toplevel):
         self.parent = parent
         self.grab_set()  # Torna a janela modal
 
-        # Armazena os dados brutos para exportação CSV/PDF
-        self.pedidos_detalhados = {}
+        # Filtros da última busca: as exportações releem os pedidos do banco em streaming
+        self.filtros_atuais = None
+        self._busca = None  # Estado da busca em andamento (None = nenhuma)
+        self._exportacao = None  # Estado da exportação em andamento (None = nenhuma)
+        self.protocol("WM_DELETE_WINDOW", self._on_fechar)
 
         self._setup_ui()
         self.carregar_clientes()
@@ -57,6 +103,9 @@ class RelatoriosForm(tk.Toplevel):
         # Botão de Busca
         ttk.Button(frame_filtros, text="Buscar Pedidos", command=self.recarregar_pedidos, style='Accent.TButton').grid(
             row=1, column=5, padx=10, pady=5, sticky="e")
+        self.btn_cancelar_busca = ttk.Button(frame_filtros, text="Cancelar Busca", command=self.cancelar_busca,
+                                             state="disabled")
+        self.btn_cancelar_busca.grid(row=1, column=6, padx=5, pady=5, sticky="e")
 
         # Configurar expansão de colunas
         frame_filtros.grid_columnconfigure(5, weight=1)
@@ -67,6 +116,7 @@ class RelatoriosForm(tk.Toplevel):
 
         colunas = ("ID", "Cliente", "Data", "Itens", "Total")
         self.tree_pedidos = ttk.Treeview(list_frame, columns=colunas, show="headings")
+        self.sincronizador = TreeviewSincronizada(self.tree_pedidos)
         self.tree_pedidos.heading("ID", text="ID");
         self.tree_pedidos.column("ID", width=60, anchor="center")
         self.tree_pedidos.heading("Cliente", text="Cliente");
@@ -88,30 +138,46 @@ class RelatoriosForm(tk.Toplevel):
         frame_exportacao = ttk.Frame(self, padding="10")
         frame_exportacao.pack(fill="x", padx=10, pady=10)
 
-        ttk.Button(frame_exportacao, text="Exportar para CSV", command=self.exportar_csv).pack(side="left", padx=5)
-        ttk.Button(frame_exportacao, text="Exportar para PDF", command=self.exportar_pdf).pack(side="left", padx=5)
+        self.btn_exportar_csv = ttk.Button(frame_exportacao, text="Exportar para CSV", command=self.exportar_csv)
+        self.btn_exportar_csv.pack(side="left", padx=5)
+        self.btn_exportar_pdf = ttk.Button(frame_exportacao, text="Exportar para PDF", command=self.exportar_pdf)
+        self.btn_exportar_pdf.pack(side="left", padx=5)
+        ttk.Button(frame_exportacao, text="📊 Resumo do Período", command=self.resumir_periodo).pack(side="right",
+                                                                                                   padx=5)
+
+        # Progresso da exportação CSV (exibido apenas durante a exportação)
+        self.frame_progresso_exportacao = ttk.Frame(frame_exportacao)
+        self.barra_exportacao = ttk.Progressbar(self.frame_progresso_exportacao, mode="determinate", length=200)
+        self.barra_exportacao.pack(side="left", padx=5)
+        self.var_status_exportacao = tk.StringVar()
+        ttk.Label(self.frame_progresso_exportacao, textvariable=self.var_status_exportacao).pack(side="left", padx=5)
+        self.btn_cancelar_exportacao = ttk.Button(self.frame_progresso_exportacao, text="Cancelar Exportação",
+                                                  command=self.cancelar_exportacao)
+        self.btn_cancelar_exportacao.pack(side="left", padx=5)
 
     def carregar_clientes(self):
-        """Busca clientes no DB e popula o ComboBox."""
-        sql = "SELECT id, nome FROM clientes ORDER BY nome"
-        try:
-            clientes = executar_comando(sql, fetchall=True)
-            self.clientes_map = {"Todos": None}
-            if clientes:
-                for id, nome in clientes:
-                    self.clientes_map[nome] = id
-
-            self.combo_cliente['values'] = list(self.clientes_map.keys())
-            self.combo_cliente.current(0)
-        except Exception as e:
-            logging.error(f"Erro ao carregar clientes para o relatório: {e}")
-            messagebox.showerror("Erro de DB", "Não foi possível carregar a lista de clientes.")
+        """Busca os clientes no ExecutorDB do App e popula o ComboBox quando chegarem."""
+        self.parent.executor_db.submeter(listar_clientes_nomes, ao_concluir=self._exibir_clientes,
+                                         ao_erro=self._erro_clientes)
 
-    def recarregar_pedidos(self):
-        """Busca pedidos no DB com base nos filtros e atualiza a Treeview."""
-        for item in self.tree_pedidos.get_children():
-            self.tree_pedidos.delete(item)
+    def _exibir_clientes(self, clientes):
+        if not self.winfo_exists():
+            return
+        self.clientes_map = {"Todos": None}
+        if clientes:
+            for id, nome in clientes:
+                self.clientes_map[nome] = id
+
+        self.combo_cliente['values'] = list(self.clientes_map.keys())
+        self.combo_cliente.current(0)
 
+    def _erro_clientes(self, erro):
+        logging.error(f"Erro ao carregar clientes para o relatório: {erro}")
+        if self.winfo_exists():
+            messagebox.showerror("Erro de DB", "Não foi possível carregar a lista de clientes.", parent=self)
+
+    def recarregar_pedidos(self):
+        """Busca pedidos no DB (em segundo plano) com base nos filtros e atualiza a Treeview."""
         cliente_selecionado = self.var_cliente.get()
         cliente_id = self.clientes_map.get(cliente_selecionado)
         data_inicio = self.var_data_inicio.get()
@@ -125,76 +191,221 @@ class RelatoriosForm(tk.Toplevel):
             messagebox.showwarning("Filtro Inválido", "As datas devem estar no formato AAAA-MM-DD.")
             return
 
-        # Busca dados detalhados (função implementada em db.py)
-        pedidos = buscar_pedidos_relatorio(data_inicio, data_fim, cliente_id)
-        self.pedidos_detalhados = pedidos
+        self.cancelar_busca(exibir_aviso=False)
+        self.filtros_atuais = None
+        self._exibir_mensagem("Carregando pedidos...")
+
+        filtros = (data_inicio, data_fim, cliente_id)
+        self.btn_cancelar_busca.config(state="normal")
+
+        # Thread própria, como as exportações: um relatório longo não ocupa as threads do ExecutorDB.
+        # Os blocos chegam à thread do Tk por after(), um por vez.
+        busca = {"cancelado": threading.Event(), "fila": queue.Queue(maxsize=BLOCOS_EM_ESPERA),
+                 "filtros": filtros, "recebidos": 0}
+        self._busca = busca
+
+        def produzir():
+            try:
+                with medir("_montar_linhas_relatorio"):
+                    for bloco in _montar_linhas_relatorio(*filtros, cancelado=busca["cancelado"].is_set):
+                        if not _entregar(busca, ("bloco", bloco)):
+                            return
+                _entregar(busca, ("fim", None))
+            except Exception as e:
+                logging.error(f"Erro ao buscar pedidos do relatório: {e}")
+                _entregar(busca, ("erro", e))
+            finally:
+                liberar_conexao_da_thread()
+
+        threading.Thread(target=produzir, name="busca-relatorio", daemon=True).start()
+        self.after(INTERVALO_BLOCOS_MS, lambda: self._receber_blocos(busca))
+
+    def cancelar_busca(self, exibir_aviso=True):
+        """Cancela a busca de pedidos em andamento: a leitura do banco é interrompida e o restante, descartado."""
+        if self._busca is None:
+            return
+
+        self._busca["cancelado"].set()
+        self._busca = None
+        self.btn_cancelar_busca.config(state="disabled")
+        if exibir_aviso:
+            self._exibir_mensagem("Busca cancelada.")
+
+    def _exibir_mensagem(self, texto):
+        self.sincronizador.exibir_mensagem(texto)
 
-        if not pedidos:
-            self.tree_pedidos.insert("", "end", values=("", "Nenhum pedido encontrado.", "", "", ""), tags=('empty',))
+    def _receber_blocos(self, busca):
+        """Insere (na thread do Tk) o próximo bloco de linhas montado pela thread de trabalho."""
+        if busca is not self._busca or not self.winfo_exists():
             return
 
-        for pedido_id, dados in pedidos.items():
-            cliente = dados['cliente']
-            data = dados['data']
-            total = f"{dados['total']:.2f}".replace('.', ',')
+        try:
+            tipo, valor = busca["fila"].get_nowait()
+        except queue.Empty:
+            self.after(INTERVALO_BLOCOS_MS, lambda: self._receber_blocos(busca))
+            return
 
-            # Formata a string de itens para exibição
-            itens_str = ", ".join([f"{item['quantidade']}x {item['nome']}" for item in dados['itens']])
+        if tipo == "bloco":
+            if busca["recebidos"]:
+                self.sincronizador.anexar(valor)
+            else:
+                self.sincronizador.atualizar(valor)  # O primeiro bloco substitui o aviso "Carregando..."
+            busca["recebidos"] += len(valor)
+            self.after(INTERVALO_BLOCOS_MS, lambda: self._receber_blocos(busca))
+            return
 
-            self.tree_pedidos.insert(
-                "",
-                "end",
-                iid=pedido_id,
-                values=(pedido_id, cliente, data, itens_str, total)
-            )
+        self._busca = None
+        self.btn_cancelar_busca.config(state="disabled")
+        if tipo == "erro":
+            self._erro_busca(valor)
+        elif not busca["recebidos"]:
+            self._exibir_mensagem("Nenhum pedido encontrado.")
+        else:
+            self.filtros_atuais = busca["filtros"]
+
+    def _erro_busca(self, erro):
+        self._exibir_mensagem("Erro ao buscar pedidos.")
+        messagebox.showerror("Erro de DB", f"Não foi possível buscar os pedidos: {erro}", parent=self)
+
+    def resumir_periodo(self):
+        """Insights (top produtos, ticket médio, picos de volume) do período filtrado, calculados no banco."""
+        data_inicio = self.var_data_inicio.get()
+        data_fim = self.var_data_fim.get()
+        try:
+            if data_inicio: datetime.strptime(data_inicio, "%Y-%m-%d")
+            if data_fim: datetime.strptime(data_fim, "%Y-%m-%d")
+        except ValueError:
+            messagebox.showwarning("Filtro Inválido", "As datas devem estar no formato AAAA-MM-DD.")
+            return
+
+        # O resumo considera todos os clientes: o filtro de cliente vale apenas para a listagem
+        self.parent.executor_db.submeter(
+            analisar_pedidos_local, data_inicio=data_inicio or None, data_fim=data_fim or None,
+            ao_concluir=lambda texto: self.winfo_exists() and messagebox.showinfo("Resumo do Período", texto,
+                                                                                   parent=self),
+            ao_erro=lambda e: self.winfo_exists() and messagebox.showerror(
+                "Erro de DB", f"Não foi possível calcular o resumo: {e}", parent=self))
+
+    def _on_fechar(self):
+        self.cancelar_busca(exibir_aviso=False)
+        self.cancelar_exportacao()
+        self.destroy()
 
     def exportar_csv(self):
-        """Exporta os dados atualmente carregados para um arquivo CSV."""
-        if not self.pedidos_detalhados:
+        """
+        Exporta os pedidos da última busca para CSV (ou .csv.gz, compactado) em segundo plano: as linhas vão
+        do banco direto para o arquivo, com barra de progresso e cancelamento.
+        """
+        if not self.filtros_atuais:
             messagebox.showinfo("Exportar", "Nenhum dado para exportar. Busque pedidos primeiro.")
             return
+        if self._exportacao is not None:
+            messagebox.showinfo("Exportar", "Já existe uma exportação em andamento.", parent=self)
+            return
 
         filepath = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")],
+            filetypes=[("CSV files", "*.csv"), ("CSV compactado (gzip)", "*.csv.gz")],
             title="Salvar Relatório CSV"
         )
 
         if not filepath: return
 
+        self._iniciar_exportacao(exportar_relatorio_csv, filepath, self._exportacao_concluida, self._erro_exportacao)
+
+    def _iniciar_exportacao(self, exportar, filepath, ao_concluir, ao_erro):
+        """
+        Roda exportar(filepath, filtros, progresso, cancelado) em uma thread própria, com sua própria conexão:
+        uma exportação longa não ocupa as threads do ExecutorDB usadas pelas listas e buscas. O progresso e o
+        resultado chegam à thread do Tk por after(), como no streaming da análise de IA.
+        """
+        exportacao = {"cancelado": threading.Event(), "fila": queue.Queue(), "progresso": (0, 0)}
+        self._exportacao = exportacao
+        self.btn_exportar_csv.config(state="disabled")
+        self.btn_cancelar_exportacao.config(state="normal")
+        self.var_status_exportacao.set("Preparando exportação...")
+        self.barra_exportacao.config(value=0)
+        self.btn_exportar_pdf.config(state="disabled")
+        self.frame_progresso_exportacao.pack(side="left", padx=10)
+
+        filtros = self.filtros_atuais
+        nome = getattr(exportar, '__name__', 'exportacao')
+
+        def registrar_progresso(linhas, total):
+            exportacao["progresso"] = (linhas, total)  # O Tk não pode ser usado fora da sua thread
+
+        def executar():
+            try:
+                with medir(f"exportacao:{nome}"):
+                    resultado = exportar(filepath, filtros, progresso=registrar_progresso,
+                                         cancelado=exportacao["cancelado"].is_set)
+                exportacao["fila"].put((ao_concluir, resultado))
+            except Exception as e:
+                logging.error(f"Erro na exportação do relatório ({nome}): {e}")
+                exportacao["fila"].put((ao_erro, e))
+            finally:
+                liberar_conexao_da_thread()
+
+        threading.Thread(target=executar, name="exportacao-relatorio", daemon=True).start()
+        self.after(100, lambda: self._acompanhar_exportacao(exportacao))
+
+    def _acompanhar_exportacao(self, exportacao):
+        if exportacao is not self._exportacao or not self.winfo_exists():
+            return
+
         try:
-            with open(filepath, 'w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file, delimiter=';')  # Usando ';' como delimitador
-                # Cabeçalho Detalhado do CSV
-                writer.writerow(["ID Pedido", "Cliente", "Data Pedido", "Total Pedido (R$)",
-                                 "ID Item", "Nome Produto", "Quantidade", "Preço Unitário (R$)"])
-
-                # Escreve os dados linha por linha (um item por linha)
-                for pedido_id, dados in self.pedidos_detalhados.items():
-                    cliente = dados['cliente']
-                    data = dados['data']
-                    total = f"{dados['total']:.2f}".replace('.', ',')
-
-                    for item in dados['itens']:
-                        item_id = item['id']
-                        nome = item['nome']
-                        qtd = item['quantidade']
-                        preco_unit = f"{item['preco_unit']:.2f}".replace('.', ',')
-
-                        writer.writerow([pedido_id, cliente, data, total, item_id, nome, qtd, preco_unit])
-
-            messagebox.showinfo("Sucesso", f"Relatório CSV exportado com sucesso para:\n{filepath}")
+            retorno, valor = exportacao["fila"].get_nowait()
+        except queue.Empty:
+            linhas, total = exportacao["progresso"]
+            if total and not exportacao["cancelado"].is_set():
+                self.barra_exportacao.config(maximum=total, value=linhas)
+                self.var_status_exportacao.set(f"{linhas} de {total} linhas")
+            self.after(100, lambda: self._acompanhar_exportacao(exportacao))
+            return
+
+        self._exportacao = None
+        self.frame_progresso_exportacao.pack_forget()
+        self.btn_exportar_csv.config(state="normal")
+        self.btn_exportar_pdf.config(state="normal")
+        retorno(valor)
+
+    def cancelar_exportacao(self):
+        """Interrompe a exportação em andamento; o arquivo de destino não é criado nem alterado."""
+        if self._exportacao is None:
+            return
+        self._exportacao["cancelado"].set()
+        if self.winfo_exists():
+            self.btn_cancelar_exportacao.config(state="disabled")
+            self.var_status_exportacao.set("Cancelando...")
+
+    def _exportacao_concluida(self, resultado):
+        if resultado["cancelado"]:
+            messagebox.showinfo("Exportar", "Exportação cancelada.", parent=self)
+            return
+
+        filepath = resultado["caminho"]
+        messagebox.showinfo("Sucesso", f"Relatório CSV exportado com sucesso para:\n{filepath}\n"
+                                       f"({resultado['linhas']} linhas)", parent=self)
+        if not filepath.lower().endswith(".gz"):
             self._abrir_arquivo(filepath)
 
-        except Exception as e:
-            logging.error(f"Erro ao exportar CSV: {e}")
-            messagebox.showerror("Erro de Exportação", f"Ocorreu um erro ao salvar o arquivo CSV: {e}")
+    def _erro_exportacao(self, erro):
+        messagebox.showerror("Erro de Exportação", f"Ocorreu um erro ao salvar o arquivo CSV: {erro}", parent=self)
 
     def exportar_pdf(self):
-        """Exporta os dados atualmente carregados para um arquivo PDF usando reportlab."""
-        if not self.pedidos_detalhados:
+        """Exporta os pedidos da última busca para PDF (reportlab) em segundo plano, com progresso e cancelamento."""
+        if not self.filtros_atuais:
             messagebox.showinfo("Exportar", "Nenhum dado para exportar. Busque pedidos primeiro.")
             return
+        if self._exportacao is not None:
+            messagebox.showinfo("Exportar", "Já existe uma exportação em andamento.", parent=self)
+            return
+
+        # Só verifica a instalação: o reportlab é importado pela thread da exportação, não pela do Tk
+        if importlib.util.find_spec("reportlab") is None:
+            messagebox.showerror("Erro de Exportação",
+                                 "A biblioteca 'reportlab' não está instalada: pip install reportlab", parent=self)
+            return
 
         filepath = filedialog.asksaveasfilename(
             defaultextension=".pdf",
@@ -204,78 +415,20 @@ class RelatoriosForm(tk.Toplevel):
 
         if not filepath: return
 
-        try:
-            pdf = canvas.Canvas(filepath, pagesize=letter)
-            width, height = letter
-
-            pdf.setFont("Helvetica-Bold", 16)
-            pdf.drawString(inch, height - inch, "Relatório de Pedidos Detalhados")
-            pdf.setFont("Helvetica", 10)
-            pdf.drawString(inch, height - inch - 0.3 * inch, f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-
-            y_pos = height - inch - 0.7 * inch
-            x_pos = inch
-            line_height = 0.25 * inch
-
-            for pedido_id, dados in self.pedidos_detalhados.items():
-                cliente = dados['cliente']
-                data = dados['data']
-                total = f"R$ {dados['total']:.2f}".replace('.', ',')
-
-                # Nova página se necessário
-                if y_pos < 1.5 * inch:
-                    pdf.showPage()
-                    y_pos = height - inch
-                    pdf.setFont("Helvetica-Bold", 12)
-                    pdf.drawString(inch, y_pos, "Relatório de Pedidos (Continuação)")
-                    y_pos -= line_height
-
-                # Informações do Pedido
-                pdf.setFont("Helvetica-Bold", 10)
-                pdf.drawString(x_pos, y_pos,
-                               f"Pedido ID: {pedido_id} | Cliente: {cliente} | Data: {data} | TOTAL: {total}")
-                y_pos -= line_height
-
-                # Cabeçalho dos Itens
-                pdf.setFont("Helvetica-Oblique", 9)
-                pdf.drawString(x_pos + 0.5 * inch, y_pos, "Produto")
-                pdf.drawString(x_pos + 4.5 * inch, y_pos, "Qtd.")
-                pdf.drawString(x_pos + 5.5 * inch, y_pos, "Preço Unit.")
-                pdf.drawString(x_pos + 7.0 * inch, y_pos, "Subtotal")
-                y_pos -= line_height * 0.8
-
-                # Loop pelos Itens
-                for item in dados['itens']:
-                    nome = item['nome']
-                    qtd = item['quantidade']
-                    preco_unit = item['preco_unit']
-                    subtotal = qtd * preco_unit
-
-                    pdf.setFont("Helvetica", 9)
-                    pdf.drawString(x_pos + 0.5 * inch, y_pos, nome)
-                    pdf.drawString(x_pos + 4.5 * inch, y_pos, str(qtd))
-                    pdf.drawString(x_pos + 5.5 * inch, y_pos, f"R$ {preco_unit:.2f}".replace('.', ','))
-                    pdf.drawString(x_pos + 7.0 * inch, y_pos, f"R$ {subtotal:.2f}".replace('.', ','))
-
-                    y_pos -= line_height
-
-                    if y_pos < 1.5 * inch:
-                        pdf.showPage()
-                        y_pos = height - inch
-                        pdf.setFont("Helvetica", 9)
-
-                y_pos -= line_height * 0.5
-
-            pdf.save()
-            messagebox.showinfo("Sucesso", f"Relatório PDF exportado com sucesso para:\n{filepath}")
-            self._abrir_arquivo(filepath)
+        self._iniciar_exportacao(exportar_relatorio_pdf, filepath, self._exportacao_pdf_concluida,
+                                 self._erro_exportacao_pdf)
 
-        except ImportError:
-            messagebox.showerror("Erro de Dependência",
-                                 "A biblioteca 'reportlab' não está instalada. Instale com 'pip install reportlab'.")
-        except Exception as e:
-            logging.error(f"Erro ao exportar PDF: {e}")
-            messagebox.showerror("Erro de Exportação", f"Ocorreu um erro ao salvar o arquivo PDF: {e}")
+    def _exportacao_pdf_concluida(self, resultado):
+        if resultado["cancelado"]:
+            messagebox.showinfo("Exportar", "Exportação cancelada.", parent=self)
+            return
+
+        filepath = resultado["caminho"]
+        messagebox.showinfo("Sucesso", f"Relatório PDF exportado com sucesso para:\n{filepath}", parent=self)
+        self._abrir_arquivo(filepath)
+
+    def _erro_exportacao_pdf(self, erro):
+        messagebox.showerror("Erro de Exportação", f"Ocorreu um erro ao salvar o arquivo PDF: {erro}", parent=self)
 
     def _abrir_arquivo(self, filepath):
         """Tenta abrir o arquivo gerado usando o programa padrão do sistema."""
@@ -2,16 +2,26 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 import logging
+import queue
+import threading
+from datetime import date, timedelta
 from ttkthemes import ThemedTk
-from db import inicializar_db, executar_comando, get_dashboard_metrics, get_ultimos_pedidos_detalhados
+from db import (inicializar_db, executar_comando, get_dashboard_metrics, get_ultimos_pedidos_detalhados,
+                fechar_conexoes, liberar_conexao_da_thread, buscar_pagina_pedidos, buscar_clientes,
+                buscar_produtos)
 from forms.cliente_form import ClienteForm
 from forms.produto_form import ProdutoForm
 from forms.pedido_form import PedidoForm
 from forms.detalhes_pedido_form import DetalhesPedidoForm
 from forms.relatorios_form import RelatoriosForm
 from forms.historico_form import HistoricoForm
-from utils.analise_ia import analisar_pedidos_ia
 from utils.log_manager import registrar_acao
+from utils.treeview_paginada import TreeviewPaginada
+from utils.treeview_sincronizada import TreeviewSincronizada
+from utils.busca import ControladorBusca
+from utils.executor_db import ExecutorDB
+from utils.dinheiro import formatar_centavos, formatar_moeda
+from utils.medicao import medir, medido, marco, gravar_relatorio
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -21,6 +31,9 @@ TEMA_CLARO = "clam"
 MODERN_FONT_FAMILY = 'Inter'
 MODERN_FONT = ('Inter', 10)
 
+# Janelas da análise de IA: None = últimos pedidos individuais; N = pedidos dos últimos N dias (agregados em SQL)
+JANELAS_IA = {"Últimos 5 pedidos": None, "Últimos 30 dias": 30, "Últimos 90 dias": 90}
+
 # Cores de Estilo
 ACCENT_COLOR = '#4A90E2'  # Azul Neutro para destaques/botões
 CUSTOM_DARK_BG = '#2B2B2B'
@@ -38,14 +51,20 @@ LIGHT_ACCENT_COLOR = '#5A9BD6'
 
 
 class App(ThemedTk):
+    @medido()
     def __init__(self):
-        super().__init__(theme=TEMA_CLARO)  # Inicia no tema claro
+        with medir("App.criar_janela"):
+            super().__init__(theme=TEMA_CLARO)  # Inicia no tema claro
         self.title("Sistema de Gestão de Clientes e Pedidos")
         self.geometry("1200x800")
 
         self._current_theme_name = TEMA_CLARO
+        self._analise_ia = None  # Estado da análise de IA em andamento (None = nenhuma)
 
-        inicializar_db()
+        with medir("inicializar_db"):
+            inicializar_db()
+        # Consultas ao banco rodam em threads de trabalho; os resultados voltam via after()
+        self.executor_db = ExecutorDB(self, ao_mudar_ocupado=self._atualizar_indicador_ocupado)
         self.setup_custom_styles()
         self.setup_app_theme(self._current_theme_name)
 
@@ -68,19 +87,39 @@ class App(ThemedTk):
         self.setup_produto_tab()
         self.setup_pedido_tab()
 
-        self.recarregar_clientes()
-        self.recarregar_produtos()
-        self.recarregar_pedidos()
-        self.recarregar_dashboard()
+        # Carregamento sob demanda: cada aba busca seus dados ao ser exibida pela primeira vez
+        # e, depois disso, apenas quando uma escrita a marca como desatualizada
+        self._carregadores_abas = {
+            "Dashboard": lambda: self.recarregar_dashboard(display_message=False),
+            "Clientes": self.recarregar_clientes,
+            "Produtos": self.recarregar_produtos,
+            "Pedidos": self.recarregar_pedidos,
+        }
+        self._abas_desatualizadas = set(self._carregadores_abas)
 
         self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_change)
+        self.after_idle(marco, "janela_exibida")
+        self.after_idle(self._carregar_aba_atual)  # Depois da primeira renderização da janela
+        # Os módulos de IA (e o .env) são carregados sob demanda; aqui são aquecidos já com a janela na tela
+        self.after(1000, self._pre_carregar_ia)
 
         self.protocol("WM_DELETE_WINDOW", self._on_app_fechar)
 
+    def _pre_carregar_ia(self):
+        from utils.analise_ia import chave_api_configurada, pre_carregar_sdk_ia
+        if chave_api_configurada():
+            pre_carregar_sdk_ia()  # SDK do Gemini importado em segundo plano
+
     def _on_app_fechar(self):
         if messagebox.askyesno("Sair do Sistema", "Tem certeza que deseja sair do aplicativo?"):
+            self.executor_db.encerrar()
+            from utils.analise_ia import fechar_clientes_ia
+            fechar_clientes_ia()
+            fechar_conexoes()
+            gravar_relatorio()
             self.destroy()
 
+    @medido()
     def setup_custom_styles(self):
         """Configura estilos customizados no TTK padrão."""
 
@@ -107,6 +146,7 @@ class App(ThemedTk):
         # Estilo para Entradas (Ajustaremos dinamicamente)
         self.style.configure("Search.TEntry", relief="flat", padding=5)
 
+    @medido()
     def setup_app_theme(self, theme_name):
         """Aplica o tema e configura as cores dinamicamente."""
 
@@ -212,16 +252,43 @@ class App(ThemedTk):
 
         ttk.Frame(menu_frame, width=1).pack(side="right", fill='y', padx=10)
 
+        # Indicador de atividade do banco (consultas em segundo plano)
+        self.barra_ocupado = ttk.Progressbar(menu_frame, mode="indeterminate", length=120)
+        self.var_status = tk.StringVar(value="")
+        ttk.Label(menu_frame, textvariable=self.var_status).pack(side="left", padx=5)
+
+    def _atualizar_indicador_ocupado(self, ocupado):
+        """Mostra a barra de progresso enquanto houver consultas em andamento no ExecutorDB."""
+        if ocupado:
+            self.var_status.set("Carregando...")
+            self.barra_ocupado.pack(side="left", padx=5)
+            self.barra_ocupado.start(15)
+        else:
+            self.barra_ocupado.stop()
+            self.barra_ocupado.pack_forget()
+            self.var_status.set("")
+
     def _on_tab_change(self, event):
-        tab_index = self.notebook.index("current")
-        tab_name = self.notebook.tab(tab_index, "text")
-        if tab_name == "Pedidos":
-            self.recarregar_pedidos()
-        elif tab_name == "Dashboard":
-            self.recarregar_dashboard(display_message=False)
+        self._carregar_aba_atual()
+
+    def _aba_atual(self):
+        return self.notebook.tab(self.notebook.index("current"), "text")
+
+    def _carregar_aba_atual(self):
+        """Carrega a aba visível se ela ainda não foi carregada ou se foi marcada como desatualizada."""
+        tab_name = self._aba_atual()
+        if tab_name in self._abas_desatualizadas:
+            self._abas_desatualizadas.discard(tab_name)
+            self._carregadores_abas[tab_name]()
+
+    def marcar_desatualizadas(self, *abas):
+        """Chamado após escritas: a aba visível é recarregada já; as demais, quando forem exibidas."""
+        self._abas_desatualizadas.update(abas)
+        self._carregar_aba_atual()
 
     # --- SETUP DASHBOARD ---
 
+    @medido()
     def setup_dashboard_tab(self):
         frame = ttk.Frame(self.notebook, padding="20")
         self.notebook.add(frame, text="Dashboard")
@@ -240,8 +307,17 @@ class App(ThemedTk):
 
         ttk.Button(control_frame, text="🔄 Atualizar Dados", command=self.recarregar_dashboard,
                    style='Primary.TButton').pack(side="left", padx=10)
-        ttk.Button(control_frame, text="🤖 Analisar Últimos 5 Pedidos (IA)", command=self.analisar_pedidos_ia_ui,
-                   style='Primary.TButton').pack(side="left", padx=10)
+        self.btn_analisar_ia = ttk.Button(control_frame, text="🤖 Analisar com IA",
+                                          command=self.analisar_pedidos_ia_ui, style='Primary.TButton')
+        self.btn_analisar_ia.pack(side="left", padx=10)
+        self.var_janela_ia = tk.StringVar(value=next(iter(JANELAS_IA)))
+        ttk.Combobox(control_frame, textvariable=self.var_janela_ia, values=list(JANELAS_IA), state="readonly",
+                     width=18).pack(side="left", padx=5)
+        self.btn_cancelar_ia = ttk.Button(control_frame, text="⏹ Cancelar Análise",
+                                          command=self.cancelar_analise_ia, state="disabled")
+        self.btn_cancelar_ia.pack(side="left", padx=10)
+        self.var_forcar_ia = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Ignorar cache", variable=self.var_forcar_ia).pack(side="left", padx=10)
 
         ttk.Button(control_frame, text="ℹ️ Sobre", command=lambda: messagebox.showinfo("Sobre",
                                                                                        "Sistema de Gestão de Pedidos.\nDesenvolvido com Python/TTK."),
@@ -252,7 +328,7 @@ class App(ThemedTk):
         self.ia_text_widget = scrolledtext.ScrolledText(frame, wrap=tk.WORD, width=80, height=15, font=MODERN_FONT,
                                                         relief="flat")
         self.ia_text_widget.pack(fill="both", expand=True)
-        self.ia_text_widget.insert(tk.END, "Clique no botão 'Analisar Últimos 5 Pedidos (IA)' para gerar insights.")
+        self.ia_text_widget.insert(tk.END, "Escolha a janela de pedidos e clique em 'Analisar com IA' para gerar insights.")
         self.ia_text_widget.config(state=tk.DISABLED)
 
         self.setup_app_theme(self._current_theme_name)
@@ -266,12 +342,17 @@ class App(ThemedTk):
 
         parent.grid_columnconfigure(coluna, weight=1)
 
+    @medido()
     def recarregar_dashboard(self, display_message=True):
-        metrics = get_dashboard_metrics()
+        self.executor_db.submeter(get_dashboard_metrics,
+                                  ao_concluir=lambda metrics: self._exibir_metricas(metrics, display_message))
+
+    @medido()
+    def _exibir_metricas(self, metrics, display_message):
         if metrics is not None:
             self.var_clientes.set(f"{metrics['total_clientes']}")
             self.var_pedidos.set(f"{metrics['total_pedidos_mes']}")
-            self.var_ticket.set(f"R$ {metrics['ticket_medio']:.2f}".replace('.', ','))
+            self.var_ticket.set(formatar_moeda(metrics['ticket_medio_centavos']))
             if display_message:
                 messagebox.showinfo("Atualização", "Dados do Dashboard atualizados com sucesso!")
         else:
@@ -279,37 +360,139 @@ class App(ThemedTk):
                 messagebox.showerror("Erro", "Falha ao carregar métricas do Dashboard.")
 
     def analisar_pedidos_ia_ui(self):
-        self.ia_text_widget.config(state=tk.NORMAL)
-        self.ia_text_widget.delete(1.0, tk.END)
-        self.ia_text_widget.insert(tk.END,
-                                   "Aguarde... Buscando dados e solicitando análise à IA (pode levar alguns segundos).\n\n")
-        self.ia_text_widget.config(state=tk.DISABLED)
-        self.update_idletasks()
+        """Inicia a análise de IA sem bloquear a interface (o texto chega em trechos, via streaming)."""
+        if self._analise_ia is not None:
+            return  # Já existe uma análise em andamento (evita requisições duplicadas)
 
-        logging.info("Iniciando análise de pedidos via API de IA (Gemini).")
-        dados_brutos = get_ultimos_pedidos_detalhados(limite=5)
-        resultado_analise = analisar_pedidos_ia(dados_brutos)
+        from utils.analise_ia import analisar_pedidos_ia_stream
+        from utils.contexto_ia import montar_contexto_periodo
+
+        self._analise_ia = {"cancelado": threading.Event(), "fila": queue.Queue(), "recebeu_texto": False}
+        self.btn_analisar_ia.config(state="disabled")
+        self.btn_cancelar_ia.config(state="normal")
+        self._escrever_ia("Aguarde... Buscando dados e solicitando análise à IA (pode levar alguns segundos).\n\n")
 
+        logging.info("Iniciando análise de pedidos via API de IA (Gemini).")
+        analise = self._analise_ia
+        ao_erro = lambda e: self._finalizar_analise_ia(analise, f"🚨 Erro ao buscar pedidos: {e}")
+        dias = JANELAS_IA.get(self.var_janela_ia.get())
+
+        if dias is None:
+            self.executor_db.submeter(
+                get_ultimos_pedidos_detalhados, 5, ao_erro=ao_erro,
+                ao_concluir=lambda dados: self._iniciar_stream_ia(
+                    analise, lambda cancelado, forcar: analisar_pedidos_ia_stream(
+                        dados, cancelado=cancelado, forcar_atualizacao=forcar)))
+        else:
+            # Períodos longos: os pedidos são agregados no banco e o contexto respeita o orçamento de tokens
+            data_inicio = (date.today() - timedelta(days=dias - 1)).isoformat()
+            self.executor_db.submeter(montar_contexto_periodo, data_inicio, ao_erro=ao_erro,
+                                      ao_concluir=lambda contexto: self._iniciar_analise_periodo(
+                                          analise, data_inicio, contexto))
+
+    def _iniciar_analise_periodo(self, analise, data_inicio, contexto):
+        if analise is not self._analise_ia:
+            return
+
+        from utils.analise_ia import analisar_periodo_ia_stream
+
+        if contexto is not None and contexto["num_pedidos"]:
+            self._escrever_ia(f"Aguarde... {contexto['num_pedidos']} pedidos desde {data_inicio} resumidos em "
+                              f"~{contexto['tokens_estimados']} tokens. Solicitando análise à IA.\n\n")
+        self._iniciar_stream_ia(analise, lambda cancelado, forcar: analisar_periodo_ia_stream(
+            data_inicio, contexto=contexto, cancelado=cancelado, forcar_atualizacao=forcar))
+
+    def _iniciar_stream_ia(self, analise, gerar_trechos):
+        """gerar_trechos(cancelado, forcar) devolve o gerador de trechos da análise."""
+        if analise is not self._analise_ia:
+            return  # Análise cancelada enquanto os dados eram buscados
+
+        from utils.analise_ia import TIMEOUT_IA_S
+        forcar = self.var_forcar_ia.get()
+
+        def produzir():
+            # Thread dedicada: a requisição pode levar vários segundos e não deve ocupar o ExecutorDB
+            try:
+                for trecho in gerar_trechos(analise["cancelado"], forcar):
+                    analise["fila"].put(trecho)
+            finally:
+                liberar_conexao_da_thread()  # Conexão usada pelo cache de IA
+                analise["fila"].put(None)
+
+        threading.Thread(target=produzir, name="analise-ia", daemon=True).start()
+        analise["timeout"] = TIMEOUT_IA_S
+        analise["prazo"] = self.after(TIMEOUT_IA_S * 1000, lambda: self._tempo_esgotado_ia(analise))
+        self.after(50, lambda: self._consumir_stream_ia(analise))
+
+    def _consumir_stream_ia(self, analise):
+        if analise is not self._analise_ia:
+            return
+
+        while True:
+            try:
+                trecho = analise["fila"].get_nowait()
+            except queue.Empty:
+                break
+
+            if trecho is None:
+                self._finalizar_analise_ia(analise)
+                return
+
+            # O primeiro trecho substitui a mensagem de espera
+            self._escrever_ia(trecho, anexar=analise["recebeu_texto"])
+            analise["recebeu_texto"] = True
+
+        self.after(50, lambda: self._consumir_stream_ia(analise))
+
+    def _tempo_esgotado_ia(self, analise):
+        if analise is self._analise_ia:
+            analise["cancelado"].set()
+            self._finalizar_analise_ia(analise, f"\n\n⏱️ A análise excedeu o tempo limite de {analise['timeout']}s.")
+
+    def cancelar_analise_ia(self):
+        if self._analise_ia is not None:
+            self._analise_ia["cancelado"].set()
+            self._finalizar_analise_ia(self._analise_ia, "\n\n⏹ Análise cancelada pelo usuário.")
+
+    def _finalizar_analise_ia(self, analise, mensagem=None):
+        if analise is not self._analise_ia:
+            return
+
+        if "prazo" in analise:
+            self.after_cancel(analise["prazo"])
+        if mensagem:
+            anexar = analise["recebeu_texto"]
+            self._escrever_ia(mensagem if anexar else mensagem.strip(), anexar=anexar)
+
+        self._analise_ia = None
+        self.btn_analisar_ia.config(state="normal")
+        self.btn_cancelar_ia.config(state="disabled")
+        from utils.analise_ia import estatisticas_cache_ia
+        stats = estatisticas_cache_ia()
+        logging.info(f"Análise de IA concluída. Cache: {stats['acertos']} acertos, {stats['falhas']} falhas.")
+
+    def _escrever_ia(self, texto, anexar=False):
         self.ia_text_widget.config(state=tk.NORMAL)
-        self.ia_text_widget.delete(1.0, tk.END)
-        self.ia_text_widget.insert(tk.END, resultado_analise)
+        if not anexar:
+            self.ia_text_widget.delete(1.0, tk.END)
+        self.ia_text_widget.insert(tk.END, texto)
+        self.ia_text_widget.see(tk.END)
         self.ia_text_widget.config(state=tk.DISABLED)
-        logging.info("Análise de IA concluída.")
 
     # --- SETUP CLIENTES ---
 
+    @medido()
     def setup_cliente_tab(self):
         frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(frame, text="Clientes")
 
         frame_busca = ttk.Frame(frame)
         frame_busca.pack(fill="x", pady=(0, 10))
-        ttk.Label(frame_busca, text="Buscar Cliente (Nome/Email):", style='DashboardTitle.TLabel').pack(side="left",
+        ttk.Label(frame_busca, text="Buscar Cliente (Nome/Email/Telefone):", style='DashboardTitle.TLabel').pack(side="left",
                                                                                                         padx=5, pady=5)
         ttk.Entry(frame_busca, textvariable=self.var_busca_cliente, width=50, style='TEntry').pack(side="left",
                                                                                                    fill="x",
                                                                                                    expand=True, padx=5)
-        self.var_busca_cliente.trace_add("write", lambda *args: self.recarregar_clientes())
 
         list_frame = ttk.Frame(frame)
         list_frame.pack(fill="both", expand=True, pady=5)
@@ -331,10 +514,22 @@ class App(ThemedTk):
                    style='Primary.TButton').pack(side="left", padx=5)
         ttk.Button(frame_botoes, text="Excluir Cliente", command=self.excluir_cliente, style='Primary.TButton').pack(
             side="left", padx=5)
+        self.btn_mais_clientes = ttk.Button(frame_botoes, text="Mostrar mais", state="disabled")
+        self.btn_mais_clientes.pack(side="right", padx=5)
         self.tree_clientes.bind('<Double-1>', lambda e: self.abrir_editar_cliente())
 
+        # Busca ao vivo com debounce (consulta só após uma pausa na digitação)
+        self.busca_clientes = ControladorBusca(
+            self, self.var_busca_cliente, buscar_clientes,
+            lambda linhas, tem_mais: self._exibir_resultados(self.tree_clientes, self.btn_mais_clientes,
+                                                             linhas, tem_mais),
+            executar=self.executor_db.executar,
+            exibir_erro=lambda erro: self._erro_busca(self.tree_clientes, self.btn_mais_clientes, erro))
+        self.btn_mais_clientes.config(command=self.busca_clientes.mostrar_mais)
+
     # --- SETUP PRODUTOS ---
 
+    @medido()
     def setup_produto_tab(self):
         frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(frame, text="Produtos")
@@ -346,7 +541,6 @@ class App(ThemedTk):
         ttk.Entry(frame_busca, textvariable=self.var_busca_produto, width=50, style='TEntry').pack(side="left",
                                                                                                    fill="x",
                                                                                                    expand=True, padx=5)
-        self.var_busca_produto.trace_add("write", lambda *args: self.recarregar_produtos())
 
         list_frame = ttk.Frame(frame)
         list_frame.pack(fill="both", expand=True, pady=5)
@@ -368,10 +562,21 @@ class App(ThemedTk):
                    style='Primary.TButton').pack(side="left", padx=5)
         ttk.Button(frame_botoes, text="Excluir Produto", command=self.excluir_produto, style='Primary.TButton').pack(
             side="left", padx=5)
+        self.btn_mais_produtos = ttk.Button(frame_botoes, text="Mostrar mais", state="disabled")
+        self.btn_mais_produtos.pack(side="right", padx=5)
         self.tree_produtos.bind('<Double-1>', lambda e: self.abrir_editar_produto())
 
+        self.busca_produtos = ControladorBusca(
+            self, self.var_busca_produto, buscar_produtos,
+            lambda linhas, tem_mais: self._exibir_resultados(self.tree_produtos, self.btn_mais_produtos,
+                                                             linhas, tem_mais, self._formatar_linha_produto),
+            executar=self.executor_db.executar,
+            exibir_erro=lambda erro: self._erro_busca(self.tree_produtos, self.btn_mais_produtos, erro))
+        self.btn_mais_produtos.config(command=self.busca_produtos.mostrar_mais)
+
     # --- SETUP PEDIDOS ---
 
+    @medido()
     def setup_pedido_tab(self):
         frame = ttk.Frame(self.notebook, padding="10")
         self.notebook.add(frame, text="Pedidos")
@@ -397,6 +602,14 @@ class App(ThemedTk):
 
         self.tree_pedidos.bind('<Double-1>', lambda e: self.abrir_detalhes_pedido())
 
+        # Rolagem virtual: páginas keyset em (data, id) buscadas conforme o usuário rola
+        self.lista_pedidos = TreeviewPaginada(self.tree_pedidos, self.tree_pedidos.scrollbar,
+                                              buscar_pagina_pedidos, self._formatar_linha_pedido,
+                                              tamanho_pagina=200, texto_vazio="Nenhum pedido encontrado.",
+                                              executar=self.executor_db.executar,
+                                              exibir_erro=lambda erro: messagebox.showerror(
+                                                  "Erro de DB", f"Não foi possível carregar a lista de pedidos: {erro}"))
+
         frame_botoes = ttk.Frame(frame, padding="5")
         frame_botoes.pack(fill="x")
 
@@ -426,83 +639,56 @@ class App(ThemedTk):
         tree.configure(yscrollcommand=scrollbar.set)
         tree.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
+        tree.scrollbar = scrollbar  # Referência usada pela rolagem virtual (TreeviewPaginada)
+        # Recargas aplicam só a diferença (mantém seleção e rolagem)
+        tree.sincronizador = TreeviewSincronizada(tree)
+
+        # Placeholder até a aba ser exibida (os dados são carregados sob demanda)
+        tree.sincronizador.exibir_mensagem("Carregando...")
         return tree
 
+    @medido()
     def recarregar_clientes(self):
-        self._recarregar_dados(self.tree_clientes, "clientes", self.var_busca_cliente.get().strip(),
-                               "nome LIKE ? OR email LIKE ?",
-                               "id, nome, email, telefone")
+        self.busca_clientes.recarregar()
 
+    @medido()
     def recarregar_produtos(self):
-        self._recarregar_dados(self.tree_produtos, "produtos", self.var_busca_produto.get().strip(),
-                               "nome LIKE ?",
-                               "id, nome, preco, estoque")
+        self.busca_produtos.recarregar()
 
+    @medido()
     def recarregar_pedidos(self):
-        """Busca pedidos no DB e recarrega a Treeview de pedidos."""
-        for item in self.tree_pedidos.get_children():
-            self.tree_pedidos.delete(item)
-
-        sql = """
-            SELECT 
-                p.id, 
-                c.nome, 
-                p.data, 
-                p.total 
-            FROM pedidos p
-            INNER JOIN clientes c ON p.cliente_id = c.id
-            ORDER BY p.data DESC, p.id DESC
-        """
+        """Recarrega a Treeview de pedidos a partir da primeira página (as demais vêm sob demanda)."""
         try:
-            pedidos = executar_comando(sql, fetchall=True)
-            if pedidos:
-                for pedido in pedidos:
-                    pedido_id = pedido[0]
-                    nome_cliente = pedido[1]
-                    data = pedido[2]
-                    total_formatado = f"{pedido[3]:.2f}"
-
-                    self.tree_pedidos.insert(
-                        "",
-                        "end",
-                        iid=pedido_id,
-                        values=(pedido_id, nome_cliente, data, total_formatado)
-                    )
-            else:
-                self.tree_pedidos.insert("", "end", values=("", "Nenhum pedido encontrado.", "", ""), tags=('empty',))
+            self.lista_pedidos.recarregar()
         except Exception as e:
             logging.error(f"Erro ao carregar pedidos: {e}")
             messagebox.showerror("Erro de DB", f"Não foi possível carregar a lista de pedidos: {e}")
 
-    def _recarregar_dados(self, treeview, tabela, termo, where_clause, colunas_sql):
-        # Limpa o Treeview
-        for item in treeview.get_children():
-            treeview.delete(item)
+    def _formatar_linha_pedido(self, pedido):
+        pedido_id, nome_cliente, data, total_centavos = pedido
+        return pedido_id, (pedido_id, nome_cliente, data, formatar_centavos(total_centavos, "."))
 
-        sql = f"SELECT {colunas_sql} FROM {tabela}"
-        parametros = ()
-
-        if termo:
-            sql += f" WHERE {where_clause}"
-            if tabela == "clientes":
-                parametros = (f'%{termo}%', f'%{termo}%')
-            elif tabela == "produtos":
-                parametros = (f'%{termo}%',)
+    def _formatar_linha_produto(self, produto):
+        produto_id, nome, preco_centavos, estoque = produto
+        return produto_id, nome, formatar_centavos(preco_centavos, "."), estoque
 
+    @medido()
+    def _exibir_resultados(self, treeview, botao_mais, linhas, tem_mais, formatar=None):
+        """Exibe o resultado de uma busca ao vivo e habilita o botão 'Mostrar mais' se houver mais linhas."""
         try:
-            dados = executar_comando(sql, parametros, fetchall=True)
-            if dados:
-                for dado in dados:
-                    if tabela == "produtos":
-                        dado_list = list(dado)
-                        dado_list[2] = f"{dado_list[2]:.2f}"
-                        treeview.insert("", "end", iid=dado_list[0], values=dado_list)
-                    else:
-                        treeview.insert("", "end", iid=dado[0], values=dado)
-
+            treeview.sincronizador.atualizar(
+                [(dado[0], formatar(dado) if formatar else dado) for dado in linhas])
         except Exception as e:
-            logging.error(f"Erro ao carregar dados de {tabela}: {e}")
-            messagebox.showerror("Erro de DB", f"Não foi possível carregar a lista de {tabela}: {e}")
+            logging.error(f"Erro ao exibir resultados da busca: {e}")
+            messagebox.showerror("Erro", f"Não foi possível exibir a lista: {e}")
+
+        botao_mais.config(state="normal" if tem_mais else "disabled")
+
+    def _erro_busca(self, treeview, botao_mais, erro):
+        """Falha de uma busca ao vivo: substitui o "Carregando..." pela mensagem de erro."""
+        treeview.sincronizador.exibir_mensagem("Erro ao buscar.")
+        botao_mais.config(state="disabled")
+        messagebox.showerror("Erro de DB", f"Não foi possível buscar: {erro}")
 
     # --- MÉTODOS CRUD E ABERTURA DE FORMS ---
 
@@ -514,12 +700,14 @@ class App(ThemedTk):
         return selecionado[0]
 
     def abrir_novo_cliente(self):
-        ClienteForm(self, recarregar_callback=self.recarregar_clientes)
+        ClienteForm(self, recarregar_callback=lambda: self.marcar_desatualizadas("Clientes", "Dashboard"))
 
     def abrir_editar_cliente(self):
         cliente_id = self._get_selected_id(self.tree_clientes)
         if cliente_id:
-            ClienteForm(self, cliente_id=int(cliente_id), recarregar_callback=self.recarregar_clientes)
+            # O nome do cliente também aparece na lista de pedidos
+            ClienteForm(self, cliente_id=int(cliente_id),
+                        recarregar_callback=lambda: self.marcar_desatualizadas("Clientes", "Pedidos"))
 
     def excluir_cliente(self):
         cliente_id = self._get_selected_id(self.tree_clientes)
@@ -527,28 +715,33 @@ class App(ThemedTk):
             if messagebox.askyesno("Confirmar Exclusão",
                                    "Tem certeza que deseja excluir o cliente selecionado? "
                                    "Todos os pedidos associados serão EXCLUÍDOS (CASCADE)."):
-                try:
-                    nome_cliente_excluido = self.tree_clientes.item(cliente_id, 'values')[1]
+                nome_cliente_excluido = self.tree_clientes.item(cliente_id, 'values')[1]
+
+                # A exclusão em cascata pode ser demorada: roda no executor, com o indicador de ocupado
+                self.executor_db.submeter(
+                    executar_comando, "DELETE FROM clientes WHERE id = ?", (cliente_id,),
+                    ao_concluir=lambda _: self._cliente_excluido(cliente_id, nome_cliente_excluido),
+                    ao_erro=lambda e: self._erro_exclusao("cliente", e))
 
-                    executar_comando("DELETE FROM clientes WHERE id = ?", (cliente_id,))
+    def _cliente_excluido(self, cliente_id, nome_cliente_excluido):
+        registrar_acao("CLIENTE", "EXCLUIR",
+                       f"ID {cliente_id}: {nome_cliente_excluido} (Pedidos associados excluídos)")
 
-                    registrar_acao("CLIENTE", "EXCLUIR",
-                                   f"ID {cliente_id}: {nome_cliente_excluido} (Pedidos associados excluídos)")
+        messagebox.showinfo("Sucesso", "Cliente e pedidos associados excluídos!")
+        self.marcar_desatualizadas("Clientes", "Pedidos", "Dashboard")
 
-                    messagebox.showinfo("Sucesso", "Cliente e pedidos associados excluídos!")
-                    self.recarregar_clientes()
-                    self.recarregar_dashboard()
-                except Exception as e:
-                    logging.error(f"Erro ao excluir cliente: {e}")
-                    messagebox.showerror("Erro de DB", f"Não foi possível excluir o cliente: {e}")
+    def _erro_exclusao(self, entidade, erro):
+        logging.error(f"Erro ao excluir {entidade}: {erro}")
+        messagebox.showerror("Erro de DB", f"Não foi possível excluir o {entidade}: {erro}")
 
     def abrir_novo_produto(self):
-        ProdutoForm(self, recarregar_callback=self.recarregar_produtos)
+        ProdutoForm(self, recarregar_callback=lambda: self.marcar_desatualizadas("Produtos"))
 
     def abrir_editar_produto(self):
         produto_id = self._get_selected_id(self.tree_produtos)
         if produto_id:
-            ProdutoForm(self, produto_id=int(produto_id), recarregar_callback=self.recarregar_produtos)
+            ProdutoForm(self, produto_id=int(produto_id),
+                        recarregar_callback=lambda: self.marcar_desatualizadas("Produtos"))
 
     def excluir_produto(self):
         produto_id = self._get_selected_id(self.tree_produtos)
@@ -556,24 +749,20 @@ class App(ThemedTk):
             if messagebox.askyesno("Confirmar Exclusão",
                                    "Tem certeza que deseja excluir o produto selecionado? "
                                    "Pedidos que o contêm serão afetados (o item permanecerá com o nome, mas sem link)."):
-                try:
-                    executar_comando("DELETE FROM produtos WHERE id = ?", (produto_id,))
+                self.executor_db.submeter(
+                    executar_comando, "DELETE FROM produtos WHERE id = ?", (produto_id,),
+                    ao_concluir=lambda _: self._produto_excluido(produto_id),
+                    ao_erro=lambda e: self._erro_exclusao("produto", e))
 
-                    registrar_acao("PRODUTO", "EXCLUIR", f"ID {produto_id} (Verifique pedidos afetados)")
+    def _produto_excluido(self, produto_id):
+        registrar_acao("PRODUTO", "EXCLUIR", f"ID {produto_id} (Verifique pedidos afetados)")
 
-                    messagebox.showinfo("Sucesso", "Produto excluído!")
-                    self.recarregar_produtos()
-                except Exception as e:
-                    logging.error(f"Erro ao excluir produto: {e}")
-                    messagebox.showerror("Erro de DB", f"Não foi possível excluir o produto: {e}")
+        messagebox.showinfo("Sucesso", "Produto excluído!")
+        self.marcar_desatualizadas("Produtos")
 
     def abrir_novo_pedido(self):
-        def callback_completo():
-            self.recarregar_pedidos()
-            self.recarregar_produtos()
-            self.recarregar_dashboard()
-
-        PedidoForm(self, recarregar_callback=callback_completo)
+        # Um pedido novo altera a lista de pedidos, o estoque dos produtos e as métricas
+        PedidoForm(self, recarregar_callback=lambda: self.marcar_desatualizadas("Pedidos", "Produtos", "Dashboard"))
 
     def abrir_detalhes_pedido(self):
         """Abre a janela de detalhes para o pedido selecionado."""
@@ -1,22 +1,48 @@
 # utils/analise_ia.py (VERSÃO FINAL COMPLETA COM SUPORTE A .ENV)
-from google import genai
-from google.genai.errors import APIError
+import hashlib
+import json
 import logging
 import os
-# NOVO: Importa a biblioteca para carregar o arquivo .env
-from dotenv import load_dotenv
-
-# ----------------------------------------------------
-# CARREGAMENTO DO .ENV: Esta linha deve ser a primeira a executar
-# para que o genai.Client() possa encontrar a chave na variável de ambiente.
-load_dotenv()
-# ----------------------------------------------------
+import random
+import threading
+import time
+from db import DATABASE_NAME, obter_conexao, Error
+from utils.analise_local import analisar_pedidos_local
+from utils.contexto_ia import montar_contexto_periodo
+from utils.dinheiro import formatar_centavos
 
 # Configuração de Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# A biblioteca 'google-genai' buscará automaticamente a chave da variável de ambiente GEMINI_API_KEY.
+# A biblioteca 'google-genai' buscará automaticamente a chave da variável de ambiente GEMINI_API_KEY
+# (que pode vir do .env, carregado por carregar_ambiente() no primeiro uso da IA).
 MODELO_IA = "gemini-2.5-flash"
+TEMPERATURA_IA = 0.3
+TIMEOUT_IA_S = int(os.getenv("APP_PEDIDOS_TIMEOUT_IA_S", "60"))  # Tempo máximo de uma análise (com retentativas)
+# Endereço alternativo da API (ex.: o stub local de utils/stub_gemini.py): APP_PEDIDOS_GEMINI_URL; vazio = API oficial
+VAR_AMBIENTE_URL_IA = "APP_PEDIDOS_GEMINI_URL"
+
+# SDK do Gemini (google-genai): importado só no primeiro uso por carregar_sdk_ia(), pois sozinho
+# responde pela maior parte do tempo de inicialização do app e muitas sessões nunca usam a IA.
+genai = None
+types = None
+APIError = None
+_sdk_lock = threading.Lock()
+_ambiente_lock = threading.Lock()
+_ambiente_carregado = False
+
+# Retentativas com backoff exponencial e jitter para erros transitórios (cota, sobrecarga, indisponibilidade)
+MAX_TENTATIVAS_IA = 4
+ESPERA_INICIAL_IA_S = 1.0
+ESPERA_MAXIMA_IA_S = 16.0
+CODIGOS_RETENTAVEIS = frozenset({408, 429, 500, 502, 503, 504})
+
+# Cache persistente (tabela cache_ia): mesma entrada -> mesma resposta, sem nova chamada à API.
+# Fica em um arquivo ao lado do banco: escrito no banco principal, mudaria PRAGMA data_version e
+# esvaziaria o cache de leituras de db.py (clientes, produtos, métricas) a cada resposta.
+ARQUIVO_CACHE_IA = f"{os.path.splitext(DATABASE_NAME)[0]}.cache_ia.db"
+CACHE_IA_TTL_S = 24 * 60 * 60
+CACHE_IA_MAX_ENTRADAS = 200
 
 PROMPT_SISTEMA = """
 Você é um analista de negócios. Sua tarefa é analisar os dados de pedidos brutos fornecidos 
@@ -31,53 +57,412 @@ Formate sua resposta como um resumo textual em blocos, usando emojis, e não ult
 """
 
 
-def analisar_pedidos_ia(dados_pedidos_brutos):
+def _formatar_contexto(dados_pedidos_brutos):
     """
-    Formata os dados brutos dos pedidos e envia para a API do Gemini para análise.
+    Formata os dados brutos dos pedidos como texto para o prompt (uma janela pequena de pedidos;
+    para períodos inteiros, use utils/contexto_ia.py, que agrega em SQL).
     """
-    if not dados_pedidos_brutos:
-        return "❌ Não há pedidos suficientes para gerar uma análise."
-
-    # --- 1. Formatação dos Dados para o Prompt ---
-
-    contexto_dados = "## Dados Brutos dos Últimos Pedidos\n\n"
+    partes = ["## Dados Brutos dos Últimos Pedidos\n\n"]
 
     for pedido in dados_pedidos_brutos:
         itens_str = ", ".join([
-            f"{item['quantidade']}x {item['produto_nome']} (R$ {item['preco_unit']:.2f})"
+            f"{item['quantidade']}x {item['produto_nome']} (R$ {formatar_centavos(item['preco_unit_centavos'], '.')})"
             for item in pedido['itens']
         ])
 
-        contexto_dados += (
+        partes.append(
             f"Pedido ID: {pedido['id']}, Cliente: {pedido['cliente']}, Data: {pedido['data']}, "
-            f"Total: R$ {pedido['total']:.2f}\n"
+            f"Total: R$ {formatar_centavos(pedido['total_centavos'], '.')}\n"
             f"Itens: {itens_str}\n---\n"
         )
 
-    contexto_dados += "\nPor favor, gere a análise com base nestes dados."
+    partes.append("\nPor favor, gere a análise com base nestes dados.")
+    return "".join(partes)
+
+
+# --- CACHE DE RESPOSTAS ---
+
+_cache_lock = threading.Lock()
+_cache_stats = {"acertos": 0, "falhas": 0}
+_cache_preparado = False  # Tabela já criada no arquivo do cache (neste processo)
+
+
+def _preparar_cache(conn):
+    """Cria a tabela do cache no arquivo próprio, no primeiro uso."""
+    global _cache_preparado
+    if _cache_preparado:
+        return
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS cache_ia (
+            chave TEXT PRIMARY KEY,
+            resposta TEXT NOT NULL,
+            criado_em REAL NOT NULL,
+            acessado_em REAL NOT NULL
+        )
+    """)
+    # Ordem de uso para o descarte LRU
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_ia_acessado_em ON cache_ia (acessado_em)")
+    conn.commit()
+    _cache_preparado = True
+
+
+def _chave_cache(contexto_dados):
+    """Hash de tudo que influencia a resposta: dados, modelo, prompt e temperatura."""
+    material = json.dumps([contexto_dados, MODELO_IA, PROMPT_SISTEMA, TEMPERATURA_IA], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def _ler_cache(chave):
+    """Retorna a resposta em cache (atualizando o último acesso) ou None se ausente/expirada."""
+    agora = time.time()
+    resposta = None
+
+    with obter_conexao(ARQUIVO_CACHE_IA) as conn:
+        if conn is not None:
+            try:
+                _preparar_cache(conn)
+                row = conn.execute("SELECT resposta, criado_em FROM cache_ia WHERE chave = ?", (chave,)).fetchone()
+                if row and agora - row[1] <= CACHE_IA_TTL_S:
+                    resposta = row[0]
+                    conn.execute("UPDATE cache_ia SET acessado_em = ? WHERE chave = ?", (agora, chave))
+                elif row:
+                    conn.execute("DELETE FROM cache_ia WHERE chave = ?", (chave,))
+                conn.commit()
+            except Error as e:
+                conn.rollback()
+                logging.warning(f"Erro ao ler cache de IA: {e}")
+
+    with _cache_lock:
+        _cache_stats["acertos" if resposta is not None else "falhas"] += 1
+    return resposta
+
+
+def _gravar_cache(chave, resposta):
+    """Grava a resposta e descarta as entradas expiradas e as menos usadas além do limite (LRU)."""
+    agora = time.time()
+
+    with obter_conexao(ARQUIVO_CACHE_IA) as conn:
+        if conn is None:
+            return
+
+        try:
+            _preparar_cache(conn)
+            conn.execute("INSERT OR REPLACE INTO cache_ia (chave, resposta, criado_em, acessado_em) VALUES (?, ?, ?, ?)",
+                         (chave, resposta, agora, agora))
+            conn.execute("DELETE FROM cache_ia WHERE criado_em < ?", (agora - CACHE_IA_TTL_S,))
+            conn.execute("""
+                DELETE FROM cache_ia WHERE chave IN (
+                    SELECT chave FROM cache_ia ORDER BY acessado_em DESC LIMIT -1 OFFSET ?
+                )
+            """, (CACHE_IA_MAX_ENTRADAS,))
+            conn.commit()
+        except Error as e:
+            conn.rollback()
+            logging.warning(f"Erro ao gravar cache de IA: {e}")
+
+
+def estatisticas_cache_ia():
+    """Retorna acertos, falhas e taxa de acerto do cache de análises."""
+    with _cache_lock:
+        acertos, falhas = _cache_stats["acertos"], _cache_stats["falhas"]
+
+    total = acertos + falhas
+    return {"acertos": acertos, "falhas": falhas, "taxa_acerto": (acertos / total) if total else 0.0}
+
+
+def limpar_cache_ia():
+    """Remove todas as respostas em cache."""
+    with obter_conexao(ARQUIVO_CACHE_IA) as conn:
+        if conn is not None:
+            _preparar_cache(conn)
+            conn.execute("DELETE FROM cache_ia")
+            conn.commit()
+
+
+def carregar_ambiente():
+    """Carrega o .env no ambiente (uma única vez), no primeiro uso da IA e não na abertura do app."""
+    global _ambiente_carregado
+    with _ambiente_lock:
+        if not _ambiente_carregado:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _ambiente_carregado = True
+
+
+def chave_api_configurada():
+    """Indica se há chave do Gemini no ambiente (ou no .env); sem ela, a análise é calculada localmente."""
+    carregar_ambiente()
+    return bool(os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"))
+
+
+def _analise_local(resumir, motivo):
+    """resumir() produz o resumo de utils/analise_local.py equivalente aos dados enviados à IA."""
+    logging.info(f"Usando a análise local de pedidos: {motivo}")
+    return f"ℹ️ {motivo} Resumo calculado localmente:\n\n" + resumir()
+
+
+# --- SDK, CLIENTE E RETENTATIVAS ---
+
+def carregar_sdk_ia():
+    """Importa o SDK do Gemini (uma única vez). Levanta ImportError se google-genai não estiver instalado."""
+    global genai, types, APIError
+    carregar_ambiente()
+    with _sdk_lock:
+        if genai is None:
+            from google import genai as sdk_genai
+            from google.genai import types as sdk_types
+            from google.genai.errors import APIError as sdk_api_error
+            genai, types, APIError = sdk_genai, sdk_types, sdk_api_error
+
+
+def pre_carregar_sdk_ia():
+    """Importa o SDK em uma thread de fundo (após a janela aparecer), para a primeira análise não esperar."""
+    def carregar():
+        try:
+            carregar_sdk_ia()
+            logging.info("SDK do Gemini pré-carregado.")
+        except ImportError as e:
+            logging.warning(f"SDK do Gemini indisponível: {e}")
+
+    threading.Thread(target=carregar, name="pre-carga-sdk-ia", daemon=True).start()
+
+
+_clientes_lock = threading.Lock()
+_clientes = {}  # timeout (ms) -> genai.Client
+
+
+def obter_cliente_ia(timeout=TIMEOUT_IA_S):
+    """
+    Cliente do Gemini compartilhado entre as análises (um por timeout): reaproveita as conexões HTTP
+    em vez de abrir uma nova a cada chamada. O timeout do SDK (em ms) vale para cada requisição.
+    """
+    carregar_sdk_ia()  # Também carrega o .env: a chave e a URL alternativa podem estar nele
+    timeout_ms = int(timeout * 1000)
+    with _clientes_lock:
+        cliente = _clientes.get(timeout_ms)
+        if cliente is None:
+            opcoes = {"timeout": timeout_ms}
+            url_base = os.getenv(VAR_AMBIENTE_URL_IA)
+            if url_base:
+                opcoes["base_url"] = url_base
+            cliente = genai.Client(http_options=types.HttpOptions(**opcoes))
+            _clientes[timeout_ms] = cliente
+    return cliente
+
+
+def fechar_clientes_ia():
+    """Fecha as conexões dos clientes compartilhados (chamado ao encerrar a aplicação)."""
+    with _clientes_lock:
+        clientes = list(_clientes.values())
+        _clientes.clear()
+
+    for cliente in clientes:
+        try:
+            cliente.close()
+        except Exception as e:
+            logging.warning(f"Erro ao fechar cliente do Gemini: {e}")
+
+
+def _espera_retentativa(tentativa):
+    """Backoff exponencial com jitter total: espera aleatória entre 0 e min(máximo, inicial * 2^tentativa)."""
+    return random.uniform(0, min(ESPERA_MAXIMA_IA_S, ESPERA_INICIAL_IA_S * 2 ** tentativa))
+
+
+def _aguardar_retentativa(erro, tentativa, prazo, cancelado=None):
+    """
+    Decide se a chamada que falhou com 'erro' deve ser repetida e, nesse caso, aguarda o backoff.
+    Não repete erros definitivos, além de MAX_TENTATIVAS_IA, após o prazo ou se a análise for cancelada.
+    """
+    if getattr(erro, "code", None) not in CODIGOS_RETENTAVEIS or tentativa + 1 >= MAX_TENTATIVAS_IA:
+        return False
+
+    espera = _espera_retentativa(tentativa)
+    if time.monotonic() + espera >= prazo:
+        return False
+
+    logging.warning(f"Erro transitório na API do Gemini ({erro.code}); nova tentativa em {espera:.1f}s "
+                    f"({tentativa + 2}/{MAX_TENTATIVAS_IA}).")
+    if cancelado is not None:
+        return not cancelado.wait(espera)
+    time.sleep(espera)
+    return True
+
+
+def _montar_conteudo(contexto_dados):
+    return [
+        {"role": "user", "parts": [
+            {"text": PROMPT_SISTEMA},
+            {"text": contexto_dados}
+        ]}
+    ]
+
+
+def analisar_pedidos_ia(dados_pedidos_brutos, forcar_atualizacao=False):
+    """
+    Formata os dados brutos dos pedidos e envia para a API do Gemini para análise.
+    Respostas para os mesmos dados vêm do cache, salvo com forcar_atualizacao=True.
+    """
+    if not dados_pedidos_brutos:
+        return "❌ Não há pedidos suficientes para gerar uma análise."
+
+    if not chave_api_configurada():
+        return _analise_local(lambda: analisar_pedidos_local(dados_pedidos_brutos),
+                              "Chave de API do Gemini não configurada.")
+
+    # --- 1. Formatação dos Dados para o Prompt ---
+    contexto_dados = _formatar_contexto(dados_pedidos_brutos)
+
+    chave = _chave_cache(contexto_dados)
+    if not forcar_atualizacao:
+        resposta_cache = _ler_cache(chave)
+        if resposta_cache is not None:
+            logging.info("Análise de IA servida pelo cache.")
+            return resposta_cache
 
     # --- 2. Comunicação com a API do Gemini ---
     try:
-        # A chave já está carregada no ambiente pela chamada load_dotenv()
-        client = genai.Client()
-
-        response = client.models.generate_content(
-            model=MODELO_IA,
-            contents=[
-                {"role": "user", "parts": [
-                    {"text": PROMPT_SISTEMA},
-                    {"text": contexto_dados}
-                ]}
-            ],
-            config={"temperature": 0.3}
-        )
+        carregar_sdk_ia()  # Antes do try abaixo: as cláusulas 'except APIError' dependem do SDK
+    except ImportError:
+        return _analise_local(lambda: analisar_pedidos_local(dados_pedidos_brutos),
+                              "Biblioteca google-genai não instalada.")
+
+    prazo = time.monotonic() + TIMEOUT_IA_S
+    tentativa = 0
+
+    try:
+        client = obter_cliente_ia()
+
+        while True:
+            try:
+                response = client.models.generate_content(
+                    model=MODELO_IA,
+                    contents=_montar_conteudo(contexto_dados),
+                    config={"temperature": TEMPERATURA_IA}
+                )
+                break
+            except APIError as e:
+                if not _aguardar_retentativa(e, tentativa, prazo):
+                    raise
+                tentativa += 1
 
+        if response.text:
+            _gravar_cache(chave, response.text)
         return response.text
 
     except APIError as e:
         logging.error(f"Erro na API do Gemini: {e}")
         return (f"🛑 Erro de API (Gemini): Falha na comunicação ou cota excedida. "
-                f"Verifique sua chave de API e o saldo. Detalhe: {e}")
+                f"Verifique sua chave de API e o saldo. Detalhe: {e}\n\n"
+                + _analise_local(lambda: analisar_pedidos_local(dados_pedidos_brutos), "IA indisponível."))
+    except Exception as e:
+        logging.error(f"Erro desconhecido ao analisar pedidos com Gemini: {e}")
+        return (f"🚨 Erro Desconhecido: {e}\n\n"
+                + _analise_local(lambda: analisar_pedidos_local(dados_pedidos_brutos), "IA indisponível."))
+
+
+def analisar_pedidos_ia_stream(dados_pedidos_brutos, cancelado=None, timeout=TIMEOUT_IA_S,
+                               forcar_atualizacao=False):
+    """
+    Versão em streaming de analisar_pedidos_ia: produz os trechos de texto à medida que o Gemini
+    os gera. Deve rodar fora da thread da interface.
+    'cancelado' (threading.Event) interrompe a leitura e as esperas entre retentativas;
+    'timeout' (segundos) limita a análise inteira.
+    Uma resposta em cache é produzida de uma só vez; só respostas completas são gravadas no cache.
+    Sem chave de API ou em caso de falha na comunicação, produz o resumo de utils/analise_local.py.
+    """
+    if not dados_pedidos_brutos:
+        yield "❌ Não há pedidos suficientes para gerar uma análise."
+        return
+
+    yield from _analisar_stream(_formatar_contexto(dados_pedidos_brutos),
+                                lambda: analisar_pedidos_local(dados_pedidos_brutos),
+                                cancelado, timeout, forcar_atualizacao)
+
+
+def analisar_periodo_ia_stream(data_inicio=None, data_fim=None, contexto=None, cancelado=None,
+                               timeout=TIMEOUT_IA_S, forcar_atualizacao=False):
+    """
+    Como analisar_pedidos_ia_stream, mas para todos os pedidos de um período: o prompt leva o resumo
+    agregado de utils/contexto_ia.py (limitado ao orçamento de tokens), não os pedidos individuais.
+    'contexto' evita remontar um contexto já obtido com montar_contexto_periodo.
+    """
+    if contexto is None:
+        contexto = montar_contexto_periodo(data_inicio, data_fim)
+    if contexto is None:
+        yield "🚨 Erro ao agregar os pedidos do período. Verifique o log."
+        return
+    if not contexto["num_pedidos"]:
+        yield "❌ Não há pedidos suficientes para gerar uma análise."
+        return
+
+    yield from _analisar_stream(contexto["texto"],
+                                lambda: analisar_pedidos_local(data_inicio=data_inicio, data_fim=data_fim),
+                                cancelado, timeout, forcar_atualizacao)
+
+
+def _analisar_stream(contexto_dados, resumo_local, cancelado, timeout, forcar_atualizacao):
+    if not chave_api_configurada():
+        yield _analise_local(resumo_local, "Chave de API do Gemini não configurada.")
+        return
+
+    chave = _chave_cache(contexto_dados)
+    if not forcar_atualizacao:
+        resposta_cache = _ler_cache(chave)
+        if resposta_cache is not None:
+            logging.info("Análise de IA servida pelo cache.")
+            yield resposta_cache
+            return
+
+    try:
+        carregar_sdk_ia()  # Antes do try abaixo: as cláusulas 'except APIError' dependem do SDK
+    except ImportError:
+        yield _analise_local(resumo_local, "Biblioteca google-genai não instalada.")
+        return
+
+    prazo = time.monotonic() + timeout
+    trechos = []
+    tentativa = 0
+
+    try:
+        # Timeout do SDK (em ms) cobre a conexão e a espera de cada trecho
+        client = obter_cliente_ia(timeout)
+
+        while True:
+            try:
+                stream = client.models.generate_content_stream(
+                    model=MODELO_IA,
+                    contents=_montar_conteudo(contexto_dados),
+                    config={"temperature": TEMPERATURA_IA}
+                )
+
+                for chunk in stream:
+                    if cancelado is not None and cancelado.is_set():
+                        logging.info("Análise de IA cancelada pelo usuário.")
+                        return
+                    if time.monotonic() > prazo:
+                        yield f"\n\n⏱️ Tempo limite de {timeout}s excedido. A análise acima pode estar incompleta."
+                        return
+                    if chunk.text:
+                        trechos.append(chunk.text)
+                        yield chunk.text
+                break
+            except APIError as e:
+                # Só repete antes do primeiro trecho: um texto parcial já exibido não pode ser refeito
+                if trechos or not _aguardar_retentativa(e, tentativa, prazo, cancelado):
+                    if cancelado is not None and cancelado.is_set():
+                        return
+                    raise
+                tentativa += 1
+
+        if trechos:
+            _gravar_cache(chave, "".join(trechos))
+
+    except APIError as e:
+        logging.error(f"Erro na API do Gemini: {e}")
+        yield (f"🛑 Erro de API (Gemini): Falha na comunicação ou cota excedida. "
+               f"Verifique sua chave de API e o saldo. Detalhe: {e}")
+        yield "\n\n" + _analise_local(resumo_local, "IA indisponível.")
     except Exception as e:
         logging.error(f"Erro desconhecido ao analisar pedidos com Gemini: {e}")
-        return f"🚨 Erro Desconhecido: {e}"
\ No newline at end of file
+        yield f"🚨 Erro Desconhecido: {e}"
+        yield "\n\n" + _analise_local(resumo_local, "IA indisponível.")
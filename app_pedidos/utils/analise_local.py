@@ -0,0 +1,148 @@
+# utils/analise_local.py
+import logging
+from collections import Counter
+from db import obter_conexao, montar_filtro_pedidos, Error
+from utils.dinheiro import dividir_centavos, formatar_moeda
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Os mesmos quatro insights pedidos em PROMPT_SISTEMA (utils/analise_ia.py), calculados de forma exata
+# no próprio banco: não dependem de chave de API nem de rede.
+TOP_PRODUTOS = 3
+FATOR_PICO_VOLUME = 2.0  # Um dia é "pico" quando tem mais que FATOR x a média diária de pedidos
+MAX_PICOS = 3
+
+
+def _detectar_picos(pedidos_por_dia):
+    """Recebe {data: nº de pedidos} e devolve (média diária, [(data, nº de pedidos), ...] dos picos)."""
+    if not pedidos_por_dia:
+        return 0.0, []
+
+    media = sum(pedidos_por_dia.values()) / len(pedidos_por_dia)
+    picos = [(data, n) for data, n in pedidos_por_dia.items() if n > FATOR_PICO_VOLUME * media]
+    picos.sort(key=lambda pico: (pico[1], pico[0]), reverse=True)
+    return media, picos[:MAX_PICOS]
+
+
+def _montar_insights(num_pedidos, faturamento_centavos, ultima_data, top_produtos, pedidos_por_dia, descricao):
+    media_diaria, picos = _detectar_picos(pedidos_por_dia)
+    return {
+        "descricao": descricao,
+        "num_pedidos": num_pedidos,
+        "faturamento_centavos": faturamento_centavos,
+        "ticket_medio_centavos": dividir_centavos(faturamento_centavos, num_pedidos),
+        "ultima_data": ultima_data,
+        "top_produtos": top_produtos,
+        "dias_com_pedidos": len(pedidos_por_dia),
+        "media_diaria": media_diaria,
+        "picos": picos,
+    }
+
+
+def calcular_insights(data_inicio=None, data_fim=None):
+    """
+    Calcula os insights de todos os pedidos do período (ou de todo o histórico) com consultas agregadas:
+    - totais e data mais recente: idx_pedidos_data;
+    - pedidos por dia: GROUP BY sobre o mesmo índice (uma linha por dia);
+    - top produtos: tabela resumo vendas_diarias_produto (uma linha por dia e produto),
+      sem varrer itens_pedido.
+    Retorna um dicionário (ver _montar_insights) ou None em caso de erro.
+    """
+    # Sem alias: o mesmo filtro vale para pedidos e para vendas_diarias_produto (ambas têm a coluna data)
+    where, parametros = montar_filtro_pedidos(data_inicio, data_fim, prefixo="")
+
+    with obter_conexao() as conn:
+        if conn is None:
+            return None
+
+        try:
+            num_pedidos, faturamento_centavos, ultima_data = conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(total_centavos), 0), MAX(data) FROM pedidos{where}", parametros
+            ).fetchone()
+
+            pedidos_por_dia = dict(conn.execute(
+                f"SELECT data, COUNT(*) FROM pedidos{where} GROUP BY data", parametros
+            ).fetchall())
+
+            top_produtos = conn.execute(f"""
+                SELECT produto_nome, SUM(quantidade) AS total_vendido
+                FROM vendas_diarias_produto{where}
+                GROUP BY produto_nome
+                HAVING total_vendido > 0
+                ORDER BY total_vendido DESC, produto_nome
+                LIMIT ?
+            """, parametros + (TOP_PRODUTOS,)).fetchall()
+        except Error as e:
+            logging.error(f"Erro ao calcular insights locais: {e}")
+            return None
+
+    if data_inicio or data_fim:
+        descricao = f"Período: {data_inicio or 'início'} a {data_fim or 'hoje'}"
+    else:
+        descricao = "Todos os pedidos"
+
+    return _montar_insights(num_pedidos, faturamento_centavos, ultima_data, top_produtos, pedidos_por_dia,
+                            descricao)
+
+
+def calcular_insights_pedidos(dados_pedidos_brutos):
+    """Mesmos insights de calcular_insights, sobre pedidos já carregados (formato de buscar_pedidos_janela)."""
+    quantidades = Counter()
+    pedidos_por_dia = Counter()
+
+    for pedido in dados_pedidos_brutos:
+        pedidos_por_dia[pedido['data']] += 1
+        for item in pedido['itens']:
+            quantidades[item['produto_nome']] += item['quantidade']
+
+    top_produtos = sorted(quantidades.items(), key=lambda item: (-item[1], item[0]))[:TOP_PRODUTOS]
+    faturamento_centavos = sum(pedido['total_centavos'] for pedido in dados_pedidos_brutos)
+    ultima_data = max(pedidos_por_dia) if pedidos_por_dia else None
+    descricao = f"Últimos {len(dados_pedidos_brutos)} pedidos"
+
+    return _montar_insights(len(dados_pedidos_brutos), faturamento_centavos, ultima_data, top_produtos,
+                            dict(pedidos_por_dia), descricao)
+
+
+def formatar_resumo(insights):
+    """Resumo em blocos com emojis, no mesmo formato das respostas da análise de IA."""
+    if insights is None:
+        return "🚨 Erro ao calcular a análise local. Verifique o log."
+    if not insights["num_pedidos"]:
+        return "❌ Não há pedidos suficientes para gerar uma análise."
+
+    linhas = [f"📊 Análise Local ({insights['descricao']})", ""]
+
+    linhas.append(f"🏆 Top {TOP_PRODUTOS} Produtos (por quantidade):")
+    for posicao, (nome, quantidade) in enumerate(insights["top_produtos"], start=1):
+        linhas.append(f"   {posicao}. {nome} — {quantidade} un.")
+    linhas.append("")
+
+    linhas.append(f"💰 Ticket Médio: {formatar_moeda(insights['ticket_medio_centavos'])} "
+                  f"({insights['num_pedidos']} pedidos, total de {formatar_moeda(insights['faturamento_centavos'])})")
+    linhas.append(f"📅 Pedido mais recente: {insights['ultima_data']}")
+    linhas.append("")
+
+    media = f"{insights['media_diaria']:.1f}".replace('.', ',')
+    linhas.append("🔎 Observações:")
+    if insights["picos"]:
+        for data, quantidade in insights["picos"]:
+            linhas.append(f"   • Pico de volume em {data}: {quantidade} pedidos (média de {media} por dia).")
+    else:
+        linhas.append(f"   • Volume estável: {insights['dias_com_pedidos']} dia(s) com pedidos, "
+                      f"média de {media} pedido(s) por dia.")
+
+    return "\n".join(linhas)
+
+
+def analisar_pedidos_local(dados_pedidos_brutos=None, data_inicio=None, data_fim=None):
+    """
+    Alternativa offline à análise de IA: resumo dos pedidos informados ou, sem eles,
+    de todos os pedidos do período.
+    """
+    if dados_pedidos_brutos is not None:
+        if not dados_pedidos_brutos:
+            return "❌ Não há pedidos suficientes para gerar uma análise."
+        return formatar_resumo(calcular_insights_pedidos(dados_pedidos_brutos))
+
+    return formatar_resumo(calcular_insights(data_inicio, data_fim))
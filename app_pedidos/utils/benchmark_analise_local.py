@@ -0,0 +1,110 @@
+# utils/benchmark_analise_local.py
+"""
+Benchmark das análises locais (utils/analise_local.py) sobre um banco sintético.
+
+Uso (a partir de app_pedidos/):
+    python -m utils.benchmark_analise_local [--pedidos 1000000] [--itens 2] [--produtos 2000]
+
+O banco é criado em um diretório temporário (o pedidos.db da aplicação não é tocado).
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+import db
+from utils.analise_local import calcular_insights, formatar_resumo
+
+
+def _popular(conn, num_pedidos, itens_por_pedido, num_produtos, num_clientes, dias):
+    rng = random.Random(42)
+    inicio = date.today() - timedelta(days=dias - 1)
+    datas = [(inicio + timedelta(days=d)).isoformat() for d in range(dias)]
+
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO clientes (id, nome, email, telefone) VALUES (?, ?, ?, ?)",
+                     ((i, f"Cliente {i}", f"cliente{i}@exemplo.com", f"(11) 9{i:08d}")
+                      for i in range(1, num_clientes + 1)))
+    conn.executemany("INSERT INTO produtos (id, nome, preco_centavos, estoque) VALUES (?, ?, ?, ?)",
+                     ((i, f"Produto {i}", rng.randint(500, 20000), 1000) for i in range(1, num_produtos + 1)))
+
+    item_id = 0
+    lote_pedidos, lote_itens = [], []
+    for pedido_id in range(1, num_pedidos + 1):
+        total_centavos = 0
+        for _ in range(itens_por_pedido):
+            item_id += 1
+            produto = rng.randint(1, num_produtos)
+            quantidade = rng.randint(1, 5)
+            preco_centavos = 1000 + (produto % 50) * 100
+            total_centavos += quantidade * preco_centavos
+            lote_itens.append((item_id, pedido_id, produto, f"Produto {produto}", quantidade, preco_centavos))
+        lote_pedidos.append((pedido_id, rng.randint(1, num_clientes), rng.choice(datas), total_centavos))
+
+        if len(lote_pedidos) >= 50_000:
+            conn.executemany("INSERT INTO pedidos (id, cliente_id, data, total_centavos) VALUES (?, ?, ?, ?)", lote_pedidos)
+            conn.executemany("INSERT INTO itens_pedido (id, pedido_id, produto_id, produto_nome, quantidade, "
+                             "preco_unit_centavos) VALUES (?, ?, ?, ?, ?, ?)", lote_itens)
+            lote_pedidos, lote_itens = [], []
+
+    conn.executemany("INSERT INTO pedidos (id, cliente_id, data, total_centavos) VALUES (?, ?, ?, ?)", lote_pedidos)
+    conn.executemany("INSERT INTO itens_pedido (id, pedido_id, produto_id, produto_nome, quantidade, "
+                     "preco_unit_centavos) VALUES (?, ?, ?, ?, ?, ?)", lote_itens)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.commit()
+    return datas
+
+
+def _cronometrar(funcao, repeticoes):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), statistics.median(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das análises locais de pedidos.")
+    parser.add_argument("--pedidos", type=int, default=1_000_000)
+    parser.add_argument("--itens", type=int, default=2, help="Itens por pedido")
+    parser.add_argument("--produtos", type=int, default=2000)
+    parser.add_argument("--clientes", type=int, default=20_000)
+    parser.add_argument("--dias", type=int, default=1000, help="Dias de histórico")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        # DATABASE_NAME é relativo ao diretório atual: o banco sintético fica no diretório temporário
+        os.chdir(diretorio)
+        db.inicializar_db()
+
+        inicio = time.perf_counter()
+        with db.obter_conexao() as conn:
+            datas = _popular(conn, args.pedidos, args.itens, args.produtos, args.clientes, args.dias)
+        print(f"Banco populado em {time.perf_counter() - inicio:.1f}s: {args.pedidos} pedidos, "
+              f"{args.pedidos * args.itens} itens, {args.produtos} produtos.")
+
+        cenarios = [
+            ("Todo o histórico", None, None),
+            ("Último ano", datas[-365], datas[-1]),
+            ("Último mês", datas[-30], datas[-1]),
+        ]
+        for nome, data_inicio, data_fim in cenarios:
+            minimo, mediana, insights = _cronometrar(lambda: calcular_insights(data_inicio, data_fim),
+                                                     args.repeticoes)
+            print(f"{nome:<18} mín {minimo * 1000:8.1f} ms | mediana {mediana * 1000:8.1f} ms")
+
+        print()
+        print(formatar_resumo(insights))
+        db.fechar_conexoes()
+        os.chdir(diretorio_original)
+
+
+if __name__ == "__main__":
+    main()
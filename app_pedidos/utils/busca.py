@@ -0,0 +1,92 @@
+# utils/busca.py
+import logging
+from utils.executor_db import executar_sincrono
+
+
+class ControladorBusca:
+    """
+    Busca ao vivo para um campo de texto:
+    - debounce: a consulta só roda 'atraso_ms' após a última tecla (via after());
+    - resultados obsoletos (de uma consulta anterior à última digitação) são descartados;
+    - o número de linhas exibidas é limitado, com a opção "mostrar mais".
+
+    buscar(termo, limite) -> linhas   (consulta ao banco)
+    exibir(linhas, tem_mais)          (atualiza a Treeview e o botão "mostrar mais")
+    exibir_erro(erro)                 (informa a falha da consulta mais recente)
+    executar(funcao, args, ao_concluir, ao_erro) permite rodar a consulta fora da thread da interface.
+    """
+
+    def __init__(self, widget, variavel, buscar, exibir, atraso_ms=300, limite_inicial=200, incremento=200,
+                 executar=None, exibir_erro=None):
+        self.widget = widget
+        self.variavel = variavel
+        self.buscar = buscar
+        self.exibir = exibir
+        self.exibir_erro = exibir_erro
+        self.atraso_ms = atraso_ms
+        self.limite_inicial = limite_inicial
+        self.incremento = incremento
+        self.executar = executar or executar_sincrono
+
+        self._limite = limite_inicial
+        self._geracao = 0  # Incrementada a cada consulta disparada; identifica a mais recente
+        self._agendado = None
+        self._tarefa = None  # Consulta em andamento (quando o executor devolve uma tarefa cancelável)
+
+        self.variavel.trace_add("write", lambda *args: self._ao_digitar())
+
+    def _ao_digitar(self):
+        # Novo termo: volta ao limite inicial e reinicia a contagem do debounce
+        self._limite = self.limite_inicial
+        self._geracao += 1  # Respostas de consultas já em andamento passam a ser obsoletas
+        self._cancelar_agendamento()
+        self._agendado = self.widget.after(self.atraso_ms, self._disparar)
+
+    def _cancelar_agendamento(self):
+        if self._agendado is not None:
+            self.widget.after_cancel(self._agendado)
+            self._agendado = None
+
+    def recarregar(self):
+        """Executa a busca imediatamente com o termo atual (ex.: após incluir ou excluir um registro)."""
+        self._cancelar_agendamento()
+        self._disparar()
+
+    def mostrar_mais(self):
+        """Amplia o limite de resultados e repete a busca atual."""
+        self._limite += self.incremento
+        self.recarregar()
+
+    def _disparar(self):
+        self._agendado = None
+        self._geracao += 1
+        geracao = self._geracao
+        limite = self._limite
+        termo = self.variavel.get().strip()
+
+        # A consulta anterior, se ainda não rodou, não precisa mais rodar
+        if self._tarefa is not None and hasattr(self._tarefa, "cancelar"):
+            self._tarefa.cancelar()
+
+        # Busca uma linha a mais para saber se existe uma próxima "página"
+        self._tarefa = self.executar(self.buscar, (termo, limite + 1),
+                                     lambda linhas: self._receber(geracao, limite, linhas),
+                                     lambda erro: self._receber_erro(geracao, erro))
+
+    def _receber(self, geracao, limite, linhas):
+        if geracao != self._geracao:
+            logging.debug("Resultado de busca obsoleto descartado.")
+            return
+
+        self._tarefa = None
+        linhas = linhas or []
+        self.exibir(linhas[:limite], len(linhas) > limite)
+
+    def _receber_erro(self, geracao, erro):
+        if geracao != self._geracao:
+            return  # Falha de uma consulta já substituída por outra
+
+        self._tarefa = None
+        logging.error(f"Erro na busca: {erro}")
+        if self.exibir_erro:
+            self.exibir_erro(erro)
@@ -0,0 +1,199 @@
+# utils/contexto_ia.py
+import logging
+import math
+import os
+from db import obter_conexao, montar_filtro_pedidos, Error
+from utils.dinheiro import dividir_centavos, formatar_centavos
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Limite de tokens do contexto enviado à IA (o prompt do sistema não entra na conta)
+ORCAMENTO_TOKENS_IA = int(os.getenv("APP_PEDIDOS_ORCAMENTO_TOKENS_IA", "4000"))
+# Estimativa conservadora para texto em português com números (a API não é consultada para contar)
+CARACTERES_POR_TOKEN = 3.5
+
+# Tamanho inicial de cada lista do contexto; reduzidas pela metade até caber no orçamento
+LIMITES_INICIAIS = {"produtos": 40, "dias": 120, "clientes": 15}
+LIMITE_MINIMO = 3
+
+# Faixas (em R$) da distribuição dos tickets
+FAIXAS_TICKET = (25, 50, 100, 200, 500)
+
+
+def estimar_tokens(texto):
+    """Estimativa do número de tokens de um texto."""
+    return math.ceil(len(texto) / CARACTERES_POR_TOKEN)
+
+
+def _sql_faixa_ticket():
+    """CASE que classifica p.total_centavos nas FAIXAS_TICKET (rótulos ordenáveis)."""
+    casos = []
+    anterior = 0
+    for i, limite in enumerate(FAIXAS_TICKET):
+        casos.append(f"WHEN p.total_centavos < {limite * 100} THEN '{i} R$ {anterior}-{limite}'")
+        anterior = limite
+    casos.append(f"ELSE '{len(FAIXAS_TICKET)} R$ {anterior}+'")
+    return "CASE " + " ".join(casos) + " END"
+
+
+def agregar_periodo(data_inicio=None, data_fim=None, limites=None):
+    """
+    Agrega no banco os pedidos do período: cada seção tem no máximo 'limites[secao]' linhas,
+    independentemente do número de pedidos. Retorna um dicionário ou None em caso de erro.
+    """
+    limites = dict(LIMITES_INICIAIS, **(limites or {}))
+    where, parametros = montar_filtro_pedidos(data_inicio, data_fim)
+
+    with obter_conexao() as conn:
+        if conn is None:
+            return None
+
+        try:
+            resumo = conn.execute(f"""
+                SELECT COUNT(*), COALESCE(SUM(p.total_centavos), 0), MIN(p.total_centavos), MAX(p.total_centavos),
+                       MIN(p.data), MAX(p.data), COUNT(DISTINCT p.cliente_id)
+                FROM pedidos p{where}
+            """, parametros).fetchone()
+
+            produtos = conn.execute(f"""
+                SELECT i.produto_nome, SUM(i.quantidade) AS qtd, SUM(i.quantidade * i.preco_unit_centavos) AS receita
+                FROM pedidos p
+                INNER JOIN itens_pedido i ON i.pedido_id = p.id{where}
+                GROUP BY i.produto_nome
+                ORDER BY qtd DESC, i.produto_nome
+                LIMIT ?
+            """, parametros + (limites["produtos"] + 1,)).fetchall()
+
+            # Um dia por linha: pelo índice de data, sem ler os pedidos
+            dias = conn.execute(f"""
+                SELECT p.data, COUNT(*), SUM(p.total_centavos)
+                FROM pedidos p{where}
+                GROUP BY p.data
+            """, parametros).fetchall()
+
+            faixas = conn.execute(f"""
+                SELECT {_sql_faixa_ticket()} AS faixa, COUNT(*)
+                FROM pedidos p{where}
+                GROUP BY faixa
+                ORDER BY faixa
+            """, parametros).fetchall()
+
+            clientes = conn.execute(f"""
+                SELECT c.nome, COUNT(*) AS n, SUM(p.total_centavos) AS gasto
+                FROM pedidos p
+                INNER JOIN clientes c ON c.id = p.cliente_id{where}
+                GROUP BY p.cliente_id
+                ORDER BY gasto DESC
+                LIMIT ?
+            """, parametros + (limites["clientes"],)).fetchall()
+        except Error as e:
+            logging.error(f"Erro ao agregar pedidos para a IA: {e}")
+            return None
+
+    num_pedidos, faturamento, ticket_min, ticket_max, primeira_data, ultima_data, num_clientes = resumo
+    # Valores monetários em centavos
+    return {
+        "periodo": (data_inicio, data_fim),
+        "num_pedidos": num_pedidos,
+        "faturamento_centavos": faturamento,
+        "ticket_medio_centavos": dividir_centavos(faturamento, num_pedidos),
+        "ticket_min_centavos": ticket_min or 0,
+        "ticket_max_centavos": ticket_max or 0,
+        "primeira_data": primeira_data,
+        "ultima_data": ultima_data,
+        "num_clientes": num_clientes,
+        "produtos": produtos[:limites["produtos"]],
+        "mais_produtos": len(produtos) > limites["produtos"],
+        "dias": dias,
+        "faixas": [(faixa.split(" ", 1)[1], n) for faixa, n in faixas],
+        "clientes": clientes,
+    }
+
+
+def _dias_exibidos(dias, limite):
+    """Todos os dias, se couberem; senão, os de maior volume (onde estão os picos), em ordem de data."""
+    if len(dias) <= limite:
+        return dias, False
+    maiores = sorted(dias, key=lambda dia: dia[1], reverse=True)[:limite]
+    return sorted(maiores), True
+
+
+def _reais(centavos):
+    return formatar_centavos(centavos, ".")
+
+
+def formatar_agregado(agregado, limites=None):
+    """Texto compacto (uma linha por item) a partir do resultado de agregar_periodo."""
+    limites = dict(LIMITES_INICIAIS, **(limites or {}))
+    data_inicio, data_fim = agregado["periodo"]
+    partes = [
+        "## Resumo Agregado dos Pedidos",
+        f"Período: {data_inicio or agregado['primeira_data']} a {data_fim or agregado['ultima_data']}",
+        f"Pedidos: {agregado['num_pedidos']} | Clientes distintos: {agregado['num_clientes']} | "
+        f"Faturamento: R$ {_reais(agregado['faturamento_centavos'])}",
+        f"Ticket médio: R$ {_reais(agregado['ticket_medio_centavos'])} | "
+        f"mínimo: R$ {_reais(agregado['ticket_min_centavos'])} | máximo: R$ {_reais(agregado['ticket_max_centavos'])}",
+        f"Pedido mais recente: {agregado['ultima_data']}",
+        "",
+    ]
+
+    produtos = agregado["produtos"][:limites["produtos"]]
+    cortado = agregado["mais_produtos"] or len(agregado["produtos"]) > limites["produtos"]
+    partes.append(f"### Produtos por quantidade (produto; qtd; receita){' - apenas os primeiros' if cortado else ''}")
+    partes.extend(f"{nome}; {qtd}; {_reais(receita)}" for nome, qtd, receita in produtos)
+    partes.append("")
+
+    dias, cortado = _dias_exibidos(agregado["dias"], limites["dias"])
+    titulo = "### Pedidos por dia (data; pedidos; total)"
+    if cortado:
+        titulo += f" - {len(dias)} de {len(agregado['dias'])} dias, os de maior volume"
+    partes.append(titulo)
+    partes.extend(f"{data}; {n}; {_reais(total)}" for data, n, total in dias)
+    partes.append("")
+
+    partes.append("### Distribuição do ticket (faixa; pedidos)")
+    partes.extend(f"{faixa}; {n}" for faixa, n in agregado["faixas"])
+    partes.append("")
+
+    partes.append("### Maiores clientes (cliente; pedidos; total gasto)")
+    partes.extend(f"{nome}; {n}; {_reais(gasto)}" for nome, n, gasto in agregado["clientes"][:limites["clientes"]])
+    partes.append("")
+
+    partes.append("Por favor, gere a análise com base nestes dados agregados.")
+    return "\n".join(partes)
+
+
+def montar_contexto_periodo(data_inicio=None, data_fim=None, orcamento_tokens=ORCAMENTO_TOKENS_IA):
+    """
+    Contexto da IA para um período de qualquer tamanho: os pedidos são agregados em SQL e as listas
+    (produtos, dias, clientes) são encurtadas até o texto caber em 'orcamento_tokens'.
+    Retorna {"texto", "tokens_estimados", "num_pedidos", "dentro_do_orcamento"} ou None em caso de erro.
+    """
+    agregado = agregar_periodo(data_inicio, data_fim)
+    if agregado is None:
+        return None
+
+    limites = dict(LIMITES_INICIAIS)
+    texto = formatar_agregado(agregado, limites)
+
+    # Reduz, em rodízio, a maior lista ainda acima do mínimo
+    while estimar_tokens(texto) > orcamento_tokens:
+        redutiveis = [secao for secao, limite in limites.items() if limite > LIMITE_MINIMO]
+        if not redutiveis:
+            break
+        secao = max(redutiveis, key=lambda s: limites[s])
+        limites[secao] = max(LIMITE_MINIMO, limites[secao] // 2)
+        texto = formatar_agregado(agregado, limites)
+
+    tokens = estimar_tokens(texto)
+    if tokens > orcamento_tokens:
+        logging.warning(f"Contexto da IA com ~{tokens} tokens excede o orçamento de {orcamento_tokens}.")
+    logging.info(f"Contexto da IA: {agregado['num_pedidos']} pedidos agregados em ~{tokens} tokens "
+                 f"(orçamento: {orcamento_tokens}).")
+
+    return {
+        "texto": texto,
+        "tokens_estimados": tokens,
+        "num_pedidos": agregado["num_pedidos"],
+        "dentro_do_orcamento": tokens <= orcamento_tokens,
+    }
@@ -1,13 +1,14 @@
 # utils/data_export.py
 import csv
 import logging
+import time
 from tkinter import filedialog, messagebox
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
+from utils.medicao import medir, registrar_duracao
+from utils.dinheiro import formatar_centavos
 
 
 def exportar_pedido_csv(pedido_id, dados_pedido, itens_pedido):
-    """Exporta um pedido para CSV."""
+    """Exporta um pedido para CSV (valores em centavos: dados_pedido['total_centavos'], itens (produto, qtd, preço))."""
 
     file_path = filedialog.asksaveasfilename(
         defaultextension=".csv",
@@ -19,23 +20,24 @@ def exportar_pedido_csv(pedido_id, dados_pedido, itens_pedido):
         return
 
     try:
-        with open(file_path, 'w', newline='', encoding='utf-8') as file:
+        with medir("exportar_pedido_csv"), open(file_path, 'w', newline='', encoding='utf-8') as file:
             writer = csv.writer(file)
 
             # Cabeçalho do Pedido
             writer.writerow(["Pedido ID:", pedido_id])
             writer.writerow(["Cliente:", dados_pedido['nome_cliente']])
             writer.writerow(["Data:", dados_pedido['data']])
-            writer.writerow(["Total:", f"R$ {dados_pedido['total']:.2f}"])
+            writer.writerow(["Total:", f"R$ {formatar_centavos(dados_pedido['total_centavos'], '.')}"])
             writer.writerow([])
 
             # Cabeçalho dos Itens
             writer.writerow(["Produto", "Quantidade", "Preco Unitario", "Subtotal"])
 
             # Itens
-            for produto, qtd, preco in itens_pedido:
-                subtotal = qtd * preco
-                writer.writerow([produto, qtd, f"{preco:.2f}", f"{subtotal:.2f}"])
+            for produto, qtd, preco_centavos in itens_pedido:
+                subtotal_centavos = qtd * preco_centavos
+                writer.writerow([produto, qtd, formatar_centavos(preco_centavos, "."),
+                                 formatar_centavos(subtotal_centavos, ".")])
 
         messagebox.showinfo("Sucesso", f"Pedido exportado para CSV em:\n{file_path}")
     except Exception as e:
@@ -45,7 +47,13 @@ def exportar_pedido_csv(pedido_id, dados_pedido, itens_pedido):
 
 def exportar_pedido_pdf(pedido_id, dados_pedido, itens_pedido):
     """Exporta um pedido para PDF simples (Requer reportlab)."""
-    # Instalação: pip install reportlab
+    # Instalação: pip install reportlab. Importado no primeiro uso para não pesar na abertura do app.
+    try:
+        from reportlab.lib.pagesizes import letter
+        from reportlab.pdfgen import canvas
+    except ImportError:
+        messagebox.showerror("Erro", "A biblioteca 'reportlab' não está instalada: pip install reportlab")
+        return
 
     file_path = filedialog.asksaveasfilename(
         defaultextension=".pdf",
@@ -57,6 +65,7 @@ def exportar_pedido_pdf(pedido_id, dados_pedido, itens_pedido):
         return
 
     try:
+        inicio = time.perf_counter()  # A medição exclui o diálogo de arquivo
         c = canvas.Canvas(file_path, pagesize=letter)
         width, height = letter  # 612x792
 
@@ -80,25 +89,24 @@ def exportar_pedido_pdf(pedido_id, dados_pedido, itens_pedido):
 
         c.setFont("Helvetica", 10)
         y -= 15
-        for produto, qtd, preco in itens_pedido:
-            subtotal = qtd * preco
+        for produto, qtd, preco_centavos in itens_pedido:
+            subtotal_centavos = qtd * preco_centavos
             c.drawString(50, y, produto)
             c.drawString(250, y, str(qtd))
-            c.drawString(350, y, f"R$ {preco:.2f}")
-            c.drawString(500, y, f"R$ {subtotal:.2f}")
+            c.drawString(350, y, f"R$ {formatar_centavos(preco_centavos, '.')}")
+            c.drawString(500, y, f"R$ {formatar_centavos(subtotal_centavos, '.')}")
             y -= 15
 
         # Total
         y -= 30
         c.setFont("Helvetica-Bold", 14)
-        c.drawString(50, y, f"TOTAL DO PEDIDO: R$ {dados_pedido['total']:.2f}")
+        c.drawString(50, y, f"TOTAL DO PEDIDO: R$ {formatar_centavos(dados_pedido['total_centavos'], '.')}")
 
         c.save()
+        registrar_duracao("exportar_pedido_pdf", inicio)
 
         messagebox.showinfo("Sucesso", f"Pedido exportado para PDF em:\n{file_path}")
 
-    except ImportError:
-        messagebox.showerror("Erro", "A biblioteca 'reportlab' não está instalada. Execute 'pip install reportlab'.")
     except Exception as e:
         logging.error(f"Erro ao exportar PDF: {e}")
         messagebox.showerror("Erro", f"Falha ao exportar para PDF: {e}")
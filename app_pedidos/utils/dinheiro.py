@@ -0,0 +1,67 @@
+# utils/dinheiro.py
+"""
+Valores monetários em centavos (int), como o banco os grava desde a migração 7.
+Somas e médias ficam exatas e a formatação não passa por float.
+"""
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+_CENTAVO = Decimal("0.01")
+
+
+def _normalizar_texto(texto):
+    """'R$ 1.234,56' -> '1234.56'. O último separador (',' ou '.') é o decimal; os demais são de milhar."""
+    texto = texto.strip().replace("R$", "").replace(" ", "")
+    if "," in texto and "." in texto:
+        decimal = "," if texto.rfind(",") > texto.rfind(".") else "."
+        milhar = "." if decimal == "," else ","
+        return texto.replace(milhar, "").replace(decimal, ".")
+    if texto.count(".") > 1:
+        return texto.replace(".", "")  # '1.234.567': apenas separadores de milhar
+    return texto.replace(",", ".")
+
+
+def para_centavos(valor):
+    """
+    Converte um valor em reais (texto digitado ou importado, int, float ou Decimal) para centavos,
+    arredondando meio centavo para cima. Aceita "12,50", "12.50", "R$ 1.234,56" e "1,234.56".
+    Lança ValueError se o valor não for numérico.
+    """
+    original = valor
+    if isinstance(valor, bool):
+        raise ValueError(f"Valor monetário inválido: {original!r}")
+    if isinstance(valor, str):
+        valor = _normalizar_texto(valor)
+    elif isinstance(valor, float):
+        valor = repr(valor)  # 19.99 -> '19.99' (e não 19.989999...)
+
+    try:
+        reais = Decimal(valor)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Valor monetário inválido: {original!r}") from None
+    if not reais.is_finite():
+        raise ValueError(f"Valor monetário inválido: {original!r}")
+
+    try:
+        return int(reais.quantize(_CENTAVO, rounding=ROUND_HALF_UP) * 100)
+    except InvalidOperation:  # Expoente grande demais para o contexto decimal (ex.: "1e400")
+        raise ValueError(f"Valor monetário inválido: {original!r}") from None
+
+
+def formatar_centavos(centavos, separador=","):
+    """Centavos -> '1234,56' (sem separador de milhar), como nas listas e exportações."""
+    sinal = "-" if centavos < 0 else ""
+    reais, resto = divmod(abs(int(centavos)), 100)
+    return f"{sinal}{reais}{separador}{resto:02d}"
+
+
+def formatar_moeda(centavos):
+    """Centavos -> 'R$ 1234,56'."""
+    return f"R$ {formatar_centavos(centavos)}"
+
+
+def dividir_centavos(centavos, divisor):
+    """Média em centavos inteiros (meio centavo arredondado para longe do zero); 0 se o divisor for 0."""
+    if not divisor:
+        return 0
+    quociente = (abs(int(centavos)) * 2 + divisor) // (divisor * 2)
+    return quociente if centavos >= 0 else -quociente
@@ -0,0 +1,116 @@
+# utils/estresse_estoque.py
+"""
+Teste de estresse da baixa de estoque (db.registrar_pedido) com vários processos gravando pedidos
+ao mesmo tempo sobre poucos produtos com estoque baixo, como vários terminais no mesmo banco.
+
+Uso (a partir de app_pedidos/):
+    python -m utils.estresse_estoque [--processos 8] [--pedidos 300] [--produtos 5] [--estoque 1000]
+
+O banco é criado em um diretório temporário (o pedidos.db da aplicação não é tocado). Ao final,
+confere que nenhum estoque ficou negativo e que estoque inicial - vendido = estoque final para
+cada produto. Sai com código 1 se alguma verificação falhar.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import db
+
+
+def _gravar_pedidos(semente, num_pedidos, num_produtos, max_itens, max_quantidade, inicio_em):
+    """Processo de carga: grava 'num_pedidos' pedidos e devolve os contadores de resultado."""
+    rng = random.Random(semente)
+    contadores = {"gravados": 0, "sem_estoque": 0, "erros": 0}
+
+    while time.time() < inicio_em:  # Largada simultânea de todos os processos
+        time.sleep(0.001)
+
+    for _ in range(num_pedidos):
+        itens = []
+        for _ in range(rng.randint(1, max_itens)):
+            produto_id = rng.randint(1, num_produtos)
+            itens.append((produto_id, f"Produto {produto_id}", rng.randint(1, max_quantidade), 1000))
+        try:
+            db.registrar_pedido(1, "2025-01-01", itens)
+            contadores["gravados"] += 1
+        except db.EstoqueInsuficiente:
+            contadores["sem_estoque"] += 1
+        except db.Error:
+            contadores["erros"] += 1  # Ex.: "database is locked" após o timeout da conexão
+
+    db.fechar_conexoes()
+    return contadores
+
+
+def _verificar(conn, estoque_inicial):
+    """Lista de falhas encontradas (vazia se o estoque está consistente)."""
+    falhas = []
+    vendidos = dict(conn.execute(
+        "SELECT produto_id, SUM(quantidade) FROM itens_pedido GROUP BY produto_id").fetchall())
+    for produto_id, estoque in conn.execute("SELECT id, estoque FROM produtos ORDER BY id"):
+        if estoque < 0:
+            falhas.append(f"Produto {produto_id}: estoque negativo ({estoque})")
+        vendido = vendidos.get(produto_id, 0)
+        if estoque_inicial - vendido != estoque:
+            falhas.append(f"Produto {produto_id}: inicial {estoque_inicial} - vendido {vendido} != final {estoque}")
+    return falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de estresse da baixa de estoque com vários processos.")
+    parser.add_argument("--processos", type=int, default=8)
+    parser.add_argument("--pedidos", type=int, default=300, help="Pedidos por processo")
+    parser.add_argument("--produtos", type=int, default=5)
+    parser.add_argument("--estoque", type=int, default=1000, help="Estoque inicial de cada produto")
+    parser.add_argument("--itens", type=int, default=3, help="Máximo de itens por pedido")
+    parser.add_argument("--quantidade", type=int, default=3, help="Quantidade máxima por item")
+    args = parser.parse_args()
+
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        # DATABASE_NAME é relativo ao diretório atual: os processos herdam o diretório temporário
+        os.chdir(diretorio)
+        db.inicializar_db()
+        with db.obter_conexao() as conn:
+            conn.execute("INSERT INTO clientes (id, nome, email, telefone) VALUES (1, 'Cliente 1', 'c1@exemplo.com', '')")
+            conn.executemany("INSERT INTO produtos (id, nome, preco_centavos, estoque) VALUES (?, ?, 1000, ?)",
+                             ((i, f"Produto {i}", args.estoque) for i in range(1, args.produtos + 1)))
+            conn.commit()
+        db.fechar_conexoes()
+
+        inicio_em = time.time() + 1.0
+        contexto = multiprocessing.get_context("spawn")  # Processos novos: nenhuma conexão herdada
+        with ProcessPoolExecutor(max_workers=args.processos, mp_context=contexto) as executor:
+            futuros = [executor.submit(_gravar_pedidos, semente, args.pedidos, args.produtos, args.itens,
+                                       args.quantidade, inicio_em)
+                       for semente in range(args.processos)]
+            resultados = [futuro.result() for futuro in futuros]
+        duracao = time.time() - inicio_em
+
+        totais = {chave: sum(r[chave] for r in resultados) for chave in resultados[0]}
+        with db.obter_conexao() as conn:
+            falhas = _verificar(conn, args.estoque)
+            num_pedidos = conn.execute("SELECT COUNT(*) FROM pedidos").fetchone()[0]
+        if num_pedidos != totais["gravados"]:
+            falhas.append(f"{num_pedidos} pedidos no banco, {totais['gravados']} confirmados pelos processos")
+        db.fechar_conexoes()
+        os.chdir(diretorio_original)
+
+    tentativas = args.processos * args.pedidos
+    print(f"{args.processos} processos x {args.pedidos} pedidos em {duracao:.1f}s "
+          f"({tentativas / duracao:.0f} tentativas/s): {totais['gravados']} gravados, "
+          f"{totais['sem_estoque']} recusados por falta de estoque, {totais['erros']} erros do banco.")
+    if falhas:
+        print("FALHOU:")
+        for falha in falhas:
+            print(f"  {falha}")
+        sys.exit(1)
+    print("OK: nenhum estoque negativo e estoque final = inicial - vendido para todos os produtos.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# utils/executor_db.py
+import logging
+import queue
+import threading
+import time
+from db import liberar_conexao_da_thread
+from utils.medicao import MEDICAO_ATIVA, medir, registrar_duracao
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TIMEOUT_ENCERRAMENTO_S = 5.0  # Espera máxima pelas threads de trabalho em encerrar()
+
+
+def executar_sincrono(funcao, args, ao_concluir, ao_erro=None):
+    """
+    Executor padrão de ControladorBusca e TreeviewPaginada (mesmo formato de ExecutorDB.executar):
+    roda a consulta na própria thread da interface. Sem ao_erro, a exceção é propagada.
+    """
+    try:
+        resultado = funcao(*args)
+    except Exception as e:
+        if ao_erro is None:
+            raise
+        ao_erro(e)
+        return
+    ao_concluir(resultado)
+
+
+class Tarefa:
+    """Consulta submetida ao ExecutorDB. Pode ser cancelada a qualquer momento pela interface."""
+
+    def __init__(self, funcao, args, kwargs, ao_concluir, ao_erro):
+        self.funcao = funcao
+        self.args = args
+        self.kwargs = kwargs
+        self.ao_concluir = ao_concluir
+        self.ao_erro = ao_erro
+        self._cancelada = threading.Event()
+        self.submetida_em = time.perf_counter() if MEDICAO_ATIVA else 0.0
+
+    @property
+    def nome(self):
+        return getattr(self.funcao, '__name__', '?')
+
+    def cancelar(self):
+        """Cancela a tarefa: se ainda não começou, não roda; se já está rodando, o resultado é descartado."""
+        self._cancelada.set()
+
+    @property
+    def cancelada(self):
+        return self._cancelada.is_set()
+
+
+class ExecutorDB:
+    """
+    Camada de acesso assíncrono ao banco: threads de trabalho executam as consultas
+    (cada uma com sua conexão persistente do pool em db.py) e os resultados voltam para
+    a thread do Tk por uma fila lida com after(), sem nunca bloquear o mainloop.
+    """
+
+    def __init__(self, root, num_threads=2, intervalo_ms=30, ao_mudar_ocupado=None):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self.ao_mudar_ocupado = ao_mudar_ocupado  # Callback(bool) para o indicador de "ocupado"
+
+        self._fila_tarefas = queue.Queue()
+        self._fila_resultados = queue.Queue()
+        self._pendentes = 0  # Acessado apenas pela thread do Tk
+        self._agendado = None
+        self._encerrado = False
+
+        self._threads = []
+        for i in range(num_threads):
+            thread = threading.Thread(target=self._trabalhar, name=f"executor-db-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def ocupado(self):
+        return self._pendentes > 0
+
+    def submeter(self, funcao, *args, ao_concluir=None, ao_erro=None, **kwargs):
+        """
+        Agenda funcao(*args, **kwargs) em uma thread de trabalho.
+        ao_concluir(resultado) e ao_erro(excecao) são chamados na thread do Tk.
+        """
+        tarefa = Tarefa(funcao, args, kwargs, ao_concluir, ao_erro)
+        if self._encerrado:
+            tarefa.cancelar()
+            return tarefa
+
+        self._fila_tarefas.put(tarefa)
+        self._pendentes += 1
+        if self._pendentes == 1:
+            self._notificar_ocupado(True)
+        self._agendar_verificacao()
+        return tarefa
+
+    def executar(self, funcao, args, ao_concluir, ao_erro=None):
+        """Adaptador no formato esperado por ControladorBusca e TreeviewPaginada."""
+        return self.submeter(funcao, *args, ao_concluir=ao_concluir, ao_erro=ao_erro)
+
+    def encerrar(self, timeout=TIMEOUT_ENCERRAMENTO_S):
+        """
+        Descarta as tarefas pendentes e finaliza as threads de trabalho, aguardando (até 'timeout' segundos)
+        que terminem a consulta em andamento e fechem as próprias conexões.
+        """
+        self._encerrado = True
+        if self._agendado is not None:
+            self.root.after_cancel(self._agendado)
+            self._agendado = None
+
+        for _ in self._threads:
+            self._fila_tarefas.put(None)
+
+        prazo = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(0.0, prazo - time.monotonic()))
+            if thread.is_alive():
+                logging.warning(f"A thread {thread.name} não terminou em {timeout}s; sua conexão fica aberta.")
+
+    # --- Threads de trabalho ---
+
+    def _trabalhar(self):
+        try:
+            while True:
+                tarefa = self._fila_tarefas.get()
+                if tarefa is None:
+                    break
+
+                if tarefa.cancelada or self._encerrado:
+                    self._fila_resultados.put((tarefa, False, None))
+                    continue
+
+                try:
+                    with medir(f"db:{tarefa.nome}"):
+                        resultado = tarefa.funcao(*tarefa.args, **tarefa.kwargs)
+                    self._fila_resultados.put((tarefa, True, resultado))
+                except Exception as e:
+                    logging.error(f"Erro em tarefa do executor de banco ({tarefa.nome}): {e}")
+                    self._fila_resultados.put((tarefa, False, e))
+        finally:
+            liberar_conexao_da_thread()  # Cada conexão só pode ser fechada pela thread que a criou
+
+    # --- Thread do Tk ---
+
+    def _agendar_verificacao(self):
+        if self._agendado is None and not self._encerrado:
+            self._agendado = self.root.after(self.intervalo_ms, self._processar_resultados)
+
+    def _processar_resultados(self):
+        self._agendado = None
+
+        while True:
+            try:
+                tarefa, sucesso, valor = self._fila_resultados.get_nowait()
+            except queue.Empty:
+                break
+
+            self._pendentes -= 1
+            if tarefa.cancelada:
+                continue
+
+            try:
+                with medir(f"tela:{tarefa.nome}"):
+                    if sucesso:
+                        if tarefa.ao_concluir:
+                            tarefa.ao_concluir(valor)
+                    elif isinstance(valor, Exception) and tarefa.ao_erro:
+                        tarefa.ao_erro(valor)
+            except Exception as e:
+                logging.error(f"Erro no retorno de tarefa do executor de banco: {e}")
+            # Da submissão até a tela atualizada (inclui a espera na fila e o intervalo do after)
+            registrar_duracao(f"latencia:{tarefa.nome}", tarefa.submetida_em)
+
+        if self._pendentes > 0:
+            self._agendar_verificacao()
+        else:
+            self._notificar_ocupado(False)
+
+    def _notificar_ocupado(self, ocupado):
+        if self.ao_mudar_ocupado:
+            self.ao_mudar_ocupado(ocupado)
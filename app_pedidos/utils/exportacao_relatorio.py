@@ -0,0 +1,196 @@
+# utils/exportacao_relatorio.py
+"""
+Exportação do relatório de pedidos para CSV e PDF em streaming, feita para rodar fora da thread do Tk
+(ver RelatoriosForm._iniciar_exportacao): as linhas vão do cursor direto para o arquivo, sem montar o
+relatório em memória.
+
+O arquivo é escrito em um temporário no mesmo diretório do destino e só é renomeado (os.replace,
+atômico) ao final: um arquivo existente nunca fica pela metade, nem em caso de erro ou cancelamento.
+Destinos CSV terminados em .gz são compactados com gzip.
+"""
+import csv
+import gzip
+import logging
+import os
+import uuid
+from datetime import datetime
+from db import contar_linhas_relatorio, iterar_linhas_relatorio, iterar_pedidos_relatorio
+from utils.dinheiro import formatar_centavos, formatar_moeda
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+CABECALHO_CSV = ["ID Pedido", "Cliente", "Data Pedido", "Total Pedido (R$)",
+                 "ID Item", "Nome Produto", "Quantidade", "Preço Unitário (R$)"]
+NIVEL_GZIP = 6  # O padrão do módulo gzip (9) é bem mais lento e compacta pouco mais
+LINHAS_POR_PROGRESSO_PDF = 2000  # Mesmo ritmo dos lotes do CSV
+
+
+def _caminho_temporario(caminho):
+    # Nome único ao lado do destino (mesmo sistema de arquivos, para o os.replace ser atômico)
+    diretorio, nome = os.path.split(os.path.abspath(caminho))
+    return os.path.join(diretorio, f".{nome}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def exportar_relatorio_csv(caminho, filtros, progresso=None, cancelado=None):
+    """
+    Exporta as linhas do relatório (filtros = (data_inicio, data_fim, cliente_id)) para 'caminho'.
+
+    progresso(linhas_escritas, total_linhas) é chamado a cada lote, na thread que executa a exportação;
+    cancelado() é consultado a cada lote e, se verdadeiro, interrompe a exportação sem tocar no destino.
+    Retorna {"caminho", "linhas", "cancelado"}. Erros de banco ou de disco são propagados.
+    """
+    total = contar_linhas_relatorio(*filtros)
+    if progresso:
+        progresso(0, total)
+
+    # O modo "x" cria o arquivo com as permissões normais, ao contrário de tempfile.mkstemp (0600)
+    temporario = _caminho_temporario(caminho)
+
+    linhas = 0
+    interrompida = False
+    try:
+        if caminho.lower().endswith(".gz"):
+            arquivo = gzip.open(temporario, "xt", newline="", encoding="utf-8", compresslevel=NIVEL_GZIP)
+        else:
+            arquivo = open(temporario, "x", newline="", encoding="utf-8")
+
+        with arquivo:
+            writer = csv.writer(arquivo, delimiter=';')
+            writer.writerow(CABECALHO_CSV)
+
+            for lote in iterar_linhas_relatorio(*filtros):
+                if cancelado and cancelado():
+                    interrompida = True
+                    break
+                writer.writerows(
+                    (pedido_id, cliente, data, formatar_centavos(total_centavos), item_id, nome, quantidade,
+                     formatar_centavos(preco_unit_centavos))
+                    for pedido_id, cliente, data, total_centavos, item_id, nome, quantidade, preco_unit_centavos
+                    in lote)
+                linhas += len(lote)
+                if progresso:
+                    progresso(linhas, total)
+
+        if interrompida:
+            os.remove(temporario)
+            logging.info(f"Exportação de '{caminho}' cancelada após {linhas} linhas.")
+            return {"caminho": caminho, "linhas": linhas, "cancelado": True}
+
+        # Dados no disco antes da troca de nome (o gzip só grava o último bloco ao fechar)
+        with open(temporario, "ab") as gravado:
+            os.fsync(gravado.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+    logging.info(f"Relatório exportado para '{caminho}': {linhas} linhas.")
+    return {"caminho": caminho, "linhas": linhas, "cancelado": False}
+
+
+def exportar_relatorio_pdf(caminho, filtros, progresso=None, cancelado=None):
+    """
+    Exporta o relatório (filtros = (data_inicio, data_fim, cliente_id)) para um PDF em 'caminho', um
+    pedido por bloco com seus itens. Mesmo contrato de exportar_relatorio_csv: progresso(linhas, total) e
+    cancelado() são consultados a cada LINHAS_POR_PROGRESSO_PDF itens; retorna {"caminho", "linhas",
+    "cancelado"} e propaga os erros. O reportlab é importado aqui, na thread da exportação.
+    """
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.units import inch
+
+    total = contar_linhas_relatorio(*filtros)
+    if progresso:
+        progresso(0, total)
+
+    temporario = _caminho_temporario(caminho)
+    linhas = 0
+    proximo_progresso = LINHAS_POR_PROGRESSO_PDF
+    interrompida = False
+    try:
+        pdf = canvas.Canvas(temporario, pagesize=letter)
+        width, height = letter
+
+        pdf.setFont("Helvetica-Bold", 16)
+        pdf.drawString(inch, height - inch, "Relatório de Pedidos Detalhados")
+        pdf.setFont("Helvetica", 10)
+        pdf.drawString(inch, height - inch - 0.3 * inch, f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+
+        y_pos = height - inch - 0.7 * inch
+        x_pos = inch
+        line_height = 0.25 * inch
+
+        for pedido_id, dados in iterar_pedidos_relatorio(*filtros):
+            cliente = dados['cliente']
+            data = dados['data']
+            total_pedido = formatar_moeda(dados['total_centavos'])
+
+            # Nova página se necessário
+            if y_pos < 1.5 * inch:
+                pdf.showPage()
+                y_pos = height - inch
+                pdf.setFont("Helvetica-Bold", 12)
+                pdf.drawString(inch, y_pos, "Relatório de Pedidos (Continuação)")
+                y_pos -= line_height
+
+            # Informações do Pedido
+            pdf.setFont("Helvetica-Bold", 10)
+            pdf.drawString(x_pos, y_pos,
+                           f"Pedido ID: {pedido_id} | Cliente: {cliente} | Data: {data} | TOTAL: {total_pedido}")
+            y_pos -= line_height
+
+            # Cabeçalho dos Itens
+            pdf.setFont("Helvetica-Oblique", 9)
+            pdf.drawString(x_pos + 0.5 * inch, y_pos, "Produto")
+            pdf.drawString(x_pos + 4.5 * inch, y_pos, "Qtd.")
+            pdf.drawString(x_pos + 5.5 * inch, y_pos, "Preço Unit.")
+            pdf.drawString(x_pos + 7.0 * inch, y_pos, "Subtotal")
+            y_pos -= line_height * 0.8
+
+            # Loop pelos Itens
+            for item in dados['itens']:
+                qtd = item['quantidade']
+                preco_unit_centavos = item['preco_unit_centavos']
+
+                pdf.setFont("Helvetica", 9)
+                pdf.drawString(x_pos + 0.5 * inch, y_pos, item['nome'])
+                pdf.drawString(x_pos + 4.5 * inch, y_pos, str(qtd))
+                pdf.drawString(x_pos + 5.5 * inch, y_pos, formatar_moeda(preco_unit_centavos))
+                pdf.drawString(x_pos + 7.0 * inch, y_pos, formatar_moeda(qtd * preco_unit_centavos))
+
+                y_pos -= line_height
+
+                if y_pos < 1.5 * inch:
+                    pdf.showPage()
+                    y_pos = height - inch
+                    pdf.setFont("Helvetica", 9)
+
+            y_pos -= line_height * 0.5
+
+            linhas += len(dados['itens'])
+            if linhas >= proximo_progresso:
+                proximo_progresso = linhas + LINHAS_POR_PROGRESSO_PDF
+                if progresso:
+                    progresso(linhas, total)
+                if cancelado and cancelado():
+                    interrompida = True
+                    break
+
+        if interrompida:
+            logging.info(f"Exportação de '{caminho}' cancelada após {linhas} linhas.")
+            return {"caminho": caminho, "linhas": linhas, "cancelado": True}
+
+        pdf.save()
+        with open(temporario, "ab") as gravado:
+            os.fsync(gravado.fileno())
+        os.replace(temporario, caminho)
+    finally:
+        # Cancelamento ou erro: nada do temporário (se o canvas chegou a gravá-lo) fica no disco
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+    if progresso:
+        progresso(linhas, total)
+    logging.info(f"Relatório PDF exportado para '{caminho}': {linhas} linhas.")
+    return {"caminho": caminho, "linhas": linhas, "cancelado": False}
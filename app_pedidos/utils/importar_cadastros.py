@@ -0,0 +1,271 @@
+# utils/importar_cadastros.py
+"""
+Importação em lote de clientes e produtos a partir de CSV (',' ou ';', com cabeçalho).
+
+Uso (a partir de app_pedidos/):
+    python -m utils.importar_cadastros clientes clientes.csv [--lote 5000]
+    python -m utils.importar_cadastros produtos produtos.csv [--lote 5000]
+
+Colunas:
+    clientes: nome, email, telefone   (email e telefone opcionais)
+    produtos: nome, preco, estoque    (estoque opcional)
+
+Os cadastros já existentes são atualizados pela chave única (clientes.email, produtos.nome) com
+INSERT ... ON CONFLICT; campos opcionais vazios mantêm o valor atual. Clientes sem e-mail não têm
+chave e são sempre inseridos. As validações são as mesmas dos formulários (utils/validations.py),
+aplicadas a cada coluna do bloco de uma vez. Linhas inválidas vão para o arquivo de rejeitados
+(linha; motivo; registro) e cada bloco de linhas válidas é gravado com um único upsert, em uma transação.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+import db
+from utils.dinheiro import para_centavos
+from utils.medicao import medir
+from utils.validations import validar_nomes, validar_emails, validar_telefones, validar_precos, validar_estoques
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TAMANHO_LOTE_PADRAO = 5000  # Linhas por transação
+
+# Um único INSERT ... SELECT por bloco (linhas em um array JSON): com um INSERT por linha, cada comando
+# dispara o trigger do índice FTS5 em um savepoint próprio, o FTS5 grava um segmento por linha e a
+# importação fica quadrática. O "WHERE true" é exigido pelo SQLite em um upsert a partir de SELECT.
+_SQL_CLIENTES = """
+    INSERT INTO clientes (nome, email, telefone)
+    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+    FROM json_each(?) WHERE true
+    ON CONFLICT (email) DO UPDATE SET nome = excluded.nome,
+        telefone = COALESCE(excluded.telefone, clientes.telefone)
+"""
+_SQL_PRODUTOS = """
+    INSERT INTO produtos (nome, preco_centavos, estoque)
+    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+    FROM json_each(?) WHERE true
+    ON CONFLICT (nome) DO UPDATE SET preco_centavos = excluded.preco_centavos, estoque = excluded.estoque
+"""
+
+
+def _texto(valor):
+    return (valor or "").strip()
+
+
+def _validar_clientes(registros):
+    """Valida o bloco coluna a coluna. Retorna (parâmetros das linhas válidas, {índice: motivo})."""
+    nomes = [_texto(r.get("nome")) for r in registros]
+    emails = [_texto(r.get("email")) for r in registros]
+    telefones = [_texto(r.get("telefone")) for r in registros]
+
+    erros = {}
+    for coluna, validos, motivo in (
+            (nomes, validar_nomes(nomes), "nome obrigatório"),
+            (emails, validar_emails(emails), "e-mail inválido"),
+            (telefones, validar_telefones(telefones), "telefone inválido (8 a 15 dígitos)")):
+        for i, valido in enumerate(validos):
+            if not valido:
+                erros.setdefault(i, []).append(f"{motivo}: '{coluna[i]}'" if coluna[i] else motivo)
+
+    parametros = [(nomes[i], emails[i] or None, telefones[i] or None)
+                  for i in range(len(registros)) if i not in erros]
+    return parametros, {i: "; ".join(motivos) for i, motivos in erros.items()}
+
+
+def _validar_produtos(registros):
+    """Valida o bloco coluna a coluna. Retorna (parâmetros das linhas válidas, {índice: motivo})."""
+    nomes = [_texto(r.get("nome")) for r in registros]
+    precos = [_texto(r.get("preco")) for r in registros]
+    estoques = [_texto(r.get("estoque")) for r in registros]
+
+    erros = {}
+    for coluna, validos, motivo in (
+            (nomes, validar_nomes(nomes), "nome obrigatório"),
+            (precos, validar_precos(precos), "preço inválido (deve ser positivo)"),
+            (estoques, validar_estoques(estoques), "estoque inválido (inteiro não negativo)")):
+        for i, valido in enumerate(validos):
+            if not valido:
+                erros.setdefault(i, []).append(f"{motivo}: '{coluna[i]}'" if coluna[i] else motivo)
+
+    # Só as linhas válidas são convertidas; estoque vazio (None) mantém o atual
+    parametros = [(nomes[i], para_centavos(precos[i]), int(estoques[i]) if estoques[i] else None)
+                  for i in range(len(registros)) if i not in erros]
+    return parametros, {i: "; ".join(motivos) for i, motivos in erros.items()}
+
+
+def _completar_estoques(conn, parametros):
+    """Estoque não informado: o atual, para produtos já cadastrados (lido na transação do bloco), ou 0."""
+    sem_estoque = [nome for nome, _, estoque in parametros if estoque is None]
+    if not sem_estoque:
+        return parametros
+    atuais = dict(conn.execute("SELECT nome, estoque FROM produtos WHERE nome IN (SELECT value FROM json_each(?))",
+                               (json.dumps(sem_estoque),)))
+    completos = []
+    for nome, preco_centavos, estoque in parametros:
+        if estoque is None:
+            estoque = atuais.get(nome, 0)
+        atuais[nome] = estoque  # O mesmo produto pode se repetir no bloco
+        completos.append((nome, preco_centavos, estoque))
+    return completos
+
+
+_TIPOS = {  # tipo -> (colunas obrigatórias, validação do bloco, upsert, ajuste na transação)
+    "clientes": ({"nome"}, _validar_clientes, _SQL_CLIENTES, None),
+    "produtos": ({"nome", "preco"}, _validar_produtos, _SQL_PRODUTOS, _completar_estoques),
+}
+
+
+def _gravar_lote(conn, tipo, linhas, parametros):
+    """
+    Grava o bloco em uma transação. Se o upsert falhar por integridade, refaz o bloco linha a linha para
+    identificar as culpadas. Retorna [(número da linha, motivo)] das linhas recusadas pelo banco.
+    """
+    _, _, sql, ajustar = _TIPOS[tipo]
+
+    db._iniciar_escrita(conn)
+    try:
+        if ajustar:
+            parametros = ajustar(conn, parametros)
+        conn.execute(sql, (json.dumps(parametros, ensure_ascii=False),))
+        conn.commit()
+        return []
+    except sqlite3.IntegrityError:
+        conn.rollback()
+    except Exception:
+        conn.rollback()
+        raise
+
+    recusadas = []
+    db._iniciar_escrita(conn)
+    try:
+        if ajustar:
+            parametros = ajustar(conn, parametros)
+        for linha, valores in zip(linhas, parametros):
+            try:
+                conn.execute(sql, (json.dumps([valores], ensure_ascii=False),))
+            except sqlite3.IntegrityError as e:
+                recusadas.append((linha, f"recusado pelo banco: {e}"))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return recusadas
+
+
+def importar_cadastros(tipo, caminho, tamanho_lote=TAMANHO_LOTE_PADRAO, caminho_rejeitados=None, progresso=None):
+    """
+    Importa 'clientes' ou 'produtos' do CSV 'caminho'. progresso(linhas_lidas, gravadas, rejeitadas) é
+    chamado após cada bloco.
+
+    Retorna {"gravadas", "rejeitadas", "linhas", "segundos", "arquivo_rejeitados"} (gravadas inclui as
+    atualizações; arquivo_rejeitados é None se nada foi recusado). Lança ValueError se faltarem colunas
+    obrigatórias e db.Error se o banco falhar; os blocos já confirmados permanecem gravados.
+    """
+    obrigatorias, validar, _, _ = _TIPOS[tipo]
+    if caminho_rejeitados is None:
+        caminho_rejeitados = f"{os.path.splitext(caminho)[0]}.rejeitados.csv"
+
+    inicio = time.perf_counter()
+    gravadas = rejeitadas = linhas_lidas = 0
+    arquivo_rejeitados = escritor_rejeitados = None
+
+    def rejeitar(linha, motivo, registro):
+        nonlocal rejeitadas, arquivo_rejeitados, escritor_rejeitados
+        rejeitadas += 1
+        if arquivo_rejeitados is None:
+            arquivo_rejeitados = open(caminho_rejeitados, "w", newline="", encoding="utf-8")
+            escritor_rejeitados = csv.writer(arquivo_rejeitados, delimiter=";")
+            escritor_rejeitados.writerow(["linha", "motivo", "registro"])
+        escritor_rejeitados.writerow([linha, motivo, json.dumps(registro, ensure_ascii=False)])
+
+    def processar(conn, bloco):
+        nonlocal gravadas
+        linhas = [linha for linha, _ in bloco]
+        registros = [registro for _, registro in bloco]
+        with medir(f"importar_cadastros:{tipo}:lote"):
+            parametros, erros = validar(registros)
+            for i, motivo in sorted(erros.items()):
+                rejeitar(linhas[i], motivo, registros[i])
+            linhas_validas = [linha for i, linha in enumerate(linhas) if i not in erros]
+            recusadas = _gravar_lote(conn, tipo, linhas_validas, parametros) if parametros else []
+        registros_por_linha = dict(bloco)
+        for linha, motivo in recusadas:
+            rejeitar(linha, motivo, registros_por_linha[linha])
+        gravadas += len(parametros) - len(recusadas)
+        db.registrar_escrita()
+        if progresso:
+            progresso(linhas_lidas, gravadas, rejeitadas)
+
+    try:
+        with db.obter_conexao() as conn, open(caminho, newline="", encoding="utf-8-sig") as arquivo:
+            if conn is None:
+                raise db.Error("não foi possível conectar ao banco de dados")
+
+            cabecalho = arquivo.readline()
+            arquivo.seek(0)
+            leitor = csv.DictReader(arquivo, delimiter=";" if cabecalho.count(";") > cabecalho.count(",") else ",")
+            leitor.fieldnames = [campo.strip().lower() for campo in (leitor.fieldnames or [])]
+            faltando = obrigatorias - set(leitor.fieldnames)
+            if faltando:
+                raise ValueError(f"colunas obrigatórias ausentes no CSV: {', '.join(sorted(faltando))}")
+
+            bloco = []
+            for registro in leitor:
+                linhas_lidas = leitor.line_num
+                bloco.append((leitor.line_num, registro))
+                if len(bloco) >= tamanho_lote:
+                    processar(conn, bloco)
+                    bloco = []
+            if bloco:
+                processar(conn, bloco)
+    finally:
+        if arquivo_rejeitados is not None:
+            arquivo_rejeitados.close()
+
+    segundos = time.perf_counter() - inicio
+    logging.info(f"Importação de {tipo} de '{caminho}': {gravadas} gravados, {rejeitadas} rejeitados "
+                 f"em {segundos:.1f}s.")
+    return {
+        "gravadas": gravadas,
+        "rejeitadas": rejeitadas,
+        "linhas": linhas_lidas,
+        "segundos": segundos,
+        "arquivo_rejeitados": caminho_rejeitados if rejeitadas else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importação em lote de clientes ou produtos (CSV).")
+    parser.add_argument("tipo", choices=sorted(_TIPOS))
+    parser.add_argument("arquivo")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO, help="Linhas por transação")
+    parser.add_argument("--rejeitados", help="Arquivo de rejeitados (padrão: <arquivo>.rejeitados.csv)")
+    args = parser.parse_args()
+
+    db.inicializar_db()
+
+    def mostrar_progresso(linhas, gravadas, rejeitadas):
+        print(f"\r{linhas} linhas lidas | {gravadas} gravadas | {rejeitadas} rejeitadas", end="", flush=True)
+
+    try:
+        resultado = importar_cadastros(args.tipo, args.arquivo, max(1, args.lote), args.rejeitados,
+                                       mostrar_progresso)
+    except (OSError, ValueError, db.Error) as e:
+        print()
+        print(f"Erro na importação: {e}")
+        sys.exit(1)
+    finally:
+        db.fechar_conexoes()
+
+    print()
+    taxa = resultado["gravadas"] / resultado["segundos"] if resultado["segundos"] else 0
+    print(f"{resultado['gravadas']} {args.tipo} gravados em {resultado['segundos']:.1f}s ({taxa:.0f} linhas/s).")
+    if resultado["arquivo_rejeitados"]:
+        print(f"{resultado['rejeitadas']} linhas rejeitadas: veja {resultado['arquivo_rejeitados']}")
+
+
+if __name__ == "__main__":
+    main()
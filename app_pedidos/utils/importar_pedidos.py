@@ -0,0 +1,371 @@
+# utils/importar_pedidos.py
+"""
+Importação em lote de pedidos (ex.: exportados pela loja virtual) a partir de CSV ou JSONL.
+
+Uso (a partir de app_pedidos/):
+    python -m utils.importar_pedidos pedidos.csv [--lote 2000] [--rejeitados rejeitados.csv]
+
+CSV (',' ou ';', com cabeçalho): uma linha por item; linhas consecutivas com o mesmo 'pedido' formam
+um pedido (sem 'pedido', cada linha é um pedido de um item).
+    pedido;cliente;data;produto;quantidade;preco
+    A-1001;maria@exemplo.com;2025-03-01;Caneta Azul;3;2,50
+    A-1001;maria@exemplo.com;2025-03-01;Caderno;1;
+
+JSONL: um pedido por linha.
+    {"pedido": "A-1001", "cliente": "maria@exemplo.com", "data": "2025-03-01",
+     "itens": [{"produto": "Caneta Azul", "quantidade": 3, "preco": "2,50"}, {"produto": "Caderno", "quantidade": 1}]}
+
+'cliente' é o id, o e-mail ou o nome (se não houver dois clientes com o mesmo nome); 'produto' é o id
+ou o nome. Sem 'preco', vale o preço do cadastro. Data no formato AAAA-MM-DD.
+
+Pedidos inválidos (cliente ou produto não encontrado, quantidade ou preço inválido, falta de estoque)
+são recusados por inteiro e gravados no arquivo de rejeitados com a linha de origem e o motivo; os
+demais são gravados em lotes, cada lote em uma transação BEGIN IMMEDIATE com a baixa de estoque.
+A chave 'pedido' do arquivo serve apenas para agrupar itens: importar o mesmo arquivo duas vezes
+duplica os pedidos.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from datetime import date
+import db
+from utils.dinheiro import para_centavos
+from utils.medicao import medir
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TAMANHO_LOTE_PADRAO = 2000  # Pedidos por transação
+
+_DATA_ISO = re.compile(r"\d{4}-\d{2}-\d{2}")
+_SO_DIGITOS = re.compile(r"\d+")
+
+
+class _Catalogo:
+    """Clientes e produtos carregados uma única vez, para resolver as referências do arquivo em memória."""
+
+    def __init__(self, conn):
+        self.clientes_ids = set()
+        self.clientes_email = {}
+        self.clientes_nome = {}  # nome normalizado -> id (None se houver mais de um cliente com o nome)
+        for cliente_id, nome, email in conn.execute("SELECT id, nome, email FROM clientes"):
+            self.clientes_ids.add(cliente_id)
+            if email:
+                self.clientes_email[email.strip().lower()] = cliente_id
+            chave = nome.strip().casefold()
+            self.clientes_nome[chave] = None if chave in self.clientes_nome else cliente_id
+
+        self.produtos_id = {}  # id -> (id, nome, preco_centavos)
+        self.produtos_nome = {}
+        for produto in conn.execute("SELECT id, nome, preco_centavos FROM produtos"):
+            self.produtos_id[produto[0]] = produto
+            self.produtos_nome[produto[1].strip().casefold()] = produto
+
+    def cliente(self, referencia):
+        texto = str(referencia if referencia is not None else "").strip()
+        if not texto:
+            raise ValueError("cliente não informado")
+        if _SO_DIGITOS.fullmatch(texto):
+            if int(texto) in self.clientes_ids:
+                return int(texto)
+        elif "@" in texto:
+            cliente_id = self.clientes_email.get(texto.lower())
+            if cliente_id is not None:
+                return cliente_id
+        else:
+            chave = texto.casefold()
+            if chave in self.clientes_nome:
+                if self.clientes_nome[chave] is None:
+                    raise ValueError(f"há mais de um cliente com o nome '{texto}'; use o id ou o e-mail")
+                return self.clientes_nome[chave]
+        raise ValueError(f"cliente '{texto}' não encontrado")
+
+    def produto(self, referencia):
+        texto = str(referencia if referencia is not None else "").strip()
+        if not texto:
+            raise ValueError("produto não informado")
+        produto = self.produtos_nome.get(texto.casefold())
+        if produto is None and _SO_DIGITOS.fullmatch(texto):
+            produto = self.produtos_id.get(int(texto))
+        if produto is None:
+            raise ValueError(f"produto '{texto}' não encontrado")
+        return produto
+
+
+def _validar_data(valor):
+    texto = str(valor if valor is not None else "").strip()
+    if _DATA_ISO.fullmatch(texto):
+        try:
+            date.fromisoformat(texto)
+            return texto
+        except ValueError:
+            pass
+    raise ValueError(f"data inválida '{texto}' (use AAAA-MM-DD)")
+
+
+def _validar_quantidade(valor):
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    texto = str(valor if valor is not None else "").strip()
+    if not _SO_DIGITOS.fullmatch(texto) or int(texto) <= 0:
+        raise ValueError(f"quantidade inválida '{texto}'")
+    return int(texto)
+
+
+def _montar_pedido(catalogo, bruto):
+    """
+    Valida um pedido lido do arquivo ({"cliente", "data", "itens": [(produto, quantidade, preco)]} ou
+    {"erro"}) e retorna (cliente_id, data, itens, total_centavos), com
+    itens = [(produto_id, produto_nome, quantidade, preco_unit_centavos)]. Lança ValueError com o motivo.
+    """
+    if "erro" in bruto:
+        raise ValueError(bruto["erro"])
+    cliente_id = catalogo.cliente(bruto["cliente"])
+    data = _validar_data(bruto["data"])
+    if not bruto["itens"]:
+        raise ValueError("pedido sem itens")
+
+    itens = []
+    for produto_ref, quantidade, preco in bruto["itens"]:
+        produto_id, produto_nome, preco_catalogo = catalogo.produto(produto_ref)
+        quantidade = _validar_quantidade(quantidade)
+        if preco is None or str(preco).strip() == "":
+            preco_centavos = preco_catalogo
+        else:
+            preco_centavos = para_centavos(preco)
+            if preco_centavos < 0:
+                raise ValueError(f"preço negativo '{preco}'")
+        itens.append((produto_id, produto_nome, quantidade, preco_centavos))
+
+    total_centavos = sum(quantidade * preco for _, _, quantidade, preco in itens)
+    if total_centavos <= 0:
+        raise ValueError("total do pedido deve ser maior que zero")
+    return cliente_id, data, itens, total_centavos
+
+
+def _ler_csv(arquivo):
+    """Gera (origem, pedido bruto), com origem = [(número da linha, registro original), ...]."""
+    cabecalho = arquivo.readline()
+    arquivo.seek(0)
+    leitor = csv.DictReader(arquivo, delimiter=";" if cabecalho.count(";") > cabecalho.count(",") else ",")
+
+    campos = [campo.strip().lower() for campo in (leitor.fieldnames or [])]
+    faltando = {"cliente", "data", "produto", "quantidade"} - set(campos)
+    if faltando:
+        raise ValueError(f"colunas obrigatórias ausentes no CSV: {', '.join(sorted(faltando))}")
+    leitor.fieldnames = campos
+
+    chave_atual, origem, pedido = None, [], None
+    for registro in leitor:
+        chave = (registro.get("pedido") or "").strip()
+        if origem and (not chave or chave != chave_atual):
+            yield origem, pedido
+            origem = []
+        if not origem:
+            # Cliente e data vêm da primeira linha do pedido
+            chave_atual = chave
+            pedido = {"cliente": registro.get("cliente"), "data": registro.get("data"), "itens": []}
+        origem.append((leitor.line_num, registro))
+        pedido["itens"].append((registro.get("produto"), registro.get("quantidade"), registro.get("preco")))
+    if origem:
+        yield origem, pedido
+
+
+def _ler_jsonl(arquivo):
+    for numero, linha in enumerate(arquivo, start=1):
+        if not linha.strip():
+            continue
+        origem = [(numero, linha.rstrip("\r\n"))]
+        try:
+            registro = json.loads(linha)
+            itens = [(item.get("produto"), item.get("quantidade"), item.get("preco"))
+                     for item in (registro.get("itens") or [])]
+        except (ValueError, AttributeError) as e:
+            yield origem, {"erro": f"JSON inválido ({e})"}
+            continue
+        yield origem, {"cliente": registro.get("cliente"), "data": registro.get("data"), "itens": itens}
+
+
+class _Rejeitados:
+    """Arquivo de rejeitados, criado apenas se algum pedido for recusado."""
+
+    def __init__(self, caminho, formato):
+        self.caminho = caminho
+        self.formato = formato
+        self.total = 0
+        self._arquivo = None
+        self._escritor = None
+
+    def gravar(self, origem, motivo):
+        self.total += 1
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, "w", newline="", encoding="utf-8")
+            if self.formato == "csv":
+                self._escritor = csv.writer(self._arquivo, delimiter=";")
+                self._escritor.writerow(["linha", "motivo", "registro"])
+
+        for numero, registro in origem:
+            if self.formato == "csv":
+                self._escritor.writerow([numero, motivo, json.dumps(registro, ensure_ascii=False)])
+            else:
+                self._arquivo.write(json.dumps({"linha": numero, "motivo": motivo, "registro": registro},
+                                               ensure_ascii=False) + "\n")
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+
+
+def _gravar_lote(conn, lote, rejeitados):
+    """
+    Grava um lote de pedidos válidos em uma transação. O estoque é relido dentro da transação
+    (outros terminais podem ter vendido desde o lote anterior); pedidos sem estoque são recusados.
+    Retorna o número de pedidos gravados.
+    """
+    db._iniciar_escrita(conn)  # O mesmo início de escrita de db.registrar_pedido
+    try:
+        ids_produtos = json.dumps(sorted({item[0] for _, (_, _, itens, _) in lote for item in itens}))
+        estoque = dict(conn.execute("SELECT id, estoque FROM produtos WHERE id IN (SELECT value FROM json_each(?))",
+                                    (ids_produtos,)))
+
+        # Ids atribuídos aqui (executemany não devolve lastrowid); a escrita está reservada pelo BEGIN IMMEDIATE
+        proximo_id = conn.execute("""
+            SELECT MAX(COALESCE((SELECT MAX(id) FROM pedidos), 0),
+                       COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'pedidos'), 0)) + 1
+        """).fetchone()[0]
+
+        pedidos, itens_db, baixas = [], [], {}
+        for origem, (cliente_id, data, itens, total_centavos) in lote:
+            pedido_baixas, nomes = {}, {}
+            for produto_id, produto_nome, quantidade, _ in itens:
+                pedido_baixas[produto_id] = pedido_baixas.get(produto_id, 0) + quantidade
+                nomes[produto_id] = produto_nome
+            faltas = [(nomes[produto_id], quantidade, estoque.get(produto_id, 0))
+                      for produto_id, quantidade in pedido_baixas.items() if quantidade > estoque.get(produto_id, 0)]
+            if faltas:
+                rejeitados.gravar(origem, str(db.EstoqueInsuficiente(faltas)).replace("\n", " "))
+                continue
+
+            for produto_id, quantidade in pedido_baixas.items():
+                estoque[produto_id] -= quantidade
+                baixas[produto_id] = baixas.get(produto_id, 0) + quantidade
+            pedidos.append((proximo_id, cliente_id, data, total_centavos))
+            itens_db.extend((proximo_id,) + item for item in itens)
+            proximo_id += 1
+
+        conn.executemany("INSERT INTO pedidos (id, cliente_id, data, total_centavos) VALUES (?, ?, ?, ?)", pedidos)
+        conn.executemany("INSERT INTO itens_pedido (pedido_id, produto_id, produto_nome, quantidade, "
+                         "preco_unit_centavos) VALUES (?, ?, ?, ?, ?)", itens_db)
+        conn.executemany("UPDATE produtos SET estoque = estoque - ? WHERE id = ?",
+                         [(quantidade, produto_id) for produto_id, quantidade in baixas.items()])
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    db.registrar_escrita()
+    return len(pedidos)
+
+
+def importar_pedidos(caminho, formato=None, tamanho_lote=TAMANHO_LOTE_PADRAO, caminho_rejeitados=None,
+                     progresso=None):
+    """
+    Importa os pedidos de 'caminho' (formato 'csv' ou 'jsonl'; pela extensão, se None).
+    progresso(linhas_lidas, gravados, rejeitados) é chamado após cada lote.
+
+    Retorna {"gravados", "rejeitados", "linhas", "segundos", "arquivo_rejeitados"} (arquivo_rejeitados
+    é None se nada foi recusado). Lança ValueError se o arquivo não tiver as colunas obrigatórias e
+    db.Error se o banco falhar; os lotes já confirmados permanecem gravados.
+    """
+    if formato is None:
+        formato = "jsonl" if os.path.splitext(caminho)[1].lower() in (".jsonl", ".ndjson") else "csv"
+    if formato not in ("csv", "jsonl"):
+        raise ValueError(f"formato desconhecido: {formato}")
+    if caminho_rejeitados is None:
+        base = os.path.splitext(caminho)[0]
+        caminho_rejeitados = f"{base}.rejeitados.{formato}"
+
+    inicio = time.perf_counter()
+    rejeitados = _Rejeitados(caminho_rejeitados, formato)
+    gravados = linhas = 0
+
+    with db.obter_conexao() as conn:
+        if conn is None:
+            raise db.Error("não foi possível conectar ao banco de dados")
+        catalogo = _Catalogo(conn)
+
+        leitura = _ler_csv if formato == "csv" else _ler_jsonl
+        try:
+            with open(caminho, newline="" if formato == "csv" else None, encoding="utf-8-sig") as arquivo:
+                lote = []
+                for origem, bruto in leitura(arquivo):
+                    linhas = origem[-1][0]
+                    try:
+                        lote.append((origem, _montar_pedido(catalogo, bruto)))
+                    except ValueError as e:
+                        rejeitados.gravar(origem, str(e))
+
+                    if len(lote) >= tamanho_lote:
+                        with medir("importar_pedidos:lote"):
+                            gravados += _gravar_lote(conn, lote, rejeitados)
+                        lote = []
+                        if progresso:
+                            progresso(linhas, gravados, rejeitados.total)
+
+                if lote:
+                    with medir("importar_pedidos:lote"):
+                        gravados += _gravar_lote(conn, lote, rejeitados)
+                if progresso:
+                    progresso(linhas, gravados, rejeitados.total)
+        finally:
+            rejeitados.fechar()
+
+    segundos = time.perf_counter() - inicio
+    logging.info(f"Importação de '{caminho}': {gravados} pedidos gravados, {rejeitados.total} rejeitados "
+                 f"em {segundos:.1f}s.")
+    return {
+        "gravados": gravados,
+        "rejeitados": rejeitados.total,
+        "linhas": linhas,
+        "segundos": segundos,
+        "arquivo_rejeitados": caminho_rejeitados if rejeitados.total else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importação em lote de pedidos (CSV ou JSONL).")
+    parser.add_argument("arquivo")
+    parser.add_argument("--formato", choices=["csv", "jsonl"], help="Padrão: pela extensão do arquivo")
+    parser.add_argument("--lote", type=int, default=TAMANHO_LOTE_PADRAO, help="Pedidos por transação")
+    parser.add_argument("--rejeitados", help="Arquivo de rejeitados (padrão: <arquivo>.rejeitados.<formato>)")
+    args = parser.parse_args()
+
+    db.inicializar_db()
+
+    def mostrar_progresso(linhas, gravados, rejeitados):
+        print(f"\r{linhas} linhas lidas | {gravados} pedidos gravados | {rejeitados} rejeitados",
+              end="", flush=True)
+
+    try:
+        resultado = importar_pedidos(args.arquivo, args.formato, max(1, args.lote), args.rejeitados,
+                                     mostrar_progresso)
+    except (OSError, ValueError, db.Error) as e:
+        print()
+        print(f"Erro na importação: {e}")
+        sys.exit(1)
+    finally:
+        db.fechar_conexoes()
+
+    print()
+    taxa = resultado["gravados"] / resultado["segundos"] if resultado["segundos"] else 0
+    print(f"{resultado['gravados']} pedidos gravados em {resultado['segundos']:.1f}s ({taxa:.0f} pedidos/s).")
+    if resultado["arquivo_rejeitados"]:
+        print(f"{resultado['rejeitados']} pedidos rejeitados: veja {resultado['arquivo_rejeitados']}")
+
+
+if __name__ == "__main__":
+    main()
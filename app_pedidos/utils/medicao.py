@@ -0,0 +1,236 @@
+# utils/medicao.py
+"""
+Medição de tempo de abertura e de interações (spans), ativada por variável de ambiente:
+
+    APP_PEDIDOS_MEDICAO=1 python main.py
+
+Ao sair, o relatório da sessão é gravado em APP_PEDIDOS_MEDICAO_DIR (padrão: medicoes/) como
+medicao_AAAAMMDD_HHMMSS.json (dados completos) e .txt (resumo por span).
+
+Uso no código:
+    with medir("App.inicializar_db"):
+        ...
+
+    @medido()                      # nome = __qualname__ da função
+    def recarregar_clientes(self): ...
+
+    marco("janela_exibida")         # instante desde o início da sessão
+
+Desativada, medir() devolve sempre o mesmo objeto vazio e medido() devolve a própria função,
+sem nenhum invólucro: o custo é uma chamada de função por bloco medido.
+"""
+import atexit
+import json
+import logging
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from functools import wraps
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+MEDICAO_ATIVA = os.getenv("APP_PEDIDOS_MEDICAO", "").strip().lower() not in ("", "0", "false", "nao", "não")
+DIRETORIO_MEDICOES = os.getenv("APP_PEDIDOS_MEDICAO_DIR", "medicoes")
+MAX_EVENTOS = 5000  # Linha do tempo guardada no JSON; as estatísticas por span continuam sem limite
+
+_INICIO_SESSAO = time.perf_counter()
+_INICIO_SESSAO_DATA = datetime.now()
+
+_lock = threading.Lock()
+_duracoes = {}  # nome -> [duração em segundos, ...]
+_eventos = []  # (nome, início desde a sessão, duração, thread)
+_eventos_descartados = 0
+_marcos = {}  # nome -> instante desde o início da sessão (primeira ocorrência)
+_local = threading.local()  # Pilha de spans abertos em cada thread (para o campo "pai")
+_relatorio_gravado = False
+
+
+class _SpanNulo:
+    """Span usado quando a medição está desativada."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_SPAN_NULO = _SpanNulo()
+
+
+class _Span:
+    __slots__ = ("nome", "inicio")
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.inicio = 0.0
+
+    def __enter__(self):
+        pilha = getattr(_local, "pilha", None)
+        if pilha is None:
+            pilha = _local.pilha = []
+        pilha.append(self.nome)
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        duracao = time.perf_counter() - self.inicio
+        pilha = _local.pilha
+        pilha.pop()
+        _registrar(self.nome, self.inicio, duracao, pilha[-1] if pilha else None)
+        return False
+
+
+def _registrar(nome, inicio, duracao, pai=None):
+    global _eventos_descartados
+    thread = threading.current_thread().name
+    with _lock:
+        _duracoes.setdefault(nome, []).append(duracao)
+        if len(_eventos) < MAX_EVENTOS:
+            _eventos.append((nome, inicio - _INICIO_SESSAO, duracao, thread, pai))
+        else:
+            _eventos_descartados += 1
+
+
+def medir(nome):
+    """Context manager que mede o bloco como o span 'nome'."""
+    if not MEDICAO_ATIVA:
+        return _SPAN_NULO
+    return _Span(nome)
+
+
+def medido(nome=None):
+    """Decorador: mede cada chamada da função (span 'nome' ou o __qualname__ da função)."""
+    def decorador(funcao):
+        if not MEDICAO_ATIVA:
+            return funcao
+        nome_span = nome or funcao.__qualname__
+
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with _Span(nome_span):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def registrar_duracao(nome, inicio):
+    """Registra um span cujo início ('inicio', de time.perf_counter()) foi anotado em outro ponto do código."""
+    if MEDICAO_ATIVA:
+        _registrar(nome, inicio, time.perf_counter() - inicio)
+
+
+def marco(nome):
+    """Anota o instante (desde o início da sessão) em que 'nome' aconteceu pela primeira vez."""
+    if MEDICAO_ATIVA:
+        instante = time.perf_counter() - _INICIO_SESSAO
+        with _lock:
+            _marcos.setdefault(nome, instante)
+
+
+def _percentil(ordenados, p):
+    indice = max(0, math.ceil(p / 100 * len(ordenados)) - 1)
+    return ordenados[indice]
+
+
+def resumo_spans():
+    """Estatísticas por span (em ms), ordenadas pelo tempo total."""
+    with _lock:
+        copia = {nome: list(duracoes) for nome, duracoes in _duracoes.items()}
+
+    resumo = []
+    for nome, duracoes in copia.items():
+        ordenados = sorted(duracoes)
+        total = sum(ordenados)
+        resumo.append({
+            "nome": nome,
+            "chamadas": len(ordenados),
+            "total_ms": round(total * 1000, 3),
+            "media_ms": round(total / len(ordenados) * 1000, 3),
+            "p50_ms": round(_percentil(ordenados, 50) * 1000, 3),
+            "p95_ms": round(_percentil(ordenados, 95) * 1000, 3),
+            "max_ms": round(ordenados[-1] * 1000, 3),
+        })
+    resumo.sort(key=lambda span: span["total_ms"], reverse=True)
+    return resumo
+
+
+def _formatar_texto(relatorio):
+    sessao = relatorio["sessao"]
+    linhas = [
+        f"Sessão iniciada em {sessao['inicio']} (pid {sessao['pid']}), duração de {sessao['duracao_s']:.1f}s",
+        "",
+    ]
+
+    if relatorio["marcos"]:
+        linhas.append("Marcos (desde o início da sessão):")
+        for nome, instante_ms in sorted(relatorio["marcos"].items(), key=lambda marco_: marco_[1]):
+            linhas.append(f"  {nome:<40} {instante_ms:10.1f} ms")
+        linhas.append("")
+
+    linhas.append(f"{'Span':<45} {'Chamadas':>8} {'Total ms':>11} {'Média':>9} {'p50':>9} {'p95':>9} {'Máx':>9}")
+    for span in relatorio["spans"]:
+        linhas.append(f"{span['nome'][:45]:<45} {span['chamadas']:>8} {span['total_ms']:>11.1f} "
+                      f"{span['media_ms']:>9.1f} {span['p50_ms']:>9.1f} {span['p95_ms']:>9.1f} {span['max_ms']:>9.1f}")
+
+    if relatorio["eventos_descartados"]:
+        linhas.append("")
+        linhas.append(f"({relatorio['eventos_descartados']} eventos fora da linha do tempo do JSON; "
+                      f"contabilizados nas estatísticas acima)")
+    return "\n".join(linhas) + "\n"
+
+
+def gravar_relatorio(diretorio=None):
+    """
+    Grava o relatório da sessão (JSON + resumo em texto) e devolve o caminho do JSON.
+    Só grava uma vez por sessão; devolve None se a medição estiver desativada ou em caso de erro.
+    """
+    global _relatorio_gravado
+    if not MEDICAO_ATIVA or _relatorio_gravado:
+        return None
+    _relatorio_gravado = True
+
+    with _lock:
+        eventos = list(_eventos)
+        marcos = dict(_marcos)
+        descartados = _eventos_descartados
+
+    relatorio = {
+        "sessao": {
+            "inicio": _INICIO_SESSAO_DATA.isoformat(timespec="seconds"),
+            "duracao_s": round(time.perf_counter() - _INICIO_SESSAO, 3),
+            "pid": os.getpid(),
+        },
+        "marcos": {nome: round(instante * 1000, 3) for nome, instante in marcos.items()},
+        "spans": resumo_spans(),
+        "eventos": [
+            {"nome": nome, "inicio_ms": round(inicio * 1000, 3), "duracao_ms": round(duracao * 1000, 3),
+             "thread": thread, "pai": pai}
+            for nome, inicio, duracao, thread, pai in eventos
+        ],
+        "eventos_descartados": descartados,
+    }
+
+    diretorio = diretorio or DIRETORIO_MEDICOES
+    base = os.path.join(diretorio, f"medicao_{_INICIO_SESSAO_DATA:%Y%m%d_%H%M%S}")
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        with open(base + ".json", "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+        with open(base + ".txt", "w", encoding="utf-8") as arquivo:
+            arquivo.write(_formatar_texto(relatorio))
+    except OSError as e:
+        logging.error(f"Erro ao gravar o relatório de medição: {e}")
+        return None
+
+    logging.info(f"Relatório de medição gravado em {base}.json / .txt")
+    return base + ".json"
+
+
+if MEDICAO_ATIVA:
+    # Garante o relatório mesmo se a janela for fechada sem passar por _on_app_fechar
+    atexit.register(gravar_relatorio)
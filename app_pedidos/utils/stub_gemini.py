@@ -0,0 +1,194 @@
+# utils/stub_gemini.py
+"""
+Servidor HTTP local que imita os endpoints generateContent e streamGenerateContent da API do Gemini.
+Permite testar latência, falhas transitórias (429/503) e as retentativas de utils/analise_ia.py sem rede.
+
+Uso (a partir de app_pedidos/):
+    python -m utils.stub_gemini --porta 8765 --latencia 0.5 --falhas 2 --codigo 429
+
+e, em outro terminal, aponte a aplicação para o stub:
+    APP_PEDIDOS_GEMINI_URL=http://127.0.0.1:8765 GEMINI_API_KEY=teste python main.py
+
+Também pode ser usado dentro de um script:
+    with ServidorStubGemini(falhas=1) as stub:
+        os.environ["APP_PEDIDOS_GEMINI_URL"] = stub.url
+        ...
+"""
+import argparse
+import json
+import logging
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+TEXTO_PADRAO = (
+    "🏆 Top 3 Produtos: resposta simulada pelo stub local.\n"
+    "💰 Ticket Médio: R$ 0,00 (simulado)\n"
+    "📅 Pedido mais recente: (simulado)\n"
+)
+
+_STATUS_ERRO = {
+    400: "INVALID_ARGUMENT",
+    403: "PERMISSION_DENIED",
+    408: "DEADLINE_EXCEEDED",
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    503: "UNAVAILABLE",
+    504: "DEADLINE_EXCEEDED",
+}
+
+
+def _resposta(texto, final=True):
+    """Corpo no formato GenerateContentResponse."""
+    candidato = {"content": {"role": "model", "parts": [{"text": texto}]}, "index": 0}
+    if final:
+        candidato["finishReason"] = "STOP"
+    return {"candidates": [candidato], "modelVersion": "stub"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Mantém a conexão aberta entre requisições (como a API real)
+
+    def log_message(self, formato, *args):
+        logging.debug("stub_gemini: " + formato % args)
+
+    def do_POST(self):
+        stub = self.server.stub
+        tamanho = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(tamanho)
+
+        numero = stub.registrar_requisicao()
+        if stub.latencia_s:
+            time.sleep(stub.latencia_s)
+
+        caminho = self.path.split("?", 1)[0]
+        if caminho.endswith(":generateContent"):
+            if numero <= stub.falhas:
+                self._enviar_erro(stub.codigo_falha)
+            else:
+                self._enviar_json(200, _resposta(stub.texto))
+        elif caminho.endswith(":streamGenerateContent"):
+            if numero <= stub.falhas:
+                self._enviar_erro(stub.codigo_falha)
+            else:
+                self._enviar_stream(stub)
+        else:
+            self._enviar_erro(404)
+
+    def _enviar_json(self, status, corpo):
+        dados = json.dumps(corpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _enviar_erro(self, codigo):
+        status = _STATUS_ERRO.get(codigo, "UNKNOWN")
+        self._enviar_json(codigo, {"error": {"code": codigo, "message": f"Falha simulada pelo stub ({status}).",
+                                             "status": status}})
+
+    def _enviar_stream(self, stub):
+        """Server-sent events (alt=sse): um evento 'data:' por trecho, como a API real."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        tamanho = max(1, -(-len(stub.texto) // stub.trechos))
+        partes = [stub.texto[i:i + tamanho] for i in range(0, len(stub.texto), tamanho)]
+        for i, parte in enumerate(partes):
+            if i and stub.atraso_trecho_s:
+                time.sleep(stub.atraso_trecho_s)
+            evento = f"data: {json.dumps(_resposta(parte, final=i == len(partes) - 1), ensure_ascii=False)}\r\n\r\n"
+            dados = evento.encode("utf-8")
+            self.wfile.write(f"{len(dados):X}\r\n".encode("ascii") + dados + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class ServidorStubGemini:
+    """
+    Stub configurável:
+    - latencia_s: espera antes de cada resposta;
+    - falhas / codigo_falha: as primeiras 'falhas' requisições respondem com esse código HTTP;
+    - trechos / atraso_trecho_s: quantos eventos o streaming envia e o intervalo entre eles.
+    """
+
+    def __init__(self, porta=0, latencia_s=0.0, falhas=0, codigo_falha=429, texto=TEXTO_PADRAO,
+                 trechos=3, atraso_trecho_s=0.0):
+        self.latencia_s = latencia_s
+        self.falhas = falhas
+        self.codigo_falha = codigo_falha
+        self.texto = texto
+        self.trechos = trechos
+        self.atraso_trecho_s = atraso_trecho_s
+
+        self._lock = threading.Lock()
+        self._requisicoes = 0
+        self._thread = None
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", porta), _Handler)
+        self._servidor.daemon_threads = True
+        self._servidor.stub = self
+
+    @property
+    def url(self):
+        host, porta = self._servidor.server_address[:2]
+        return f"http://{host}:{porta}"
+
+    @property
+    def requisicoes(self):
+        with self._lock:
+            return self._requisicoes
+
+    def registrar_requisicao(self):
+        """Conta a requisição e devolve seu número de ordem (a partir de 1)."""
+        with self._lock:
+            self._requisicoes += 1
+            return self._requisicoes
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="stub-gemini", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub local da API do Gemini.")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="Segundos antes de cada resposta")
+    parser.add_argument("--falhas", type=int, default=0, help="Quantas requisições iniciais falham")
+    parser.add_argument("--codigo", type=int, default=429, help="Código HTTP das falhas")
+    parser.add_argument("--trechos", type=int, default=3, help="Eventos por resposta em streaming")
+    parser.add_argument("--atraso-trecho", type=float, default=0.0, help="Segundos entre os eventos")
+    args = parser.parse_args()
+
+    encerrar = threading.Event()
+    for sinal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sinal, lambda *_: encerrar.set())
+
+    with ServidorStubGemini(args.porta, args.latencia, args.falhas, args.codigo,
+                            trechos=args.trechos, atraso_trecho_s=args.atraso_trecho) as stub:
+        logging.info(f"Stub do Gemini em {stub.url} (Ctrl+C para encerrar).")
+        # Espera com prazo: no Windows, um wait() sem prazo não é interrompido pelo Ctrl+C
+        while not encerrar.wait(0.5):
+            pass
+    logging.info("Stub do Gemini encerrado.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# utils/treeview_paginada.py
+import logging
+from utils.executor_db import executar_sincrono
+from utils.treeview_sincronizada import TreeviewSincronizada
+
+
+class TreeviewPaginada:
+    """
+    Rolagem virtual para uma Treeview: carrega a primeira página e busca a próxima
+    somente quando o usuário se aproxima do fim da rolagem.
+
+    buscar_pagina(cursor, tamanho) -> (linhas, proximo_cursor)   (proximo_cursor None = fim)
+    formatar_linha(linha) -> (iid, valores)
+    exibir_erro(erro) informa a falha de uma página (a rolagem para de buscar até a próxima recarga).
+    executar(funcao, args, ao_concluir, ao_erro) permite buscar as páginas fora da thread da interface.
+    """
+
+    def __init__(self, tree, scrollbar, buscar_pagina, formatar_linha, tamanho_pagina=200,
+                 limiar=0.9, texto_vazio="Nenhum registro encontrado.", executar=None, exibir_erro=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.buscar_pagina = buscar_pagina
+        self.formatar_linha = formatar_linha
+        self.tamanho_pagina = tamanho_pagina
+        self.limiar = limiar  # Fração da rolagem (0-1) a partir da qual a próxima página é buscada
+        self.texto_vazio = texto_vazio
+        self.executar = executar or executar_sincrono
+        self.exibir_erro = exibir_erro
+        # Reaproveita o sincronizador criado junto com a Treeview, se houver
+        self.sincronizador = getattr(tree, "sincronizador", None) or TreeviewSincronizada(tree)
+
+        self._geracao = 0  # Incrementada a cada recarga; páginas de recargas anteriores são descartadas
+        self._cursor = None
+        self._tem_mais = False
+        self._carregando = False
+        self._agendado = None
+        self._carregadas = 0  # Linhas de dados exibidas (todas as páginas já recebidas)
+
+        # Intercepta a rolagem para detectar a aproximação do fim da lista
+        self.tree.configure(yscrollcommand=self._ao_rolar)
+
+    @property
+    def tem_mais(self):
+        return self._tem_mais
+
+    def recarregar(self):
+        """
+        Busca de novo, em uma única consulta, tantas linhas quantas estão exibidas (no mínimo uma página)
+        e aplica só a diferença: a seleção e a posição da rolagem são mantidas.
+        """
+        if self._agendado is not None:
+            self.tree.after_cancel(self._agendado)
+            self._agendado = None
+
+        self._geracao += 1
+        self._cursor = None
+        self._tem_mais = True
+        self._carregando = False
+        self.carregar_proxima_pagina(max(self.tamanho_pagina, self._carregadas))
+
+    def carregar_proxima_pagina(self, tamanho=None):
+        """Busca a página seguinte ao último cursor e anexa as linhas ao final da Treeview."""
+        self._agendado = None
+        if not self._tem_mais or self._carregando:
+            return
+
+        self._carregando = True
+        geracao = self._geracao
+        primeira_pagina = self._cursor is None
+        self.executar(self.buscar_pagina, (self._cursor, tamanho or self.tamanho_pagina),
+                      lambda resultado: self._receber_pagina(geracao, primeira_pagina, resultado),
+                      lambda erro: self._receber_erro(geracao, primeira_pagina, erro))
+
+    def _receber_pagina(self, geracao, primeira_pagina, resultado):
+        if geracao != self._geracao or not self.tree.winfo_exists():
+            return  # Página de uma recarga anterior
+
+        self._carregando = False
+        try:
+            linhas, self._cursor = resultado
+            self._tem_mais = self._cursor is not None
+
+            formatadas = [self.formatar_linha(linha) for linha in linhas]
+            if not primeira_pagina:
+                self.sincronizador.anexar(formatadas)
+                self._carregadas += len(formatadas)
+            elif formatadas:
+                # A primeira página substitui a lista inteira (recarga): aplica só a diferença
+                self.sincronizador.atualizar(formatadas)
+                self._carregadas = len(formatadas)
+            else:
+                self.sincronizador.exibir_mensagem(self.texto_vazio)
+                self._carregadas = 0
+        except Exception as e:
+            self._tem_mais = False
+            logging.error(f"Erro ao carregar página da lista: {e}")
+
+    def _receber_erro(self, geracao, primeira_pagina, erro):
+        if geracao != self._geracao or not self.tree.winfo_exists():
+            return
+
+        # Sem _tem_mais, a rolagem não repete a consulta que falhou; recarregar() tenta de novo
+        self._carregando = False
+        self._tem_mais = False
+        logging.error(f"Erro ao carregar página da lista: {erro}")
+        if primeira_pagina:
+            self.sincronizador.exibir_mensagem("Erro ao carregar a lista.")
+            self._carregadas = 0
+        if self.exibir_erro:
+            self.exibir_erro(erro)
+
+    def _ao_rolar(self, primeiro, ultimo):
+        self.scrollbar.set(primeiro, ultimo)
+
+        # Também dispara quando a primeira página não preenche a área visível (ultimo == 1.0)
+        if self._tem_mais and not self._carregando and self._agendado is None and float(ultimo) >= self.limiar:
+            self._agendado = self.tree.after_idle(self.carregar_proxima_pagina)
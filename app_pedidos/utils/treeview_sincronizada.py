@@ -0,0 +1,148 @@
+# utils/treeview_sincronizada.py
+import bisect
+
+IID_MENSAGEM = "__mensagem__"  # Linha única usada para avisos ("Carregando...", "Nenhum registro...")
+
+
+def _estaveis(posicoes):
+    """
+    Índices (em 'posicoes') da maior subsequência crescente: as linhas que já estão na ordem certa
+    e não precisam ser movidas. O(n log n).
+    """
+    finais = []  # finais[k] = menor posição que termina uma subsequência de tamanho k + 1
+    indices_finais = []
+    anterior = [-1] * len(posicoes)
+
+    for i, posicao in enumerate(posicoes):
+        k = bisect.bisect_left(finais, posicao)
+        if k == len(finais):
+            finais.append(posicao)
+            indices_finais.append(i)
+        else:
+            finais[k] = posicao
+            indices_finais[k] = i
+        anterior[i] = indices_finais[k - 1] if k else -1
+
+    estaveis = set()
+    i = indices_finais[-1] if indices_finais else -1
+    while i != -1:
+        estaveis.add(i)
+        i = anterior[i]
+    return estaveis
+
+
+class TreeviewSincronizada:
+    """
+    Atualiza uma Treeview (lista plana) por diferença em vez de apagar e reinserir tudo:
+    compara as novas linhas com as exibidas pelo iid e aplica apenas exclusões, alterações,
+    inserções e movimentações. A seleção das linhas que continuam na lista é preservada pela
+    própria Treeview, e a rolagem é mantida na mesma linha do topo.
+
+    linhas: iterável de (iid, valores) ou (iid, valores, tags)
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._exibidas = {}  # iid -> (valores, tags) como foram gravados por este objeto
+
+    def _normalizar(self, linhas):
+        normalizadas = []
+        vistos = set()
+        for linha in linhas:
+            iid = str(linha[0])
+            if iid in vistos:
+                continue  # Uma Treeview não aceita iids repetidos; vale a primeira ocorrência
+            vistos.add(iid)
+            tags = tuple(linha[2]) if len(linha) > 2 and linha[2] else ()
+            normalizadas.append((iid, tuple(linha[1]), tags))
+        return normalizadas
+
+    def _linha_do_topo(self, filhos):
+        """iid da primeira linha visível (None se a lista está no topo ou vazia)."""
+        inicio = float(self.tree.yview()[0])
+        if not filhos or inicio <= 0:
+            return None
+        return filhos[min(len(filhos) - 1, int(round(inicio * len(filhos))))]
+
+    def atualizar(self, linhas):
+        """Faz a Treeview exibir exatamente 'linhas', nessa ordem."""
+        tree = self.tree
+        novas = self._normalizar(linhas)
+        novos_iids = {iid for iid, _, _ in novas}
+
+        filhos = tree.get_children()
+        topo = self._linha_do_topo(filhos)
+
+        # 1. Exclusões (inclui linhas inseridas por outro código, como avisos)
+        removidos = [iid for iid in filhos if iid not in novos_iids]
+        if removidos:
+            tree.delete(*removidos)
+            for iid in removidos:
+                self._exibidas.pop(iid, None)
+        ordem = [iid for iid in filhos if iid in novos_iids]
+        posicao_atual = {iid: i for i, iid in enumerate(ordem)}
+
+        # 2. Alterações de valores/tags das linhas que permanecem
+        for iid, valores, tags in novas:
+            if iid in posicao_atual and self._exibidas.get(iid) != (valores, tags):
+                tree.item(iid, values=valores, tags=tags)
+                self._exibidas[iid] = (valores, tags)
+
+        # 3. Inserções e movimentações: as linhas da maior subsequência já ordenada ficam paradas;
+        #    cada uma das demais é posicionada logo após a linha que a antecede na nova ordem
+        existentes = [i for i, (iid, _, _) in enumerate(novas) if iid in posicao_atual]
+        estaveis = {existentes[k] for k in _estaveis([posicao_atual[novas[i][0]] for i in existentes])}
+
+        anterior = None
+        indice_anterior = -1  # Posição de 'anterior' em 'ordem' (espelho da Treeview)
+        for i, (iid, valores, tags) in enumerate(novas):
+            if i in estaveis:
+                anterior, indice_anterior = iid, -1
+                continue
+
+            if iid in posicao_atual:
+                ordem.remove(iid)
+            if anterior is None:
+                destino = 0
+            else:
+                if not (0 <= indice_anterior < len(ordem) and ordem[indice_anterior] == anterior):
+                    indice_anterior = ordem.index(anterior)
+                destino = indice_anterior + 1
+
+            indice_destino = "end" if destino == len(ordem) else destino
+            if iid in posicao_atual:
+                tree.detach(iid)  # Fora da lista, o índice de move() conta apenas as demais linhas
+                tree.move(iid, "", indice_destino)
+            else:
+                tree.insert("", indice_destino, iid=iid, values=valores, tags=tags)
+                self._exibidas[iid] = (valores, tags)
+            ordem.insert(destino, iid)
+            anterior, indice_anterior = iid, destino
+
+        self._restaurar_topo(topo, len(novas))
+
+    def anexar(self, linhas):
+        """Acrescenta linhas ao final (ex.: próxima página); iids já exibidos são apenas atualizados."""
+        tree = self.tree
+        if tree.exists(IID_MENSAGEM):
+            tree.delete(IID_MENSAGEM)
+            self._exibidas.pop(IID_MENSAGEM, None)
+
+        for iid, valores, tags in self._normalizar(linhas):
+            if tree.exists(iid):
+                if self._exibidas.get(iid) != (valores, tags):
+                    tree.item(iid, values=valores, tags=tags)
+            else:
+                tree.insert("", "end", iid=iid, values=valores, tags=tags)
+            self._exibidas[iid] = (valores, tags)
+
+    def exibir_mensagem(self, texto, coluna=1):
+        """Substitui as linhas por um aviso na coluna 'coluna' (a primeira, se houver só uma)."""
+        valores = [""] * len(self.tree["columns"])
+        valores[min(coluna, len(valores) - 1)] = texto
+        self.atualizar([(IID_MENSAGEM, valores, ("empty",))])
+
+    def _restaurar_topo(self, topo, total):
+        if topo is None or not total or not self.tree.exists(topo):
+            return
+        self.tree.yview_moveto(self.tree.index(topo) / total)
@@ -1,5 +1,13 @@
 # utils/validations.py
 import re
+from utils.dinheiro import para_centavos
+
+# Compilados uma vez: as mesmas regras valem para os formulários e para as importações em lote
+_PADRAO_EMAIL = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+_NAO_DIGITOS = re.compile(r'\D')
+_PRECO_SIMPLES = re.compile(r"\d+(?:[.,]\d{1,2})?")  # "12", "12,5", "12.50": dispensa o Decimal
+_DIGITO_NAO_ZERO = re.compile(r"[1-9]")
+_ESTOQUE = re.compile(r"\+?\d+")
 
 
 def validar_nome(nome):
@@ -11,9 +19,7 @@ def validar_email(email):
     """Validação de formato de e-mail simples (ex: nome@dominio.com)."""
     if not email:
         return True  # Permite vazio se não for obrigatório
-    # Regex simples para garantir formato básico
-    padrao = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    return re.fullmatch(padrao, email.strip()) is not None
+    return _PADRAO_EMAIL.fullmatch(email.strip()) is not None
 
 
 def validar_telefone(telefone):
@@ -22,7 +28,48 @@ def validar_telefone(telefone):
         return True  # Permite vazio se não for obrigatório
 
     # Remove caracteres não numéricos
-    digitos = re.sub(r'\D', '', telefone)
+    digitos = _NAO_DIGITOS.sub('', telefone)
 
     # Verifica se o número de dígitos está entre 8 e 15
-    return 8 <= len(digitos) <= 15
\ No newline at end of file
+    return 8 <= len(digitos) <= 15
+
+
+# --- Validação de colunas inteiras (importação em lote): uma lista de bool por coluna ---
+
+def validar_nomes(nomes):
+    """Mesma regra de validar_nome, para uma coluna inteira."""
+    return [bool(nome and not nome.isspace()) for nome in nomes]
+
+
+def validar_emails(emails):
+    """Mesma regra de validar_email (vazio é válido), para uma coluna inteira."""
+    casar = _PADRAO_EMAIL.fullmatch
+    return [not email or casar(email.strip()) is not None for email in emails]
+
+
+def validar_telefones(telefones):
+    """Mesma regra de validar_telefone (vazio é válido), para uma coluna inteira."""
+    remover = _NAO_DIGITOS.sub
+    return [not telefone or 8 <= len(remover('', telefone)) <= 15 for telefone in telefones]
+
+
+def _preco_positivo(preco):
+    try:
+        return para_centavos(preco) > 0
+    except ValueError:
+        return False
+
+
+def validar_precos(precos):
+    """
+    Mesma regra do formulário de produtos (para_centavos, maior que zero), para uma coluna inteira.
+    O formato comum é resolvido pela regex; os demais ("R$ 1.234,56", "1e3") passam por para_centavos.
+    """
+    casar, nao_zero = _PRECO_SIMPLES.fullmatch, _DIGITO_NAO_ZERO.search
+    return [bool(nao_zero(preco)) if casar(preco) else _preco_positivo(preco) for preco in precos]
+
+
+def validar_estoques(estoques):
+    """Estoque inteiro não negativo (vazio é válido: mantém o atual), para uma coluna inteira."""
+    casar = _ESTOQUE.fullmatch
+    return [not estoque or casar(estoque) is not None for estoque in estoques]
@@ -0,0 +1,77 @@
+# utils/verificar_importacao.py
+"""
+Verifica o orçamento de inicialização a frio do app com `python -X importtime`.
+
+Uso (a partir de app_pedidos/):
+    python -m utils.verificar_importacao [--orcamento-ms 250] [--top 10]
+
+Importa main.py em um processo novo (sem abrir a janela), soma o tempo de importação e falha
+(código de saída 1) se o total passar do orçamento ou se algum módulo carregado sob demanda
+(SDK do Gemini, reportlab, python-dotenv) tiver sido importado na abertura.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ORCAMENTO_PADRAO_MS = 250
+
+# Subsistemas que devem ser importados apenas no primeiro uso
+MODULOS_ADIADOS = ("google.genai", "reportlab", "dotenv")
+
+
+def medir_importacao(modulo="main"):
+    """
+    Executa 'import <modulo>' com -X importtime em um novo interpretador.
+    Retorna uma lista de (nome, próprio_us, acumulado_us, profundidade), na ordem do relatório.
+    """
+    diretorio_app = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                              cwd=diretorio_app, capture_output=True, text=True)
+    if processo.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {modulo}:\n{processo.stderr[-2000:]}")
+
+    registros = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        profundidade = (len(nome) - len(nome.lstrip())) // 2
+        registros.append((nome.strip(), int(proprio), int(acumulado), profundidade))
+    return registros
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orçamento de importação a frio do app.")
+    parser.add_argument("--orcamento-ms", type=float, default=ORCAMENTO_PADRAO_MS)
+    parser.add_argument("--top", type=int, default=10, help="Quantos módulos mais lentos listar")
+    args = parser.parse_args()
+
+    registros = medir_importacao()
+    # Módulos de primeiro nível (profundidade 0 após o recuo padrão) somam o tempo total
+    nivel_minimo = min(profundidade for _, _, _, profundidade in registros)
+    total_ms = sum(acumulado for _, _, acumulado, p in registros if p == nivel_minimo) / 1000
+
+    print(f"Tempo total de importação: {total_ms:.1f} ms (orçamento: {args.orcamento_ms:.0f} ms)")
+    print("Módulos mais lentos (tempo acumulado):")
+    for nome, _, acumulado, p in sorted(registros, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"  {acumulado / 1000:8.1f} ms  {nome}")
+
+    importados = {nome for nome, _, _, _ in registros}
+    adiados = sorted(m for m in importados if any(m == a or m.startswith(a + ".") for a in MODULOS_ADIADOS))
+
+    falhou = False
+    if adiados:
+        print(f"ERRO: módulos que deveriam ser importados sob demanda: {', '.join(adiados[:5])}")
+        falhou = True
+    if total_ms > args.orcamento_ms:
+        print("ERRO: orçamento de inicialização excedido.")
+        falhou = True
+
+    if not falhou:
+        print("OK")
+    sys.exit(1 if falhou else 0)
+
+
+if __name__ == "__main__":
+    main()